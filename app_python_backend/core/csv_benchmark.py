@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+Benchmark del pipeline CSV para Nordia ISP Suite
+Mide cada etapa de CSVProcessor (detect, read, validate, parse, filter, export)
+sobre datasets sintéticos de distintos tamaños, encodings y tasas de error
+"""
+
+import gc
+import json
+import math
+import time
+import random
+import logging
+import platform
+import tempfile
+import tracemalloc
+from pathlib import Path
+from datetime import datetime
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, Tuple, Union, Callable
+
+from .csv_processor import CSVProcessor
+
+logger = logging.getLogger(__name__)
+
+STAGES = ['detect', 'read', 'validate', 'parse', 'filter', 'export']
+ENCODINGS = ['utf-8', 'latin-1', 'cp1252']
+
+# Nombres con caracteres que cambian de bytes según el encoding
+_FIRST_NAMES = ['José', 'María', 'Ramón', 'Begoña', 'Martín', 'Inés', 'Agustín', 'Lucía', 'Nicolás', 'Sofía']
+_LAST_NAMES = ['Gómez', 'Peña', 'Fernández', 'Núñez', 'Rodríguez', 'Ibáñez', 'López', 'Muñoz', 'Díaz', 'Pérez']
+
+HEADER = "username,dni,nombre,dias_mora,monto_deuda,excepcion,telefono"
+
+
+@dataclass
+class CSVBenchmarkConfig:
+    """Parámetros del benchmark"""
+    sizes: List[int] = field(default_factory=lambda: [1000, 10000, 100000])
+    encodings: List[str] = field(default_factory=lambda: ['utf-8'])
+    error_rates: List[float] = field(default_factory=lambda: [0.0])
+    pipelines: List[str] = field(default_factory=lambda: ['legacy'])
+    stages: List[str] = field(default_factory=lambda: list(STAGES))
+    repeat: int = 1  # corridas de tiempo por combinación (se reporta la mediana)
+    trace_memory: bool = True  # corrida extra con tracemalloc para el pico por etapa
+    min_dias_mora: int = 30
+    data_dir: Optional[str] = None  # dónde generar/reutilizar los datasets
+    seed: int = 42
+
+
+def generate_dataset(path: Union[str, Path], rows: int, encoding: str = 'utf-8',
+                     error_rate: float = 0.0, seed: int = 42) -> Path:
+    """
+    Genera un CSV de morosos sintético
+
+    Args:
+        path: Archivo destino
+        rows: Cantidad de filas
+        encoding: Encoding del archivo
+        error_rate: Fracción de filas inválidas (dias_mora o monto no numéricos)
+        seed: Semilla para que el dataset sea reproducible
+
+    Returns:
+        Path del archivo generado
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+
+    with open(path, 'w', encoding=encoding, newline='') as f:
+        f.write(HEADER + '\n')
+        chunk = []
+        for i in range(rows):
+            nombre = f"{_FIRST_NAMES[i % 10]} {_LAST_NAMES[(i // 10) % 10]}"
+            dias_mora: Any = rng.randint(0, 365)
+            monto: Any = f"{rng.uniform(1000, 80000):.2f}"
+            if error_rate and rng.random() < error_rate:
+                if rng.random() < 0.5:
+                    dias_mora = "sin_dato"
+                else:
+                    monto = "N/A"
+            excepcion = "true" if rng.random() < 0.1 else "false"
+            telefono = f"+549379{i % 10000000:07d}" if i % 2 else ""
+            chunk.append(f"user{i:07d},{20000000 + i},{nombre},{dias_mora},{monto},{excepcion},{telefono}\n")
+            if len(chunk) >= 10000:
+                f.write(''.join(chunk))
+                chunk = []
+        f.write(''.join(chunk))
+
+    return path
+
+
+class LegacyPipeline:
+    """Las etapas de CSVProcessor.process_csv + export_to_csv, tal cual están"""
+
+    name = 'legacy'
+
+    def __init__(self, min_dias_mora: int):
+        # Sin límite de inválidos: el benchmark mide también datasets con errores
+        self.processor = CSVProcessor(min_dias_mora=min_dias_mora, max_invalid_percentage=100.0)
+
+    def run_stage(self, stage: str, context: Dict[str, Any]) -> Any:
+        processor = self.processor
+        if stage == 'detect':
+            context['encoding'] = processor.detect_encoding(context['path'])
+        elif stage == 'read':
+            # Mismo orden de intentos que process_csv (detectado y luego el resto),
+            # sin volver a correr la detección que ya midió la etapa anterior
+            detected = context.get('encoding')
+            if detected is None:
+                context['df'] = processor.read_csv_with_encoding(context['path'])
+                return
+            for encoding in [detected] + [enc for enc in processor.SUPPORTED_ENCODINGS if enc != detected]:
+                try:
+                    context['df'] = processor.read_csv_with_encoding(context['path'], encoding)
+                    context['read_encoding'] = encoding
+                    return
+                except ValueError:
+                    continue
+            raise ValueError(f"No se pudo leer {context['path']} con ningún encoding soportado")
+        elif stage == 'validate':
+            valid, errors = processor.validate_columns(context['df'])
+            if not valid:
+                raise ValueError('; '.join(errors))
+        elif stage == 'parse':
+            records = []
+            invalid = 0
+            for _, row in context['df'].iterrows():
+                record = processor.parse_record(row)
+                if record:
+                    records.append(record)
+                else:
+                    invalid += 1
+            context['records'] = records
+            context['invalid'] = invalid
+        elif stage == 'filter':
+            context['records'] = processor.filter_records(context['records'])
+        elif stage == 'export':
+            if not processor.export_to_csv(context['records'], context['export_path']):
+                raise IOError(f"No se pudo exportar a {context['export_path']}")
+
+
+# Pipelines comparables en el mismo reporte; un fast path se registra acá
+# con el mismo contrato (run_stage) y se mide junto al legacy
+PIPELINES: Dict[str, Callable[[int], Any]] = {
+    'legacy': LegacyPipeline,
+}
+
+
+def register_pipeline(name: str, factory: Callable[[int], Any]):
+    """Agregar un pipeline al benchmark (factory recibe min_dias_mora)"""
+    PIPELINES[name] = factory
+
+
+def fit_scaling(sizes: List[int], times: List[float]) -> Optional[Dict[str, float]]:
+    """
+    Ajuste t = a * n^b por mínimos cuadrados en escala log-log
+
+    Args:
+        sizes: Cantidad de filas de cada corrida
+        times: Segundos de cada corrida
+
+    Returns:
+        {'exponent': b, 'coefficient': a, 'r2': r², 'us_per_row': costo por fila en el mayor tamaño}
+        o None si hay menos de dos puntos utilizables
+    """
+    points = [(math.log(n), math.log(t)) for n, t in zip(sizes, times) if n > 0 and t > 0]
+    if len(points) < 2:
+        return None
+
+    xs, ys = zip(*points)
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    sxx = sum((x - mean_x) ** 2 for x in xs)
+    if sxx == 0:
+        return None
+    sxy = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    slope = sxy / sxx
+    intercept = mean_y - slope * mean_x
+
+    ss_tot = sum((y - mean_y) ** 2 for y in ys)
+    ss_res = sum((y - (intercept + slope * x)) ** 2 for x, y in zip(xs, ys))
+    largest = max(range(len(sizes)), key=lambda i: sizes[i])
+
+    return {
+        'exponent': round(slope, 4),
+        'coefficient': math.exp(intercept),
+        'r2': round(1 - ss_res / ss_tot, 4) if ss_tot > 0 else 1.0,
+        'us_per_row': round(times[largest] / sizes[largest] * 1e6, 4)
+    }
+
+
+class CSVBenchmark:
+    """
+    Corre cada pipeline sobre cada combinación tamaño x encoding x tasa de error
+
+    El tiempo se mide sin tracemalloc (su overhead distorsiona); el pico de
+    memoria por etapa sale de una corrida aparte con tracemalloc activo.
+    """
+
+    def __init__(self, config: CSVBenchmarkConfig):
+        unknown = [name for name in config.pipelines if name not in PIPELINES]
+        if unknown:
+            raise ValueError(f"Pipelines desconocidos: {', '.join(unknown)}")
+        self.config = config
+
+    def _dataset(self, data_dir: Path, rows: int, encoding: str, error_rate: float) -> Path:
+        path = data_dir / f"morosos_{rows}_{encoding}_{error_rate:g}_{self.config.seed}.csv"
+        if not path.exists():
+            logger.info(f"Generando dataset {path.name}")
+            generate_dataset(path, rows, encoding, error_rate, self.config.seed)
+        return path
+
+    def _run_once(self, pipeline_name: str, path: Path, export_path: Path,
+                  trace: bool) -> Tuple[Dict[str, Dict[str, float]], Dict[str, Any]]:
+        pipeline = PIPELINES[pipeline_name](self.config.min_dias_mora)
+        context: Dict[str, Any] = {'path': path, 'export_path': export_path}
+        stages: Dict[str, Dict[str, float]] = {}
+
+        gc.collect()
+        if trace:
+            tracemalloc.start()
+        try:
+            for stage in STAGES:
+                if stage not in self.config.stages:
+                    continue
+                if trace:
+                    tracemalloc.reset_peak()
+                    base, _ = tracemalloc.get_traced_memory()
+                start = time.perf_counter_ns()
+                pipeline.run_stage(stage, context)
+                elapsed = (time.perf_counter_ns() - start) / 1e9
+                stages[stage] = {'time_s': round(elapsed, 6)}
+                if trace:
+                    _, peak = tracemalloc.get_traced_memory()
+                    stages[stage]['peak_mb'] = round((peak - base) / 2 ** 20, 3)
+        finally:
+            if trace:
+                tracemalloc.stop()
+
+        return stages, context
+
+    def run(self, progress_callback: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """
+        Ejecutar todas las combinaciones
+
+        Args:
+            progress_callback: Llamado con una descripción de cada corrida
+
+        Returns:
+            Dict con 'meta', 'runs' (una entrada por combinación) y 'fits'
+            (curva de escala por pipeline, encoding, tasa de error y etapa)
+        """
+        config = self.config
+        temp_dir = None
+        if config.data_dir:
+            data_dir = Path(config.data_dir)
+            data_dir.mkdir(parents=True, exist_ok=True)
+        else:
+            temp_dir = tempfile.TemporaryDirectory(prefix="csv_bench_")
+            data_dir = Path(temp_dir.name)
+
+        # Los warnings por fila inválida irían a stderr y medirían la consola
+        processor_logger = logging.getLogger(CSVProcessor.__module__)
+        previous_level = processor_logger.level
+        processor_logger.setLevel(logging.ERROR)
+
+        runs = []
+        try:
+            for rows in sorted(config.sizes):
+                for encoding in config.encodings:
+                    for error_rate in config.error_rates:
+                        path = self._dataset(data_dir, rows, encoding, error_rate)
+                        for pipeline_name in config.pipelines:
+                            if progress_callback:
+                                progress_callback(f"{pipeline_name} {rows} filas {encoding} errores={error_rate:g}")
+                            runs.append(self._measure(pipeline_name, path, data_dir, rows, encoding, error_rate))
+        finally:
+            processor_logger.setLevel(previous_level)
+            if temp_dir is not None:
+                temp_dir.cleanup()
+
+        return {
+            'meta': {
+                'sizes': sorted(config.sizes),
+                'encodings': config.encodings,
+                'error_rates': config.error_rates,
+                'pipelines': config.pipelines,
+                'stages': [stage for stage in STAGES if stage in config.stages],
+                'repeat': config.repeat,
+                'trace_memory': config.trace_memory,
+                'min_dias_mora': config.min_dias_mora,
+                'timestamp': datetime.now().isoformat(),
+                'python': platform.python_version(),
+                'host': platform.node()
+            },
+            'runs': runs,
+            'fits': self._fits(runs)
+        }
+
+    def _measure(self, pipeline_name: str, path: Path, data_dir: Path, rows: int,
+                 encoding: str, error_rate: float) -> Dict[str, Any]:
+        export_path = data_dir / f"export_{pipeline_name}_{path.name}"
+
+        timings: List[Dict[str, Dict[str, float]]] = []
+        context: Dict[str, Any] = {}
+        for _ in range(max(1, self.config.repeat)):
+            stages, context = self._run_once(pipeline_name, path, export_path, trace=False)
+            timings.append(stages)
+
+        # Mediana por etapa entre repeticiones
+        stages = {
+            stage: {'time_s': sorted(run[stage]['time_s'] for run in timings)[len(timings) // 2]}
+            for stage in timings[0]
+        }
+
+        if self.config.trace_memory:
+            traced, _ = self._run_once(pipeline_name, path, export_path, trace=True)
+            for stage, data in traced.items():
+                stages[stage]['peak_mb'] = data['peak_mb']
+
+        total = sum(stage['time_s'] for stage in stages.values())
+        return {
+            'pipeline': pipeline_name,
+            'rows': rows,
+            'encoding': encoding,
+            'error_rate': error_rate,
+            'file_mb': round(path.stat().st_size / 2 ** 20, 3),
+            'stages': stages,
+            'total_s': round(total, 6),
+            'rows_per_s': round(rows / total, 1) if total > 0 else 0.0,
+            'peak_mb': max((stage.get('peak_mb', 0.0) for stage in stages.values()), default=0.0),
+            'records_out': len(context.get('records', [])),
+            'invalid': context.get('invalid', 0),
+            'detected_encoding': context.get('encoding'),
+            'read_encoding': context.get('read_encoding', context.get('encoding'))
+        }
+
+    @staticmethod
+    def _fits(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+        groups: Dict[str, List[Dict[str, Any]]] = {}
+        for run in runs:
+            key = f"{run['pipeline']}|{run['encoding']}|{run['error_rate']:g}"
+            groups.setdefault(key, []).append(run)
+
+        fits = {}
+        for key, group in groups.items():
+            sizes = [run['rows'] for run in group]
+            fits[key] = {
+                stage: fit_scaling(sizes, [run['stages'][stage]['time_s'] for run in group])
+                for stage in group[0]['stages']
+            }
+            fits[key]['total'] = fit_scaling(sizes, [run['total_s'] for run in group])
+        return fits
+
+
+def save_results(results: Dict[str, Any], path: Union[str, Path]) -> Path:
+    """Guardar resultados como JSON"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    return path
+
+
+def load_results(path: Union[str, Path]) -> Dict[str, Any]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare_to_baseline(results: Dict[str, Any], baseline: Dict[str, Any],
+                        tolerance: float = 0.2) -> List[Dict[str, Any]]:
+    """
+    Comparar tiempos por etapa contra un baseline
+
+    Las corridas se emparejan por (pipeline, filas, encoding, tasa de error).
+
+    Args:
+        results: Resultados actuales
+        baseline: Resultados guardados
+        tolerance: Aumento relativo aceptado antes de marcar regresión
+
+    Returns:
+        Una fila por corrida y etapa (más 'total') con baseline, actual, delta y status
+    """
+    def key(run):
+        return run['pipeline'], run['rows'], run['encoding'], run['error_rate']
+
+    previous_runs = {key(run): run for run in baseline.get('runs', [])}
+    rows = []
+    for run in results.get('runs', []):
+        previous = previous_runs.get(key(run))
+        if not previous:
+            continue
+        pairs = [(stage, data['time_s'], previous['stages'].get(stage, {}).get('time_s'))
+                 for stage, data in run['stages'].items()]
+        pairs.append(('total', run['total_s'], previous.get('total_s')))
+        for stage, after, before in pairs:
+            if not before:
+                continue
+            delta = (after - before) / before
+            rows.append({
+                'pipeline': run['pipeline'],
+                'rows': run['rows'],
+                'encoding': run['encoding'],
+                'error_rate': run['error_rate'],
+                'stage': stage,
+                'baseline': before,
+                'current': after,
+                'delta': round(delta, 4),
+                'status': 'regression' if delta > tolerance else 'improvement' if delta < -tolerance else 'ok'
+            })
+    return rows
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Journal de cortes para Nordia ISP Suite
+Registro append-only (JSON lines) del estado de cada corte, para poder
+reanudar o revertir una ejecución interrumpida
+"""
+
+import os
+import json
+import time
+import queue
+import logging
+import threading
+from pathlib import Path
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Union, Iterable
+
+logger = logging.getLogger(__name__)
+
+# Estados por usuario, en el orden en que se registran
+STATE_PLANNED = 'planned'
+STATE_SENT = 'sent'
+STATE_CONFIRMED = 'confirmed'
+STATE_FAILED = 'failed'
+STATE_ROLLED_BACK = 'rolled_back'
+
+# Marcadores de ejecución
+RUN_START = 'run_start'
+RUN_RESUME = 'resume'
+
+_STOP = object()
+
+
+class JournalState:
+    """Último estado conocido de cada usuario en la ejecución actual del journal"""
+
+    def __init__(self, run_id: Optional[str] = None):
+        self.run_id = run_id
+        self.users: Dict[str, str] = {}
+        self.entries = 0
+
+    def users_in(self, *states: str) -> List[str]:
+        """Usuarios cuyo último estado es alguno de los indicados"""
+        return [username for username, state in self.users.items() if state in states]
+
+    def confirmed_users(self) -> List[str]:
+        """Usuarios con corte confirmado (se saltean al reanudar)"""
+        return self.users_in(STATE_CONFIRMED)
+
+    def cut_users(self) -> List[str]:
+        """
+        Usuarios que pueden haber quedado cortados: confirmados o enviados
+        sin confirmación (el proceso murió con el comando en vuelo)
+        """
+        return self.users_in(STATE_SENT, STATE_CONFIRMED)
+
+    def counts(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for state in self.users.values():
+            counts[state] = counts.get(state, 0) + 1
+        return counts
+
+
+class CutJournal:
+    """
+    Journal append-only con group commit
+
+    Las entradas se encolan y un único hilo escritor las vuelca en lotes:
+    todo lo que llega mientras se hace un fsync viaja en el siguiente,
+    así que varios workers comparten el costo de cada fsync.
+
+    Ejemplo de uso:
+        with CutJournal("output/journal_cortes.jsonl") as journal:
+            journal.record_many(usernames, STATE_PLANNED, durable=True)
+            journal.record("juan.perez", STATE_SENT, durable=True)
+            journal.record("juan.perez", STATE_CONFIRMED)
+    """
+
+    def __init__(self, path: Union[str, Path], max_batch: int = 1024, resume: bool = False):
+        """
+        Args:
+            path: Archivo del journal (JSON lines)
+            max_batch: Máximo de entradas por fsync
+            resume: Continuar la última ejecución registrada en vez de iniciar una nueva
+        """
+        self.path = Path(path)
+        self.max_batch = max_batch
+        self.resume = resume
+        self.state = JournalState()
+
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._file = None
+        self._writer: Optional[threading.Thread] = None
+        self._cond = threading.Condition()
+        self._seq = 0
+        self._committed = 0
+        self._seq_lock = threading.Lock()
+        self._error: Optional[BaseException] = None
+        self.fsyncs = 0
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+    def open(self, run_id: Optional[str] = None) -> 'CutJournal':
+        """
+        Abre el journal y registra el inicio (o la reanudación) de la ejecución
+
+        Args:
+            run_id: Identificador de la ejecución (por defecto, timestamp actual)
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._discard_torn_tail()
+
+        if self.resume and self.path.exists():
+            self.state = self.replay(self.path)
+            logger.info(f"Journal reanudado: {self.path} ({self.state.counts()})")
+            marker = RUN_RESUME
+        else:
+            self.state = JournalState(run_id or datetime.now().strftime("%Y%m%d_%H%M%S"))
+            marker = RUN_START
+
+        self._file = open(self.path, 'a', encoding='utf-8')
+        self._writer = threading.Thread(target=self._writer_loop, name="cut-journal", daemon=True)
+        self._writer.start()
+
+        self._append({'state': marker, 'run_id': self.state.run_id}, durable=True)
+        return self
+
+    def _discard_torn_tail(self):
+        """
+        Descarta una última línea a medio escribir (crash durante un write)
+
+        Sin esto, el marcador de la nueva ejecución quedaría pegado a esa
+        línea, replay() no podría leerlo y las entradas nuevas se mezclarían
+        con el estado de la ejecución anterior.
+        """
+        if not self.path.exists():
+            return
+        with open(self.path, 'rb+') as f:
+            end = f.seek(0, os.SEEK_END)
+            if end == 0:
+                return
+            f.seek(end - 1)
+            if f.read(1) == b'\n':
+                return
+            # Buscar hacia atrás el último salto de línea
+            keep = 0
+            position = end
+            while position > 0:
+                step = min(4096, position)
+                position -= step
+                f.seek(position)
+                newline = f.read(step).rfind(b'\n')
+                if newline != -1:
+                    keep = position + newline + 1
+                    break
+            f.truncate(keep)
+            f.flush()
+            os.fsync(f.fileno())
+        logger.warning(f"Journal {self.path}: línea final incompleta descartada ({end - keep} bytes)")
+
+    def close(self):
+        """Vuelca lo pendiente y cierra el archivo"""
+        if self._writer is None:
+            return
+        self._queue.put(_STOP)
+        self._writer.join()
+        self._writer = None
+        self._file.close()
+        self._file = None
+
+    def record(self, username: str, state: str, durable: bool = False, **extra: Any):
+        """
+        Registra un cambio de estado de un usuario
+
+        Args:
+            username: Usuario PPPoE
+            state: Nuevo estado (planned, sent, confirmed, failed, rolled_back)
+            durable: Esperar a que la entrada esté en disco antes de retornar
+            **extra: Campos adicionales para la entrada
+        """
+        self.state.users[username] = state
+        self._append({'user': username, 'state': state, **extra}, durable)
+
+    def record_many(self, usernames: Iterable[str], state: str, durable: bool = False):
+        """Registra el mismo estado para varios usuarios con un único commit"""
+        seq = 0
+        for username in usernames:
+            self.state.users[username] = state
+            seq = self._append({'user': username, 'state': state}, durable=False)
+        if durable and seq:
+            self.wait(seq)
+
+    def wait(self, seq: Optional[int] = None):
+        """Bloquea hasta que la entrada seq (o todo lo encolado) esté en disco"""
+        target = seq if seq is not None else self._seq
+        with self._cond:
+            while self._committed < target and self._error is None:
+                self._cond.wait()
+        if self._error is not None:
+            raise IOError(f"Error escribiendo journal {self.path}: {self._error}")
+
+    def _append(self, entry: Dict[str, Any], durable: bool) -> int:
+        if self._writer is None:
+            raise RuntimeError("Journal no abierto")
+        entry['ts'] = time.time()
+        with self._seq_lock:
+            self._seq += 1
+            seq = self._seq
+            self._queue.put((seq, entry))
+        self.state.entries += 1
+        if durable:
+            self.wait(seq)
+        return seq
+
+    def _writer_loop(self):
+        """Hilo escritor: toma todo lo disponible, escribe y hace un fsync por lote"""
+        stop = False
+        while not stop:
+            batch = [self._queue.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            entries = []
+            for item in batch:
+                if item is _STOP:
+                    stop = True
+                else:
+                    entries.append(item)
+
+            if not entries:
+                continue
+
+            try:
+                self._file.write(''.join(
+                    json.dumps(entry, ensure_ascii=False) + '\n' for _, entry in entries
+                ))
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self.fsyncs += 1
+            except Exception as e:
+                logger.error(f"Error escribiendo journal: {e}")
+                self._error = e
+
+            with self._cond:
+                self._committed = max(self._committed, entries[-1][0])
+                self._cond.notify_all()
+
+    @staticmethod
+    def replay(path: Union[str, Path]) -> JournalState:
+        """
+        Reconstruye el estado de la última ejecución registrada
+
+        Una línea final truncada (crash durante la escritura) se ignora.
+
+        Args:
+            path: Archivo del journal
+
+        Returns:
+            JournalState con el último estado de cada usuario
+        """
+        state = JournalState()
+        path = Path(path)
+        if not path.exists():
+            return state
+
+        with open(path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Línea {line_number} del journal ilegible, se ignora")
+                    continue
+
+                if entry.get('state') == RUN_START:
+                    state = JournalState(entry.get('run_id'))
+                elif entry.get('state') == RUN_RESUME:
+                    continue
+                elif 'user' in entry:
+                    state.users[entry['user']] = entry['state']
+                state.entries += 1
+
+        return state
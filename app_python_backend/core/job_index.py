@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Índice de ejecuciones para Nordia ISP Suite
+Manifiesto append-only (JSON lines) con la metadata y estadísticas de cada
+ejecución de cortes, para listar el historial sin parsear los
+estadisticas_*.json completos (que incluyen el resultado por usuario)
+"""
+
+import os
+import json
+import logging
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Union, Iterator
+
+logger = logging.getLogger(__name__)
+
+JOBS_INDEX_NAME = 'jobs_index.jsonl'
+STATS_GLOB = 'estadisticas_*.json'
+
+# Estadísticas escalares que se copian al índice; 'errors' se guarda como cantidad
+INDEXED_STATISTICS = (
+    'total_records', 'processed', 'successful_cuts', 'failed_cuts',
+    'rollback_triggered', 'execution_time', 'resumed_skipped'
+)
+
+
+def job_entry(stats_file: Union[str, Path], report: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Entrada del índice para un reporte de estadísticas
+
+    Args:
+        stats_file: Path del estadisticas_*.json
+        report: Contenido del reporte ('metadata', 'statistics', 'results')
+
+    Returns:
+        Dict con id, archivo, metadata y estadísticas resumidas
+    """
+    stats_file = Path(stats_file)
+    metadata = report.get('metadata', {})
+    stats = report.get('statistics', {})
+    statistics = {key: stats[key] for key in INDEXED_STATISTICS if key in stats}
+    statistics.setdefault('processed', len(report.get('results', [])))
+    statistics['errors'] = len(stats.get('errors', []))
+
+    return {
+        'id': stats_file.stem.replace('estadisticas_', 'JOB-'),
+        'file': stats_file.name,
+        'timestamp': metadata.get('timestamp'),
+        'mode': metadata.get('mode', 'dry-run'),
+        'router_host': metadata.get('router_host'),
+        'use_mock': metadata.get('use_mock'),
+        'statistics': statistics,
+        'results': len(report.get('results', []))
+    }
+
+
+class JobIndex:
+    """
+    Manifiesto de ejecuciones en output/jobs_index.jsonl
+
+    Cada línea es una entrada de job_entry(), en orden de ejecución. Los
+    lectores pueden seguir el archivo desde el último offset leído porque
+    solo se agregan líneas; rebuild() lo reescribe de forma atómica.
+
+    Ejemplo de uso:
+        index = JobIndex.for_output_dir("output")
+        index.record(json_path, report_data)
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+
+    @classmethod
+    def for_output_dir(cls, output_dir: Union[str, Path]) -> 'JobIndex':
+        return cls(Path(output_dir) / JOBS_INDEX_NAME)
+
+    def append(self, entry: Dict[str, Any]):
+        """Agregar una entrada con una única escritura y fsync"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        line = json.dumps(entry, ensure_ascii=False, default=str) + '\n'
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def record(self, stats_file: Union[str, Path], report: Dict[str, Any]):
+        """
+        Registrar una ejecución recién escrita en disco
+
+        Si el índice todavía no existe (output previo a esta versión), se arma
+        primero desde los estadisticas_*.json del directorio, que ya incluyen
+        el reporte actual.
+
+        Args:
+            stats_file: Path del estadisticas_*.json escrito
+            report: Contenido del reporte
+        """
+        if not self.path.exists():
+            self.rebuild(Path(stats_file).parent)
+            return
+        self.append(job_entry(stats_file, report))
+
+    def rebuild(self, output_dir: Union[str, Path]) -> int:
+        """
+        Reescribir el índice desde los estadisticas_*.json existentes
+
+        Args:
+            output_dir: Directorio con los reportes
+
+        Returns:
+            Cantidad de ejecuciones indexadas
+        """
+        # El timestamp está al final del nombre (estadisticas_<modo>_<YYYYmmdd_HHMMSS>)
+        files = sorted(Path(output_dir).glob(STATS_GLOB), key=lambda path: path.stem[-15:])
+        entries = []
+        for stats_file in files:
+            try:
+                with open(stats_file, 'r', encoding='utf-8') as f:
+                    entries.append(job_entry(stats_file, json.load(f)))
+            except (OSError, ValueError) as e:
+                logger.warning(f"Reporte ignorado al reconstruir el índice: {stats_file} ({e})")
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False, default=str) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+        logger.info(f"Índice de ejecuciones reconstruido: {self.path} ({len(entries)} ejecuciones)")
+        return len(entries)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        if not self.path.exists():
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """Todas las entradas, en orden de ejecución"""
+        return list(self)
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        """Última ejecución registrada"""
+        latest = None
+        for entry in self:
+            latest = entry
+        return latest
@@ -0,0 +1,419 @@
+"""
+Nordia ISP Suite - Benchmark de operaciones de router
+Mide latencia por operación (p50/p95/p99/max) y throughput contra cualquier transporte
+
+Funcionalidades:
+- Transportes: api, ssh (router real), mock (en proceso) y tcp-mock (MockRouterOSServer)
+- Cantidad de usuarios, concurrencia e iteraciones configurables
+- Warmup previo que no se mide
+- Tiempos con perf_counter_ns; en mock también el tiempo simulado por el reloj virtual
+- Resultados en JSON y comparación contra un baseline guardado
+
+Uso:
+    bench = RouterBenchmark(BenchmarkConfig(transport="tcp-mock", users=50000, concurrency=4))
+    results = bench.run()
+    save_results(results, "output/bench_mikrotik.json")
+    regressions = [row for row in compare_to_baseline(results, load_results("baseline.json"))
+                   if row['status'] == 'regression']
+"""
+
+import json
+import time
+import random
+import platform
+import threading
+from pathlib import Path
+from datetime import datetime
+from dataclasses import dataclass, asdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Union, Callable, Tuple
+from loguru import logger
+
+from .connection import MikrotikConnection, ConnectionConfig
+from .latency import FixedLatency
+from .mock_router import MockMikrotikConnection
+from .mock_server import MockRouterOSServer, MockServerConfig
+
+TRANSPORTS = ('mock', 'tcp-mock', 'api', 'ssh')
+
+# Orden de ejecución: enable va después de disable para dejar a los usuarios como estaban
+OPERATIONS = (
+    'secrets_print', 'user_status', 'active_print',
+    'disable', 'enable', 'bulk_disable', 'bulk_enable'
+)
+WRITE_OPERATIONS = ('disable', 'enable', 'bulk_disable', 'bulk_enable')
+# Parámetros que tienen que coincidir para que dos corridas sean comparables
+COMPARABLE_META = ('transport', 'users', 'concurrency', 'latency', 'bulk_users', 'chunk_size',
+                   'rate_limit_delay', 'writes')
+
+
+@dataclass
+class BenchmarkConfig:
+    """Parámetros del benchmark"""
+    transport: str = "mock"
+    users: int = 1000  # usuarios sintéticos (mock / tcp-mock)
+    concurrency: int = 1
+    iterations: int = 50  # muestras por operación puntual
+    print_iterations: int = 5  # muestras por print completo
+    warmup: int = 5
+    operations: Tuple[str, ...] = OPERATIONS
+    writes: bool = True  # incluir disable/enable (en router real, solo sobre usuarios habilitados)
+    bulk_users: int = 500  # usuarios por llamada bulk
+    chunk_size: int = 200  # .id por comando set en bulk
+    rate_limit_delay: Optional[float] = None  # None = el de la conexión (0 en mock / tcp-mock)
+    latency: float = 0.0  # latencia simulada por comando (mock / tcp-mock)
+    seed: Optional[int] = 42
+    connection: Optional[ConnectionConfig] = None  # requerido para api / ssh
+
+
+def percentile(sorted_samples: List[int], pct: float) -> int:
+    """Percentil por rango más cercano sobre muestras ya ordenadas"""
+    if not sorted_samples:
+        return 0
+    rank = max(1, int(round(pct / 100 * len(sorted_samples) + 0.5 - 1e-9)))
+    return sorted_samples[min(rank, len(sorted_samples)) - 1]
+
+
+def summarize(samples_ns: List[int], wall_ns: int, items: int = 0, errors: int = 0) -> Dict[str, Any]:
+    """
+    Resumen de una operación
+
+    Args:
+        samples_ns: Latencias individuales en nanosegundos
+        wall_ns: Tiempo total de pared de la fase (incluye concurrencia)
+        items: Usuarios procesados (para operaciones bulk)
+        errors: Llamadas fallidas
+
+    Returns:
+        Dict con count, errors, mean/p50/p95/p99/max en ms y throughput
+    """
+    ordered = sorted(samples_ns)
+    wall_s = wall_ns / 1e9
+    summary = {
+        'count': len(ordered),
+        'errors': errors,
+        'mean_ms': round(sum(ordered) / len(ordered) / 1e6, 4) if ordered else 0.0,
+        'p50_ms': round(percentile(ordered, 50) / 1e6, 4),
+        'p95_ms': round(percentile(ordered, 95) / 1e6, 4),
+        'p99_ms': round(percentile(ordered, 99) / 1e6, 4),
+        'max_ms': round(ordered[-1] / 1e6, 4) if ordered else 0.0,
+        'wall_s': round(wall_s, 6),
+        'throughput_ops_s': round(len(ordered) / wall_s, 2) if wall_s > 0 else 0.0
+    }
+    if items:
+        summary['items'] = items
+        summary['throughput_items_s'] = round(items / wall_s, 2) if wall_s > 0 else 0.0
+    return summary
+
+
+class RouterBenchmark:
+    """
+    Ejecuta cada operación con N workers y mide cada llamada
+
+    Cada worker usa su propia conexión (como ServiceCutter en modo
+    concurrente); en mock todos comparten la misma instancia.
+    """
+
+    def __init__(self, config: BenchmarkConfig):
+        if config.transport not in TRANSPORTS:
+            raise ValueError(f"Transporte desconocido: {config.transport}")
+        if config.transport in ('api', 'ssh') and config.connection is None:
+            raise ValueError(f"El transporte {config.transport} requiere ConnectionConfig")
+
+        self.config = config
+        self._rng = random.Random(config.seed)
+        self._server: Optional[MockRouterOSServer] = None
+        self._server_address: Optional[Tuple[str, int]] = None
+        self._mock: Optional[MockMikrotikConnection] = None
+        self._connections: List[Any] = []
+        self._usernames: List[str] = []
+        self._enabled: List[str] = []
+        self._targets: Optional[List[str]] = None
+
+    # Preparación
+
+    def _setup(self):
+        config = self.config
+
+        if config.transport == 'mock':
+            latency_model = FixedLatency(config.latency) if config.latency else None
+            self._mock = MockMikrotikConnection(
+                simulate_delays=latency_model is not None,
+                latency_model=latency_model,
+                sample_users=False
+            )
+            self._mock.rate_limit_delay = config.rate_limit_delay or 0.0
+            self._mock.api.populate_users(config.users, seed=config.seed)
+            self._mock.connect()
+            self._connections = [self._mock] * config.concurrency
+
+        else:
+            if config.transport == 'tcp-mock':
+                self._server = MockRouterOSServer(MockServerConfig(
+                    port=0, users=config.users, latency=config.latency, seed=config.seed
+                ))
+                self._server_address = self._server.start_in_thread()
+
+            self._connections = [self._open_connection() for _ in range(config.concurrency)]
+
+        secrets = self._connections[0].get_ppp_secrets()
+        self._usernames = [secret['name'] for secret in secrets]
+        self._enabled = [
+            secret['name'] for secret in secrets
+            if str(secret.get('disabled', 'false')).lower() not in ('true', 'yes')
+        ]
+        logger.info(f"Benchmark {config.transport}: {len(self._usernames)} usuarios, "
+                    f"{config.concurrency} workers")
+
+    def _open_connection(self) -> MikrotikConnection:
+        config = self.config
+        if config.transport == 'tcp-mock':
+            host, port = self._server_address
+            connection_config = ConnectionConfig(host=host, port=port, username="admin", password="admin",
+                                                 rate_limit_delay=0.0)
+        else:
+            connection_config = ConnectionConfig(**asdict(config.connection))
+
+        if config.rate_limit_delay is not None:
+            connection_config.rate_limit_delay = config.rate_limit_delay
+
+        connection = MikrotikConnection(connection_config)
+        if not connection.connect():
+            raise RuntimeError(f"No se pudo conectar a {connection_config.host}:{connection_config.port}")
+        return connection
+
+    def _distinct_connections(self) -> List[Any]:
+        return list({id(connection): connection for connection in self._connections}.values())
+
+    def _teardown(self):
+        for connection in self._distinct_connections():
+            connection.disconnect()
+        self._connections = []
+        if self._server is not None:
+            self._server.stop()
+            self._server = None
+
+    # Operaciones
+
+    def _operation_plan(self, name: str) -> Tuple[Callable[[Any, Any], Any], List[Any], int]:
+        """(función, argumentos por llamada, usuarios por llamada)"""
+        config = self.config
+        iterations = config.iterations
+
+        if name == 'secrets_print':
+            return (lambda mt, _: mt.get_ppp_secrets() is not None), [None] * config.print_iterations, 0
+        if name == 'active_print':
+            return (lambda mt, _: mt.get_active_connections() is not None), [None] * config.print_iterations, 0
+        if name == 'user_status':
+            targets = [self._rng.choice(self._usernames) for _ in range(iterations)]
+            return (lambda mt, username: mt.get_user_status(username) is not None), targets, 0
+
+        # Escrituras: siempre sobre usuarios habilitados y en el mismo orden en
+        # disable y enable, para que al terminar queden como estaban
+        if name in ('disable', 'enable'):
+            targets = self._write_targets()[:iterations]
+            method = 'disable_user' if name == 'disable' else 'enable_user'
+            return (lambda mt, username: getattr(mt, method)(username)), targets, 0
+
+        chunks = self._bulk_chunks()
+        method = 'bulk_disable' if name == 'bulk_disable' else 'bulk_enable'
+        chunk_size = config.chunk_size
+        return (
+            (lambda mt, usernames: all(getattr(mt, method)(usernames, chunk_size=chunk_size).values())),
+            chunks,
+            config.bulk_users
+        )
+
+    def _write_targets(self) -> List[str]:
+        if self._targets is None:
+            self._targets = list(self._enabled)
+            random.Random(self.config.seed).shuffle(self._targets)
+        return self._targets
+
+    def _bulk_chunks(self) -> List[List[str]]:
+        # Los bulk usan usuarios distintos de los puntuales
+        pool = self._write_targets()[self.config.iterations:]
+        size = self.config.bulk_users
+        rounds = max(1, min(self.config.print_iterations, len(pool) // max(size, 1)))
+        return [pool[i * size:(i + 1) * size] for i in range(rounds) if pool[i * size:(i + 1) * size]]
+
+    def _warmup(self):
+        """Lecturas sin medir: conexión, caches del mock y JIT de rutas de código"""
+        for connection in self._distinct_connections():
+            for _ in range(self.config.warmup):
+                connection.get_user_status(self._rng.choice(self._usernames))
+            if self.config.warmup:
+                connection.get_ppp_secrets()
+
+    def _measure(self, name: str) -> Dict[str, Any]:
+        func, arguments, items_per_call = self._operation_plan(name)
+        if not arguments:
+            return summarize([], 0)
+
+        workers = min(self.config.concurrency, len(arguments))
+        clock = self._mock.clock if self._mock is not None else None
+        samples: List[int] = []
+        simulated: List[float] = []
+        errors = [0]
+        lock = threading.Lock()
+
+        def worker(index: int):
+            connection = self._connections[index]
+            local_samples, local_simulated, local_errors = [], [], 0
+            for argument in arguments[index::workers]:
+                simulated_start = clock.now() if clock else 0.0
+                start = time.perf_counter_ns()
+                try:
+                    ok = func(connection, argument)
+                except Exception as e:
+                    logger.debug(f"Benchmark {name}: {e}")
+                    ok = False
+                local_samples.append(time.perf_counter_ns() - start)
+                if clock:
+                    local_simulated.append(clock.now() - simulated_start)
+                if not ok:
+                    local_errors += 1
+            with lock:
+                samples.extend(local_samples)
+                simulated.extend(local_simulated)
+                errors[0] += local_errors
+
+        wall_start = time.perf_counter_ns()
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bench") as pool:
+            list(pool.map(worker, range(workers)))
+        wall_ns = time.perf_counter_ns() - wall_start
+        if clock:
+            clock.sync()
+
+        summary = summarize(samples, wall_ns, items_per_call * len(arguments), errors[0])
+        if simulated:
+            ordered = sorted(int(value * 1e9) for value in simulated)
+            summary['simulated_p50_ms'] = round(percentile(ordered, 50) / 1e6, 4)
+            summary['simulated_p95_ms'] = round(percentile(ordered, 95) / 1e6, 4)
+            summary['simulated_p99_ms'] = round(percentile(ordered, 99) / 1e6, 4)
+        return summary
+
+    def run(self, progress_callback: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """
+        Ejecutar todas las operaciones configuradas
+
+        Args:
+            progress_callback: Llamado con el nombre de cada operación al empezarla
+
+        Returns:
+            Dict con 'meta' (parámetros y entorno) y 'operations' (resumen por operación)
+        """
+        config = self.config
+        operations = [op for op in OPERATIONS if op in config.operations]
+        if not config.writes:
+            operations = [op for op in operations if op not in WRITE_OPERATIONS]
+
+        results: Dict[str, Any] = {}
+        self._setup()
+        try:
+            self._warmup()
+            for name in operations:
+                if progress_callback:
+                    progress_callback(name)
+                results[name] = self._measure(name)
+        finally:
+            self._teardown()
+
+        meta = {
+            'transport': config.transport,
+            'users': len(self._usernames),
+            'concurrency': config.concurrency,
+            'iterations': config.iterations,
+            'print_iterations': config.print_iterations,
+            'warmup': config.warmup,
+            'bulk_users': config.bulk_users,
+            'chunk_size': config.chunk_size,
+            'rate_limit_delay': config.rate_limit_delay,
+            'latency': config.latency,
+            'writes': config.writes,
+            'timestamp': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'host': platform.node()
+        }
+        return {'meta': meta, 'operations': results}
+
+
+def save_results(results: Dict[str, Any], path: Union[str, Path]) -> Path:
+    """Guardar resultados como JSON"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    return path
+
+
+def load_results(path: Union[str, Path]) -> Dict[str, Any]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class IncomparableBaselineError(ValueError):
+    """El baseline se midió con otros parámetros (transporte, usuarios, latencia...)"""
+
+    def __init__(self, mismatches: Dict[str, Tuple[Any, Any]]):
+        self.mismatches = mismatches
+        detail = ', '.join(f"{key}: {before} → {after}" for key, (before, after) in mismatches.items())
+        super().__init__(f"Baseline incomparable ({detail})")
+
+
+def baseline_mismatches(results: Dict[str, Any], baseline: Dict[str, Any]) -> Dict[str, Tuple[Any, Any]]:
+    """Parámetros de COMPARABLE_META que difieren entre el baseline y la corrida actual: (baseline, actual)"""
+    current, previous = results.get('meta', {}), baseline.get('meta', {})
+    mismatches = {}
+    for key in COMPARABLE_META:
+        # Los baselines anteriores a 'writes' siempre incluían escrituras
+        before = previous.get(key, True if key == 'writes' else None)
+        after = current.get(key, True if key == 'writes' else None)
+        if before != after:
+            mismatches[key] = (before, after)
+    return mismatches
+
+
+def compare_to_baseline(results: Dict[str, Any], baseline: Dict[str, Any],
+                        tolerance: float = 0.15) -> List[Dict[str, Any]]:
+    """
+    Comparar p95 y throughput de cada operación contra un baseline
+
+    Args:
+        results: Resultados actuales (de RouterBenchmark.run)
+        baseline: Resultados guardados
+        tolerance: Variación relativa aceptada antes de marcar regresión
+
+    Returns:
+        Una fila por operación y métrica con baseline, actual, delta y status
+        ('regression', 'improvement' u 'ok')
+
+    Raises:
+        IncomparableBaselineError: Si el baseline se midió con otros parámetros
+    """
+    mismatches = baseline_mismatches(results, baseline)
+    if mismatches:
+        raise IncomparableBaselineError(mismatches)
+
+    rows = []
+    for name, current in results.get('operations', {}).items():
+        previous = baseline.get('operations', {}).get(name)
+        if not previous:
+            continue
+        # p95: más alto es peor; throughput: más bajo es peor
+        for metric, higher_is_worse in (('p95_ms', True), ('throughput_ops_s', False)):
+            before, after = previous.get(metric), current.get(metric)
+            if not before or after is None:
+                continue
+            delta = (after - before) / before
+            worse = delta > tolerance if higher_is_worse else delta < -tolerance
+            better = delta < -tolerance if higher_is_worse else delta > tolerance
+            rows.append({
+                'operation': name,
+                'metric': metric,
+                'baseline': before,
+                'current': after,
+                'delta': round(delta, 4),
+                'status': 'regression' if worse else 'improvement' if better else 'ok'
+            })
+    return rows
@@ -15,7 +15,7 @@ Fecha: 2024-09-26
 
 import time
 import socket
-from typing import List, Dict, Any, Optional, Union
+from typing import List, Dict, Any, Optional, Union, Callable
 from contextlib import contextmanager
 from dataclasses import dataclass
 from loguru import logger
@@ -67,6 +67,45 @@ class MikrotikConnectionError(Exception):
     pass
 
 
+def _to_api_string(value: Any) -> str:
+    """Volver a la forma textual de RouterOS los valores que librouteros convierte"""
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return str(value)
+
+
+class RouterOSPath:
+    """
+    Acceso por atributos sobre librouteros.Path
+    
+    Permite escribir api.ppp.secret.print(name="juan") como en el resto del
+    módulo: los filtros de print viajan como queries (?name=juan) y las filas
+    se devuelven con valores en texto, igual que los retorna RouterOS.
+    """
+    
+    def __init__(self, path):
+        self._path = path
+    
+    def __getattr__(self, name: str) -> 'RouterOSPath':
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return RouterOSPath(self._path.join(name))
+    
+    def print(self, **kwargs) -> List[Dict[str, str]]:
+        queries = [f'?{key}={_to_api_string(value)}' for key, value in kwargs.items()]
+        rows = self._path.api.rawCmd(self._path.join('print').path, *queries)
+        return [{key: _to_api_string(value) for key, value in row.items()} for row in rows]
+    
+    def set(self, **kwargs):
+        tuple(self._path('set', **kwargs))
+    
+    def add(self, **kwargs) -> str:
+        return tuple(self._path('add', **kwargs))[0]['ret']
+    
+    def remove(self, **kwargs):
+        tuple(self._path('remove', **kwargs))
+
+
 class MikrotikConnection:
     """
     Conexión robusta con Mikrotik RouterOS
@@ -172,7 +211,7 @@ class MikrotikConnection:
                 port=self.config.port,
                 timeout=self.config.timeout
             )
-            self.api = self.connection.path()
+            self.api = RouterOSPath(self.connection.path())
             
             # Verificar conexión con comando simple
             identity = list(self.api.system.identity.print())[0]
@@ -426,6 +465,14 @@ class MikrotikConnection:
             logger.error(f"Error habilitando usuario {username}: {str(e)}")
             return False
     
+    def disable_user(self, username: str) -> bool:
+        """Alias para compatibilidad"""
+        return self.disable_ppp_user(username)
+    
+    def enable_user(self, username: str) -> bool:
+        """Alias para compatibilidad"""
+        return self.enable_ppp_user(username)
+    
     def get_active_connections(self) -> List[Dict[str, Any]]:
         """
         Obtener conexiones PPPoE activas
@@ -516,6 +563,128 @@ class MikrotikConnection:
         
         return results
     
+    def bulk_disable(self, usernames: List[str], chunk_size: int = 200,
+                     progress_callback: Optional[Callable[[int, int], None]] = None) -> Dict[str, bool]:
+        """
+        Deshabilitar múltiples usuarios con comandos agrupados
+        
+        Args:
+            usernames: Lista de nombres de usuario
+            chunk_size: Usuarios por comando set
+            progress_callback: Recibe (enviados, total) después de cada comando
+            
+        Returns:
+            Dict[str, bool]: Resultado verificado por usuario
+        """
+        return self._bulk_set_disabled(usernames, True, chunk_size, progress_callback)
+    
+    def bulk_enable(self, usernames: List[str], chunk_size: int = 200,
+                    progress_callback: Optional[Callable[[int, int], None]] = None) -> Dict[str, bool]:
+        """
+        Habilitar múltiples usuarios con comandos agrupados
+        
+        Args:
+            usernames: Lista de nombres de usuario
+            chunk_size: Usuarios por comando set
+            progress_callback: Recibe (enviados, total) después de cada comando
+            
+        Returns:
+            Dict[str, bool]: Resultado verificado por usuario
+        """
+        return self._bulk_set_disabled(usernames, False, chunk_size, progress_callback)
+    
+    def _bulk_set_disabled(self, usernames: List[str], disabled: bool, chunk_size: int,
+                           progress_callback: Optional[Callable[[int, int], None]]) -> Dict[str, bool]:
+        """
+        Cambiar el flag disabled en lote: una lectura del índice de secrets,
+        sets agrupados y una sola pasada de verificación
+        
+        Un lote que falla se registra y se sigue con los demás; el resultado
+        sale siempre de la verificación final, es decir del estado real del router.
+        """
+        self._check_connection()
+        
+        flag = 'yes' if disabled else 'no'
+        logger.info(f"Iniciando cambio masivo disabled={flag}: {len(usernames)} usuarios")
+        
+        try:
+            if self.config.connection_type == "api":
+                # Índice name -> .id con una sola lectura
+                self._apply_rate_limit()
+                index = {user['name']: user['.id'] for user in self.api.ppp.secret.print()}
+                
+                missing = [name for name in usernames if name not in index]
+                if missing:
+                    logger.warning(f"Usuarios no encontrados: {len(missing)}")
+                
+                ids = [index[name] for name in dict.fromkeys(usernames) if name in index]
+                for start in range(0, len(ids), chunk_size):
+                    chunk = ids[start:start + chunk_size]
+                    self._apply_rate_limit()
+                    # Un lote fallido no corta el resto: la verificación final dice qué quedó aplicado
+                    try:
+                        # RouterOS acepta varios .id separados por coma en un mismo set
+                        self.api.ppp.secret.set(**{'.id': ','.join(chunk), 'disabled': flag})
+                    except Exception as e:
+                        logger.error(f"Error en lote disabled={flag} ({len(chunk)} usuarios): {str(e)}")
+                    if progress_callback:
+                        progress_callback(start + len(chunk), len(ids))
+                
+                # Verificación en una sola pasada
+                self._apply_rate_limit()
+                state = {
+                    user['name']: user.get('disabled', 'false') == 'true'
+                    for user in self.api.ppp.secret.print()
+                }
+                
+            else:
+                # Implementación SSH: un script por lote con find por nombre
+                names = list(dict.fromkeys(usernames))
+                for start in range(0, len(names), chunk_size):
+                    chunk = names[start:start + chunk_size]
+                    condition = ' or '.join(f'name="{name}"' for name in chunk)
+                    self._apply_rate_limit()
+                    try:
+                        stdin, stdout, stderr = self.ssh_client.exec_command(
+                            f'/ppp secret set [find where {condition}] disabled={flag}'
+                        )
+                        error_output = stderr.read().decode()
+                        if error_output:
+                            logger.error(f"Error SSH en lote: {error_output}")
+                    except Exception as e:
+                        logger.error(f"Error SSH en lote disabled={flag} ({len(chunk)} usuarios): {str(e)}")
+                    if progress_callback:
+                        progress_callback(start + len(chunk), len(names))
+                
+                self._apply_rate_limit()
+                state = self._get_disabled_state_ssh()
+            
+        except Exception as e:
+            # Solo si no se pudo leer el índice o el estado final: sin verificación no hay resultado confiable
+            logger.error(f"Error en cambio masivo: {str(e)}")
+            raise MikrotikConnectionError(f"Error en cambio masivo: {str(e)}")
+        
+        results = {name: state.get(name) == disabled for name in usernames}
+        successful = sum(1 for success in results.values() if success)
+        logger.info(f"Cambio masivo completado: {successful}/{len(usernames)} verificados")
+        
+        return results
+    
+    def _get_disabled_state_ssh(self) -> Dict[str, bool]:
+        """Obtener name -> disabled vía SSH (flag X en print terse)"""
+        stdin, stdout, stderr = self.ssh_client.exec_command('/ppp secret print terse')
+        result = stdout.read().decode()
+        
+        state = {}
+        for line in result.split('\n'):
+            if 'name=' not in line:
+                continue
+            user_data = self._parse_ssh_user_line(line)
+            if user_data:
+                flags = line.split('name=', 1)[0]
+                state[user_data['name']] = 'X' in flags
+        return state
+    
     def disconnect_active_user(self, username: str) -> bool:
         """
         Desconectar usuario actualmente conectado
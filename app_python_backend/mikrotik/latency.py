@@ -0,0 +1,211 @@
+"""
+Nordia ISP Suite - Modelos de latencia y reloj virtual
+Latencia simulada para el mock de RouterOS sin dormir de verdad
+
+Funcionalidades:
+- Modelos enchufables: fijo, uniforme, normal, empírico (trazas reales) y por comando
+- Muestreo con semilla para benchmarks reproducibles
+- Reloj virtual: el mock avanza el tiempo simulado en vez de llamar a time.sleep
+- Tiempo simulado (lo que tardaría contra un router real) separado del tiempo de CPU
+
+Uso:
+    clock = VirtualClock()
+    model = PerCommandLatency({'/ppp/secret/print': NormalLatency(0.120, 0.030)},
+                              default=FixedLatency(0.015))
+    api = MockRouterAPI(latency_model=model, clock=clock)
+    ...
+    print(clock.report())
+"""
+
+import json
+import time
+import random
+import threading
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Union, Iterable
+
+
+class LatencyModel:
+    """Base de los modelos de latencia: sample() retorna segundos para un comando"""
+
+    def __init__(self, seed: Optional[int] = None):
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self, command: str = "") -> float:
+        with self._lock:
+            return max(0.0, self._sample(command))
+
+    def _sample(self, command: str) -> float:
+        raise NotImplementedError
+
+
+class FixedLatency(LatencyModel):
+    """Misma latencia para todos los comandos"""
+
+    def __init__(self, seconds: float):
+        super().__init__()
+        self.seconds = seconds
+
+    def _sample(self, command: str) -> float:
+        return self.seconds
+
+
+class UniformLatency(LatencyModel):
+    """Latencia uniforme entre low y high (el comportamiento histórico del mock: 10-100ms)"""
+
+    def __init__(self, low: float = 0.01, high: float = 0.1, seed: Optional[int] = None):
+        super().__init__(seed)
+        self.low = low
+        self.high = high
+
+    def _sample(self, command: str) -> float:
+        return self._rng.uniform(self.low, self.high)
+
+
+class NormalLatency(LatencyModel):
+    """Latencia normal truncada en minimum"""
+
+    def __init__(self, mean: float, stddev: float, minimum: float = 0.0, seed: Optional[int] = None):
+        super().__init__(seed)
+        self.mean = mean
+        self.stddev = stddev
+        self.minimum = minimum
+
+    def _sample(self, command: str) -> float:
+        return max(self.minimum, self._rng.gauss(self.mean, self.stddev))
+
+
+class EmpiricalLatency(LatencyModel):
+    """Remuestreo de latencias medidas contra un router real"""
+
+    def __init__(self, samples: Iterable[float], seed: Optional[int] = None):
+        super().__init__(seed)
+        self.samples: List[float] = [float(value) for value in samples]
+        if not self.samples:
+            raise ValueError("EmpiricalLatency requiere al menos una muestra")
+
+    def _sample(self, command: str) -> float:
+        return self._rng.choice(self.samples)
+
+    @classmethod
+    def from_trace(cls, path: Union[str, Path], command: Optional[str] = None,
+                   seed: Optional[int] = None) -> 'EmpiricalLatency':
+        """
+        Cargar muestras desde una traza
+
+        Args:
+            path: Archivo con una latencia en segundos por línea, o JSON lines
+                  con {"command": ..., "latency": ...}
+            command: Si se indica, usar solo las muestras de ese comando
+            seed: Semilla del muestreo
+        """
+        trace = _read_trace(path)
+        if command is not None:
+            return cls(trace.get(command, []), seed)
+        return cls([value for values in trace.values() for value in values], seed)
+
+
+class PerCommandLatency(LatencyModel):
+    """Un modelo distinto por comando, con uno por defecto para el resto"""
+
+    def __init__(self, models: Dict[str, LatencyModel], default: Optional[LatencyModel] = None):
+        super().__init__()
+        self.models = models
+        self.default = default or FixedLatency(0.0)
+
+    def sample(self, command: str = "") -> float:
+        return self.models.get(command, self.default).sample(command)
+
+    @classmethod
+    def from_trace(cls, path: Union[str, Path], default: Optional[LatencyModel] = None,
+                   seed: Optional[int] = None) -> 'PerCommandLatency':
+        """Un EmpiricalLatency por cada comando presente en la traza"""
+        rng = random.Random(seed)
+        models = {
+            command: EmpiricalLatency(samples, seed=rng.randrange(2 ** 32))
+            for command, samples in _read_trace(path).items() if command
+        }
+        return cls(models, default)
+
+
+def _read_trace(path: Union[str, Path]) -> Dict[Optional[str], List[float]]:
+    """Agrupar las latencias de una traza por comando (None si la línea no lo indica)"""
+    samples: Dict[Optional[str], List[float]] = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            if line.startswith('{'):
+                entry = json.loads(line)
+                samples.setdefault(entry.get('command'), []).append(float(entry['latency']))
+            else:
+                samples.setdefault(None, []).append(float(line))
+    return samples
+
+
+class VirtualClock:
+    """
+    Reloj simulado: sleep() avanza el tiempo sin bloquear
+
+    Cada hilo tiene su propia línea de tiempo, que arranca en el instante del
+    hilo que creó el reloj; así N workers en paralelo suman max(), no la suma
+    de sus latencias. Con realtime=True además duerme de verdad.
+    """
+
+    def __init__(self, realtime: bool = False):
+        self.realtime = realtime
+        self._owner = threading.get_ident()
+        self._times: Dict[int, float] = {self._owner: 0.0}
+        self._lock = threading.Lock()
+        self._cpu_start = time.process_time()
+        self._wall_start = time.perf_counter()
+        self.sleeps = 0
+
+    def now(self) -> float:
+        """Tiempo simulado del hilo actual (segundos desde la creación)"""
+        with self._lock:
+            return self._thread_time()
+
+    def sleep(self, seconds: float):
+        """Avanzar el tiempo simulado del hilo actual"""
+        if seconds <= 0:
+            return
+        with self._lock:
+            thread_id = threading.get_ident()
+            self._times[thread_id] = self._thread_time() + seconds
+            self.sleeps += 1
+        if self.realtime:
+            time.sleep(seconds)
+
+    def sync(self):
+        """
+        Barrera: todas las líneas de tiempo pasan a la más avanzada
+
+        Equivale a que el hilo principal espere (join) a sus workers.
+        """
+        with self._lock:
+            latest = max(self._times.values())
+            for thread_id in self._times:
+                self._times[thread_id] = latest
+
+    def elapsed(self) -> float:
+        """Tiempo simulado total: la línea de tiempo más avanzada"""
+        with self._lock:
+            return max(self._times.values())
+
+    def report(self) -> Dict[str, Any]:
+        """Tiempo simulado vs tiempo real/CPU consumido por la simulación"""
+        return {
+            'simulated_seconds': round(self.elapsed(), 6),
+            'cpu_seconds': round(time.process_time() - self._cpu_start, 6),
+            'real_seconds': round(time.perf_counter() - self._wall_start, 6),
+            'sleeps': self.sleeps
+        }
+
+    def _thread_time(self) -> float:
+        thread_id = threading.get_ident()
+        if thread_id not in self._times:
+            self._times[thread_id] = self._times[self._owner]
+        return self._times[thread_id]
@@ -0,0 +1,275 @@
+"""
+Nordia ISP Suite - Flotas de routers mock
+Escenarios de N routers x M usuarios para pruebas de carga
+
+Funcionalidades:
+- N routers mock con M usuarios cada uno
+- Fracción de usuarios deshabilitados y con sesión activa
+- Nombres repetidos entre routers (mismo cliente en varios nodos)
+- Routers degradados: más latencia y fallas
+- Carga directa en las tablas indexadas del mock, sin replay de comandos
+- Snapshot/restore de escenarios a disco (JSON, .gz opcional)
+
+Uso:
+    fleet = MockFleet.build(FleetScenario(routers=10, users_per_router=50000,
+                                          disabled_ratio=0.1, degraded_routers=2, seed=7))
+    fleet.snapshot("output/fleet_10x50k.json.gz")
+    ...
+    fleet = MockFleet.restore("output/fleet_10x50k.json.gz")
+    with fleet["router-03"] as mt:
+        mt.disable_user("user0001234")
+"""
+
+import gc
+import gzip
+import json
+import time
+import random
+from pathlib import Path
+from operator import attrgetter
+from dataclasses import dataclass, asdict, fields
+from typing import Dict, List, Any, Optional, Union, Iterator
+from loguru import logger
+
+from .latency import LatencyModel, FixedLatency, NormalLatency, VirtualClock
+from .mock_router import MockMikrotikConnection, MockPPPoEUser, MockActiveConnection
+
+SNAPSHOT_VERSION = 1
+
+
+@dataclass
+class FleetScenario:
+    """Parámetros de una flota mock"""
+    routers: int = 1
+    users_per_router: int = 1000
+    disabled_ratio: float = 0.0
+    active_ratio: float = 0.0  # fracción de habilitados con sesión activa
+    collision_ratio: float = 0.0  # fracción de usuarios con nombre compartido entre routers
+    degraded_routers: int = 0
+    degraded_failure_rate: float = 0.2
+    degraded_latency: float = 0.5  # segundos medios por comando en routers degradados
+    latency: float = 0.0  # segundos por comando en routers sanos (0 = sin delays)
+    seed: Optional[int] = None
+    prefix: str = "router"
+
+
+class MockFleet:
+    """
+    Conjunto de routers mock que comparten un reloj virtual
+
+    Cada router es un MockMikrotikConnection independiente; el reloj común
+    permite medir el tiempo simulado de una operación sobre toda la flota.
+    """
+
+    def __init__(self, scenario: FleetScenario, clock: Optional[VirtualClock] = None):
+        self.scenario = scenario
+        self.clock = clock or VirtualClock()
+        self.routers: Dict[str, MockMikrotikConnection] = {}
+        self.degraded: List[str] = []
+
+    def __getitem__(self, name: str) -> MockMikrotikConnection:
+        return self.routers[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.routers)
+
+    def __len__(self) -> int:
+        return len(self.routers)
+
+    @property
+    def total_users(self) -> int:
+        return sum(len(router.api.users) for router in self.routers.values())
+
+    # Construcción
+
+    @classmethod
+    def build(cls, scenario: FleetScenario, clock: Optional[VirtualClock] = None) -> 'MockFleet':
+        """
+        Generar la flota escribiendo directo en las tablas de cada mock
+
+        Args:
+            scenario: Parámetros de la flota
+            clock: Reloj virtual compartido (por defecto, uno nuevo)
+
+        Returns:
+            MockFleet con scenario.routers routers cargados
+        """
+        start = time.perf_counter()
+        fleet = cls(scenario, clock)
+        rng = random.Random(scenario.seed)
+        degraded = set(rng.sample(range(scenario.routers), min(scenario.degraded_routers, scenario.routers)))
+        width = max(7, len(str(scenario.users_per_router)))
+        # Pool de nombres compartidos: los mismos clientes aparecen en varios routers
+        shared_pool = max(1, int(scenario.users_per_router * scenario.collision_ratio))
+
+        # Cientos de miles de objetos nuevos: el GC no libera nada y solo suma pausas
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            for index in range(scenario.routers):
+                name = fleet._router_name(index)
+                router = fleet._add_router(name, index in degraded)
+                users, connections = cls._generate_tables(scenario, index, rng, width, shared_pool)
+                router.api.load_tables(users, connections, next_user_id=len(users) + 1,
+                                       next_connection_id=len(connections) + 1)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+
+        logger.info(
+            f"Flota mock: {scenario.routers} routers, {fleet.total_users} usuarios, "
+            f"{len(fleet.degraded)} degradados ({time.perf_counter() - start:.2f}s)"
+        )
+        return fleet
+
+    @staticmethod
+    def _generate_tables(scenario: FleetScenario, router_index: int, rng: random.Random,
+                         width: int, shared_pool: int):
+        users: List[MockPPPoEUser] = []
+        connections: List[MockActiveConnection] = []
+        shared_names = set()
+        collision_ratio = scenario.collision_ratio
+        disabled_ratio = scenario.disabled_ratio
+        active_ratio = scenario.active_ratio
+        random_value = rng.random
+        name_prefix = f"user{router_index:03d}"
+        address_prefix = f"10.{router_index & 255}."
+
+        for i in range(scenario.users_per_router):
+            name = name_prefix + str(i).zfill(width)
+            if collision_ratio and random_value() < collision_ratio:
+                candidate = "shared" + str(rng.randrange(shared_pool)).zfill(width)
+                if candidate not in shared_names:
+                    shared_names.add(candidate)
+                    name = candidate
+
+            disabled = random_value() < disabled_ratio
+            remote_address = f"{address_prefix}{(i >> 8) & 255}.{i & 255}"
+            # Posicional: id, name, password, service, disabled, profile, local, remote
+            users.append(MockPPPoEUser(
+                f"*{i + 1:X}", name, "123456", "pppoe", disabled, "default", "192.168.1.1", remote_address
+            ))
+
+            if active_ratio and not disabled and random_value() < active_ratio:
+                connections.append(MockActiveConnection(
+                    f"*{len(connections) + 1:X}", name, remote_address, "1h0m0s"
+                ))
+
+        return users, connections
+
+    def _router_name(self, index: int) -> str:
+        return f"{self.scenario.prefix}-{index:02d}"
+
+    def _add_router(self, name: str, degraded: bool) -> MockMikrotikConnection:
+        scenario = self.scenario
+        latency_model: Optional[LatencyModel] = None
+        if degraded:
+            seed = random.Random(f"{scenario.seed}:{name}").randrange(2 ** 32)
+            latency_model = NormalLatency(scenario.degraded_latency, scenario.degraded_latency / 4, seed=seed)
+        elif scenario.latency:
+            latency_model = FixedLatency(scenario.latency)
+
+        router = MockMikrotikConnection(
+            simulate_delays=latency_model is not None,
+            failure_rate=scenario.degraded_failure_rate if degraded else 0.0,
+            latency_model=latency_model,
+            clock=self.clock,
+            sample_users=False
+        )
+        self.routers[name] = router
+        if degraded:
+            self.degraded.append(name)
+        return router
+
+    # Snapshot / restore
+
+    def snapshot(self, path: Union[str, Path]) -> Path:
+        """
+        Guardar la flota (escenario + tablas de cada router) en disco
+
+        Args:
+            path: Archivo destino; si termina en .gz se comprime
+
+        Returns:
+            Path del snapshot
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Filas posicionales en el orden de los campos del dataclass (astuple copia en profundidad)
+        user_row = attrgetter(*(f.name for f in fields(MockPPPoEUser) if f.init))
+        conn_row = attrgetter(*(f.name for f in fields(MockActiveConnection) if f.init))
+        data = {
+            'version': SNAPSHOT_VERSION,
+            'scenario': asdict(self.scenario),
+            'routers': {
+                name: {
+                    'degraded': name in self.degraded,
+                    'users': [user_row(user) for user in router.api.users.values()],
+                    'connections': [conn_row(conn) for conn in router.api.active_connections.values()],
+                    'next_user_id': router.api._next_user_id,
+                    'next_connection_id': router.api._next_connection_id
+                }
+                for name, router in self.routers.items()
+            }
+        }
+        with _open_snapshot(path, 'wt') as f:
+            f.write(json.dumps(data, separators=(',', ':')))
+        logger.info(f"Snapshot de flota guardado: {path}")
+        return path
+
+    @classmethod
+    def restore(cls, path: Union[str, Path], clock: Optional[VirtualClock] = None) -> 'MockFleet':
+        """
+        Reconstruir una flota desde un snapshot
+
+        Args:
+            path: Archivo generado por snapshot()
+            clock: Reloj virtual compartido (por defecto, uno nuevo)
+
+        Returns:
+            MockFleet con el mismo estado que al guardar
+        """
+        path = Path(path)
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            with _open_snapshot(path, 'rt') as f:
+                data = json.load(f)
+
+            if data.get('version') != SNAPSHOT_VERSION:
+                raise ValueError(f"Versión de snapshot no soportada: {data.get('version')}")
+
+            fleet = cls(FleetScenario(**data['scenario']), clock)
+            for name, tables in data['routers'].items():
+                router = fleet._add_router(name, tables['degraded'])
+                router.api.load_tables(
+                    (MockPPPoEUser(*row) for row in tables['users']),
+                    (MockActiveConnection(*row) for row in tables['connections']),
+                    next_user_id=tables['next_user_id'],
+                    next_connection_id=tables['next_connection_id']
+                )
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+
+        logger.info(f"Flota restaurada desde {path}: {len(fleet)} routers, {fleet.total_users} usuarios")
+        return fleet
+
+    def summary(self) -> Dict[str, Any]:
+        """Conteos por router (usuarios, deshabilitados, sesiones activas)"""
+        return {
+            name: {
+                'users': len(router.api.users),
+                'disabled': sum(1 for user in router.api.users.values() if user.disabled),
+                'active': len(router.api.active_connections),
+                'degraded': name in self.degraded
+            }
+            for name, router in self.routers.items()
+        }
+
+
+def _open_snapshot(path: Path, mode: str):
+    """Abrir un snapshot; .gz con compresión rápida (nivel 1)"""
+    if path.suffix == '.gz':
+        return gzip.open(path, mode, compresslevel=1, encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
@@ -13,14 +13,17 @@ Autor: Gonzalo Haedo
 Fecha: 2024-09-26
 """
 
-import time
 import uuid
 import random
-from typing import Dict, List, Any, Optional
+import threading
+from types import MappingProxyType
+from typing import Dict, List, Set, Any, Optional, Callable, Iterable, Iterator, Mapping
 from dataclasses import dataclass, field
 from copy import deepcopy
 from loguru import logger
 
+from .latency import LatencyModel, UniformLatency, VirtualClock
+
 
 @dataclass
 class MockPPPoEUser:
@@ -37,6 +40,24 @@ class MockPPPoEUser:
     bytes_in: int = 0
     bytes_out: int = 0
     last_seen: Optional[str] = None
+    # Fila ya renderizada (ver to_row); no es parte del estado del usuario
+    _row: Optional[Mapping[str, str]] = field(default=None, init=False, repr=False, compare=False)
+    
+    def to_row(self) -> Mapping[str, str]:
+        """
+        Fila pre-renderizada e inmutable, como la retorna print
+        
+        Se construye una vez y se reutiliza hasta invalidate_row(); los prints
+        no vuelven a armar el dict ni a convertir contadores con str().
+        """
+        row = self._row
+        if row is None:
+            row = self._row = MappingProxyType(self.to_dict())
+        return row
+    
+    def invalidate_row(self):
+        """Descartar la fila cacheada después de modificar el usuario"""
+        self._row = None
     
     def to_dict(self) -> Dict[str, Any]:
         """Convertir a diccionario como retorna RouterOS API"""
@@ -67,6 +88,14 @@ class MockActiveConnection:
     caller_id: str = ""
     bytes_in: int = 0
     bytes_out: int = 0
+    _row: Optional[Mapping[str, str]] = field(default=None, init=False, repr=False, compare=False)
+    
+    def to_row(self) -> Mapping[str, str]:
+        """Fila pre-renderizada e inmutable (las sesiones no se modifican)"""
+        row = self._row
+        if row is None:
+            row = self._row = MappingProxyType(self.to_dict())
+        return row
     
     def to_dict(self) -> Dict[str, Any]:
         """Convertir a diccionario como retorna RouterOS API"""
@@ -88,29 +117,45 @@ class MockRouterAPI:
     Imita el comportamiento de librouteros para testing
     """
     
-    def __init__(self, simulate_delays: bool = True, failure_rate: float = 0.0):
+    def __init__(self, simulate_delays: bool = True, failure_rate: float = 0.0,
+                 sample_users: bool = True, latency_model: Optional[LatencyModel] = None,
+                 clock: Optional[VirtualClock] = None):
         """
         Args:
             simulate_delays: Si simular delays realistas
             failure_rate: Porcentaje de comandos que fallan (0.0-1.0)
+            sample_users: Si generar los usuarios de ejemplo
+            latency_model: Latencia por comando (por defecto, uniforme 10-100ms)
+            clock: Reloj virtual donde se acumula la latencia (no se duerme)
         """
         self.simulate_delays = simulate_delays
         self.failure_rate = failure_rate
+        self.latency_model = latency_model or UniformLatency()
+        self.clock = clock or VirtualClock()
         self.users: Dict[str, MockPPPoEUser] = {}
         self.active_connections: Dict[str, MockActiveConnection] = {}
+        
+        # Índices secundarios para lookups O(1) con cientos de miles de usuarios
+        self.user_ids_by_name: Dict[str, str] = {}
+        self.connection_ids_by_name: Dict[str, Set[str]] = {}
+        
+        # Los .id son monótonos: nunca se reutilizan después de un remove
+        self._next_user_id = 1
+        self._next_connection_id = 1
+        
         self.is_connected = False
         self.command_count = 0
         
         # Generar usuarios de prueba
-        self._generate_sample_users()
+        if sample_users:
+            self._generate_sample_users()
         
         logger.info(f"Mock Router inicializado con {len(self.users)} usuarios")
     
-    def _simulate_network_delay(self):
-        """Simular delay de red realista"""
+    def _simulate_network_delay(self, command: str = ""):
+        """Simular delay de red realista (avanza el reloj virtual)"""
         if self.simulate_delays:
-            delay = random.uniform(0.01, 0.1)  # 10-100ms
-            time.sleep(delay)
+            self.clock.sleep(self.latency_model.sample(command))
     
     def _simulate_random_failure(self):
         """Simular fallas aleatorias para testing de robustez"""
@@ -133,9 +178,8 @@ class MockRouterAPI:
         ]
         
         for i, name in enumerate(sample_names):
-            user_id = f"*{i+1:X}"  # IDs como RouterOS
-            self.users[user_id] = MockPPPoEUser(
-                id=user_id,
+            self.add_user(MockPPPoEUser(
+                id=self.allocate_user_id(),
                 name=name,
                 password="123456",
                 disabled=random.choice([True, False]) if i > 10 else False,
@@ -143,25 +187,164 @@ class MockRouterAPI:
                 comment=f"Cliente {name.replace('.', ' ').title()}",
                 bytes_in=random.randint(1000000, 10000000000),
                 bytes_out=random.randint(500000, 5000000000)
-            )
+            ))
         
         # Simular algunas conexiones activas
         active_users = random.sample(list(self.users.values()), min(5, len(self.users)))
         for user in active_users:
             if not user.disabled:
-                conn_id = f"*{len(self.active_connections)+1:X}"
-                self.active_connections[conn_id] = MockActiveConnection(
-                    id=conn_id,
+                self.add_connection(MockActiveConnection(
+                    id=self.allocate_connection_id(),
                     name=user.name,
                     address=user.remote_address,
                     uptime=f"{random.randint(1,48)}h{random.randint(0,59)}m{random.randint(0,59)}s",
                     bytes_in=user.bytes_in,
                     bytes_out=user.bytes_out
-                )
+                ))
+    
+    def populate_users(self, count: int, disabled_ratio: float = 0.0, active_ratio: float = 0.0,
+                       seed: Optional[int] = None, prefix: str = "user"):
+        """
+        Cargar usuarios sintéticos para pruebas de carga
+        
+        Args:
+            count: Cantidad de usuarios a agregar
+            disabled_ratio: Fracción de usuarios deshabilitados (0.0-1.0)
+            active_ratio: Fracción de usuarios habilitados con sesión activa (0.0-1.0)
+            seed: Semilla para que la carga sea reproducible
+            prefix: Prefijo de los nombres (prefix0000001, ...)
+        """
+        rng = random.Random(seed)
+        width = max(7, len(str(count)))
+        start = self._next_user_id - 1
+        
+        for i in range(start, start + count):
+            name = f"{prefix}{i:0{width}d}"
+            disabled = rng.random() < disabled_ratio
+            remote_address = f"10.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}"
+            self.add_user(MockPPPoEUser(
+                id=self.allocate_user_id(),
+                name=name,
+                disabled=disabled,
+                remote_address=remote_address
+            ))
+            
+            if not disabled and rng.random() < active_ratio:
+                self.add_connection(MockActiveConnection(
+                    id=self.allocate_connection_id(),
+                    name=name,
+                    address=remote_address,
+                    uptime="1h0m0s"
+                ))
+        
+        logger.info(f"Mock: {count} usuarios sintéticos cargados ({len(self.users)} en total)")
+    
+    # Tablas indexadas: todo alta/baja/rename pasa por acá para mantener los índices
+    
+    def allocate_user_id(self) -> str:
+        """Siguiente .id de /ppp/secret (formato RouterOS, *1, *2, ... *A)"""
+        user_id = f"*{self._next_user_id:X}"
+        self._next_user_id += 1
+        return user_id
+    
+    def allocate_connection_id(self) -> str:
+        """Siguiente .id de /ppp/active"""
+        conn_id = f"*{self._next_connection_id:X}"
+        self._next_connection_id += 1
+        return conn_id
+    
+    def find_user(self, name: str) -> Optional[MockPPPoEUser]:
+        """Buscar usuario por nombre en O(1)"""
+        user_id = self.user_ids_by_name.get(name)
+        return self.users[user_id] if user_id is not None else None
+    
+    def find_connections(self, name: str) -> List[MockActiveConnection]:
+        """Conexiones activas de un usuario en O(1)"""
+        return [self.active_connections[conn_id] for conn_id in self.connection_ids_by_name.get(name, ())]
+    
+    def add_user(self, user: MockPPPoEUser):
+        """Agregar usuario (el nombre debe ser único, como en RouterOS)"""
+        if user.name in self.user_ids_by_name:
+            raise Exception(f"Mock: user {user.name} already exists")
+        self.users[user.id] = user
+        self.user_ids_by_name[user.name] = user.id
+    
+    def rename_user(self, user_id: str, new_name: str):
+        """Cambiar el nombre de un usuario actualizando el índice"""
+        user = self.users[user_id]
+        if new_name == user.name:
+            return
+        if new_name in self.user_ids_by_name:
+            raise Exception(f"Mock: user {new_name} already exists")
+        del self.user_ids_by_name[user.name]
+        self.user_ids_by_name[new_name] = user_id
+        user.name = new_name
+        user.invalidate_row()
+    
+    def remove_user(self, user_id: str) -> MockPPPoEUser:
+        """Eliminar usuario junto con sus conexiones activas"""
+        user = self.users.pop(user_id)
+        del self.user_ids_by_name[user.name]
+        for conn_id in list(self.connection_ids_by_name.get(user.name, ())):
+            self.remove_connection(conn_id)
+        return user
+    
+    def add_connection(self, conn: MockActiveConnection):
+        """Registrar una sesión activa"""
+        self.active_connections[conn.id] = conn
+        self.connection_ids_by_name.setdefault(conn.name, set()).add(conn.id)
+    
+    def remove_connection(self, conn_id: str) -> MockActiveConnection:
+        """Eliminar una sesión activa"""
+        conn = self.active_connections.pop(conn_id)
+        conn_ids = self.connection_ids_by_name[conn.name]
+        conn_ids.discard(conn_id)
+        if not conn_ids:
+            del self.connection_ids_by_name[conn.name]
+        return conn
+    
+    def load_tables(self, users: Iterable[MockPPPoEUser],
+                    connections: Iterable[MockActiveConnection] = (),
+                    next_user_id: Optional[int] = None, next_connection_id: Optional[int] = None):
+        """
+        Carga masiva directa en las tablas indexadas (escenarios y snapshots)
+        
+        No pasa por la API simulada: sin latencia, fallas ni contadores.
+        
+        Args:
+            users: Usuarios a cargar (nombres únicos)
+            connections: Sesiones activas a cargar
+            next_user_id: Próximo .id numérico de secret; si no se indica se
+                          calcula a partir del mayor .id cargado
+            next_connection_id: Ídem para /ppp/active
+        """
+        users_table = self.users
+        name_index = self.user_ids_by_name
+        loaded_users = []
+        for user in users:
+            if user.name in name_index:
+                raise Exception(f"Mock: user {user.name} already exists")
+            users_table[user.id] = user
+            name_index[user.name] = user.id
+            if next_user_id is None:
+                loaded_users.append(user.id)
+        
+        loaded_connections = []
+        for conn in connections:
+            self.add_connection(conn)
+            if next_connection_id is None:
+                loaded_connections.append(conn.id)
+        
+        if next_user_id is None:
+            next_user_id = max((int(user_id[1:], 16) for user_id in loaded_users), default=0) + 1
+        if next_connection_id is None:
+            next_connection_id = max((int(conn_id[1:], 16) for conn_id in loaded_connections), default=0) + 1
+        self._next_user_id = max(self._next_user_id, next_user_id)
+        self._next_connection_id = max(self._next_connection_id, next_connection_id)
     
     def connect(self, host: str, username: str, password: str, port: int = 8728, timeout: int = 30):
         """Simular conexión"""
-        self._simulate_network_delay()
+        self._simulate_network_delay("/login")
         self._simulate_random_failure()
         
         # Simular validación de credenciales
@@ -210,7 +393,7 @@ class MockIdentityPath:
     
     def print(self):
         """Simular system identity print"""
-        self.api._simulate_network_delay()
+        self.api._simulate_network_delay("/system/identity/print")
         self.api._simulate_random_failure()
         
         return [{
@@ -234,60 +417,73 @@ class MockSecretPath:
     def __init__(self, api: MockRouterAPI):
         self.api = api
     
-    def print(self, **kwargs) -> List[Dict[str, Any]]:
-        """Simular ppp secret print"""
-        self.api._simulate_network_delay()
+    def print(self, **kwargs) -> List[Mapping[str, str]]:
+        """Simular ppp secret print (filas de solo lectura, ver MockPPPoEUser.to_row)"""
+        return list(self.stream(**kwargs))
+    
+    def stream(self, **kwargs) -> Iterator[Mapping[str, str]]:
+        """
+        Print en streaming: retorna las filas de a una, como llegan los !re
+        
+        La latencia, las fallas y el conteo de comandos se aplican al llamar;
+        el recorrido es sobre una foto de la tabla en ese momento.
+        """
+        self.api._simulate_network_delay("/ppp/secret/print")
         self.api._simulate_random_failure()
         self.api.command_count += 1
         
         # Filtrar por nombre si se especifica
         if 'name' in kwargs:
-            target_name = kwargs['name']
-            matching_users = [
-                user for user in self.api.users.values() 
-                if user.name == target_name
-            ]
-            return [user.to_dict() for user in matching_users]
+            user = self.api.find_user(kwargs['name'])
+            return iter([user.to_row()] if user else [])
         
         # Filtrar por ID si se especifica
         if '.id' in kwargs:
-            target_id = kwargs['.id']
-            if target_id in self.api.users:
-                return [self.api.users[target_id].to_dict()]
-            return []
+            user = self.api.users.get(kwargs['.id'])
+            return iter([user.to_row()] if user else [])
         
-        # Retornar todos los usuarios
-        return [user.to_dict() for user in self.api.users.values()]
+        # Todos los usuarios
+        return (user.to_row() for user in list(self.api.users.values()))
     
     def set(self, **kwargs):
         """Simular ppp secret set"""
-        self.api._simulate_network_delay()
+        self.api._simulate_network_delay("/ppp/secret/set")
         self.api._simulate_random_failure()
         self.api.command_count += 1
         
         if '.id' not in kwargs:
             raise Exception("Mock: .id required for set operation")
         
-        user_id = kwargs['.id']
-        if user_id not in self.api.users:
-            raise Exception(f"Mock: user with id {user_id} not found")
-        
-        user = self.api.users[user_id]
-        
-        # Actualizar propiedades
-        if 'disabled' in kwargs:
-            user.disabled = kwargs['disabled'] == 'yes'
-            logger.debug(f"Mock: Usuario {user.name} {'deshabilitado' if user.disabled else 'habilitado'}")
+        # Como RouterOS, acepta varios .id separados por coma
+        user_ids = kwargs['.id'].split(',')
+        for user_id in user_ids:
+            if user_id not in self.api.users:
+                raise Exception(f"Mock: user with id {user_id} not found")
         
-        if 'comment' in kwargs:
-            user.comment = kwargs['comment']
+        if 'name' in kwargs:
+            if len(user_ids) > 1:
+                raise Exception("Mock: name must be unique")
+            self.api.rename_user(user_ids[0], kwargs['name'])
         
-        if 'password' in kwargs:
-            user.password = kwargs['password']
+        for user_id in user_ids:
+            user = self.api.users[user_id]
+            
+            # Actualizar propiedades
+            if 'disabled' in kwargs:
+                user.disabled = kwargs['disabled'] == 'yes'
+                logger.debug(f"Mock: Usuario {user.name} {'deshabilitado' if user.disabled else 'habilitado'}")
+            
+            if 'comment' in kwargs:
+                user.comment = kwargs['comment']
+            
+            if 'password' in kwargs:
+                user.password = kwargs['password']
+            
+            user.invalidate_row()
     
     def add(self, **kwargs):
         """Simular ppp secret add"""
-        self.api._simulate_network_delay()
+        self.api._simulate_network_delay("/ppp/secret/add")
         self.api._simulate_random_failure()
         self.api.command_count += 1
         
@@ -295,12 +491,11 @@ class MockSecretPath:
             raise Exception("Mock: name required for add operation")
         
         # Verificar que no existe
-        existing = [u for u in self.api.users.values() if u.name == kwargs['name']]
-        if existing:
+        if self.api.find_user(kwargs['name']):
             raise Exception(f"Mock: user {kwargs['name']} already exists")
         
         # Crear nuevo usuario
-        user_id = f"*{len(self.api.users)+1:X}"
+        user_id = self.api.allocate_user_id()
         new_user = MockPPPoEUser(
             id=user_id,
             name=kwargs['name'],
@@ -310,13 +505,13 @@ class MockSecretPath:
             comment=kwargs.get('comment', '')
         )
         
-        self.api.users[user_id] = new_user
+        self.api.add_user(new_user)
         logger.debug(f"Mock: Usuario {new_user.name} agregado")
         return user_id
     
     def remove(self, **kwargs):
         """Simular ppp secret remove"""
-        self.api._simulate_network_delay()
+        self.api._simulate_network_delay("/ppp/secret/remove")
         self.api._simulate_random_failure()
         self.api.command_count += 1
         
@@ -327,18 +522,8 @@ class MockSecretPath:
         if user_id not in self.api.users:
             raise Exception(f"Mock: user with id {user_id} not found")
         
-        user_name = self.api.users[user_id].name
-        del self.api.users[user_id]
-        
-        # Eliminar conexiones activas
-        to_remove = []
-        for conn_id, conn in self.api.active_connections.items():
-            if conn.name == user_name:
-                to_remove.append(conn_id)
-        
-        for conn_id in to_remove:
-            del self.api.active_connections[conn_id]
-        
+        # Elimina también sus conexiones activas
+        user_name = self.api.remove_user(user_id).name
         logger.debug(f"Mock: Usuario {user_name} eliminado")
 
 
@@ -348,27 +533,31 @@ class MockActivePath:
     def __init__(self, api: MockRouterAPI):
         self.api = api
     
-    def print(self, **kwargs) -> List[Dict[str, Any]]:
+    def print(self, **kwargs) -> List[Mapping[str, str]]:
         """Simular ppp active print"""
-        self.api._simulate_network_delay()
+        return list(self.stream(**kwargs))
+    
+    def stream(self, **kwargs) -> Iterator[Mapping[str, str]]:
+        """Print en streaming de conexiones activas (ver MockSecretPath.stream)"""
+        self.api._simulate_network_delay("/ppp/active/print")
         self.api._simulate_random_failure()
         self.api.command_count += 1
         
         # Filtrar por nombre si se especifica
         if 'name' in kwargs:
-            target_name = kwargs['name']
-            matching_connections = [
-                conn for conn in self.api.active_connections.values() 
-                if conn.name == target_name
-            ]
-            return [conn.to_dict() for conn in matching_connections]
+            return iter([conn.to_row() for conn in self.api.find_connections(kwargs['name'])])
         
-        # Retornar todas las conexiones activas
-        return [conn.to_dict() for conn in self.api.active_connections.values()]
+        # Filtrar por ID si se especifica
+        if '.id' in kwargs:
+            conn = self.api.active_connections.get(kwargs['.id'])
+            return iter([conn.to_row()] if conn else [])
+        
+        # Todas las conexiones activas
+        return (conn.to_row() for conn in list(self.api.active_connections.values()))
     
     def remove(self, **kwargs):
         """Simular ppp active remove"""
-        self.api._simulate_network_delay()
+        self.api._simulate_network_delay("/ppp/active/remove")
         self.api._simulate_random_failure()
         self.api.command_count += 1
         
@@ -379,8 +568,7 @@ class MockActivePath:
         if conn_id not in self.api.active_connections:
             raise Exception(f"Mock: active connection with id {conn_id} not found")
         
-        conn_name = self.api.active_connections[conn_id].name
-        del self.api.active_connections[conn_id]
+        conn_name = self.api.remove_connection(conn_id).name
         logger.debug(f"Mock: Conexión activa de {conn_name} desconectada")
 
 
@@ -390,18 +578,30 @@ class MockMikrotikConnection:
     Compatible con el mismo API
     """
     
-    def __init__(self, config=None, simulate_delays: bool = True, failure_rate: float = 0.0):
+    # Rate limit del mock si no hay config (segundos entre comandos)
+    RATE_LIMIT_DELAY = 0.1
+    
+    def __init__(self, config=None, simulate_delays: bool = True, failure_rate: float = 0.0,
+                 latency_model: Optional[LatencyModel] = None, clock: Optional[VirtualClock] = None,
+                 sample_users: bool = True):
         """
         Args:
-            config: Ignorado en mock (compatibilidad)
+            config: Solo se usa rate_limit_delay (compatibilidad)
             simulate_delays: Si simular delays de red
             failure_rate: Porcentaje de operaciones que fallan
+            latency_model: Latencia por comando del router simulado
+            clock: Reloj virtual compartido (por defecto, uno nuevo)
+            sample_users: Si arrancar con los usuarios de ejemplo
         """
         self.config = config
         self.is_connected = False
-        self.api = MockRouterAPI(simulate_delays, failure_rate)
+        self.api = MockRouterAPI(simulate_delays, failure_rate, sample_users=sample_users,
+                                 latency_model=latency_model, clock=clock)
+        self.clock = self.api.clock
+        self.rate_limit_delay = getattr(config, 'rate_limit_delay', self.RATE_LIMIT_DELAY)
         self.connection = None
-        self._last_command_time = 0
+        # Por hilo: los workers comparten el mock pero simulan conexiones propias
+        self._rate_state = threading.local()
         
         logger.info("Mock Mikrotik Connection inicializada")
     
@@ -439,11 +639,18 @@ class MockMikrotikConnection:
             raise Exception("Mock: No connection")
     
     def _apply_rate_limit(self):
-        """Rate limiting simulado"""
-        current_time = time.time()
-        if current_time - self._last_command_time < 0.1:  # Mock rate limit
-            time.sleep(0.1)
-        self._last_command_time = current_time
+        """Rate limiting simulado sobre el reloj virtual, como MikrotikConnection"""
+        current_time = self.clock.now()
+        last_command_time = getattr(self._rate_state, 'last_command_time', None)
+        if last_command_time is not None:
+            time_since_last = current_time - last_command_time
+            if time_since_last < self.rate_limit_delay:
+                self.clock.sleep(self.rate_limit_delay - time_since_last)
+        self._rate_state.last_command_time = self.clock.now()
+    
+    def timing_report(self) -> Dict[str, Any]:
+        """Tiempo simulado de router vs tiempo real/CPU de la simulación"""
+        return {**self.clock.report(), 'commands': self.api.command_count}
     
     def get_ppp_secrets(self) -> List[Dict[str, Any]]:
         """Obtener usuarios mock"""
@@ -520,6 +727,41 @@ class MockMikrotikConnection:
             results[username] = self.enable_ppp_user(username)
         return results
     
+    def bulk_disable(self, usernames: List[str], chunk_size: int = 200,
+                     progress_callback: Optional[Callable[[int, int], None]] = None) -> Dict[str, bool]:
+        """Deshabilitar en lote mock con comandos agrupados"""
+        return self._bulk_set_disabled(usernames, True, chunk_size, progress_callback)
+    
+    def bulk_enable(self, usernames: List[str], chunk_size: int = 200,
+                    progress_callback: Optional[Callable[[int, int], None]] = None) -> Dict[str, bool]:
+        """Habilitar en lote mock con comandos agrupados"""
+        return self._bulk_set_disabled(usernames, False, chunk_size, progress_callback)
+    
+    def _bulk_set_disabled(self, usernames: List[str], disabled: bool, chunk_size: int,
+                           progress_callback: Optional[Callable[[int, int], None]]) -> Dict[str, bool]:
+        """Misma secuencia que MikrotikConnection: índice, sets agrupados, verificación"""
+        self._check_connection()
+        secret = self.connection.path().ppp.secret
+        flag = 'yes' if disabled else 'no'
+        
+        self._apply_rate_limit()
+        index = {user['name']: user['.id'] for user in secret.print()}
+        
+        ids = [index[name] for name in dict.fromkeys(usernames) if name in index]
+        for start in range(0, len(ids), chunk_size):
+            chunk = ids[start:start + chunk_size]
+            self._apply_rate_limit()
+            try:
+                secret.set(**{'.id': ','.join(chunk), 'disabled': flag})
+            except Exception as e:
+                logger.error(f"Mock: Error en lote disabled={flag}: {str(e)}")
+            if progress_callback:
+                progress_callback(start + len(chunk), len(ids))
+        
+        self._apply_rate_limit()
+        state = {user['name']: user['disabled'] == 'true' for user in secret.print()}
+        return {name: state.get(name) == disabled for name in usernames}
+    
     def disconnect_active_user(self, username: str) -> bool:
         """Desconectar usuario activo mock"""
         self._check_connection()
@@ -541,20 +783,26 @@ class MockMikrotikConnection:
 
 # Funciones de utilidad para testing
 
-def create_mock_connection(simulate_delays: bool = False, failure_rate: float = 0.0) -> MockMikrotikConnection:
+def create_mock_connection(simulate_delays: bool = False, failure_rate: float = 0.0,
+                           latency_model: Optional[LatencyModel] = None,
+                           clock: Optional[VirtualClock] = None) -> MockMikrotikConnection:
     """
     Crear conexión mock para testing
     
     Args:
         simulate_delays: Si simular delays realistas
         failure_rate: Porcentaje de operaciones que fallan (0.0-1.0)
+        latency_model: Latencia por comando (fija, normal, empírica...)
+        clock: Reloj virtual donde se acumula el tiempo simulado
     
     Returns:
         MockMikrotikConnection: Instancia mock configurada
     """
     return MockMikrotikConnection(
         simulate_delays=simulate_delays,
-        failure_rate=failure_rate
+        failure_rate=failure_rate,
+        latency_model=latency_model,
+        clock=clock
     )
 
 
@@ -579,11 +827,10 @@ def generate_test_scenario(scenario: str = "normal") -> MockMikrotikConnection:
     
     elif scenario == "all_disabled":
         mock_conn = create_mock_connection(simulate_delays=False, failure_rate=0.0)
-        # Deshabilitar todos los usuarios
-        with mock_conn as mt:
-            users = mt.get_ppp_secrets()
-            for user in users:
-                mt.disable_ppp_user(user['name'])
+        # Deshabilitar todos los usuarios directo en el estado, sin pasar por la API
+        for user in mock_conn.api.users.values():
+            user.disabled = True
+            user.invalidate_row()
         return mock_conn
     
     else:
@@ -630,6 +877,10 @@ if __name__ == "__main__":
             print(f"\n🌐 Conexiones activas: {len(active)}")
             
             print(f"\n📈 Comandos ejecutados: {mt.connection.command_count}")
+            
+            timing = mt.timing_report()
+            print(f"⏱️ Tiempo simulado: {timing['simulated_seconds']:.2f}s "
+                  f"(CPU real: {timing['cpu_seconds']:.3f}s)")
     
     except Exception as e:
         print(f"❌ Error: {str(e)}")
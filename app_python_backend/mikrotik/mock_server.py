@@ -0,0 +1,470 @@
+"""
+Nordia ISP Suite - Servidor Mock de RouterOS API
+Servidor TCP que habla el protocolo binario de la API de RouterOS, para
+pruebas de carga de MikrotikConnection y librouteros sin hardware real
+
+Funcionalidades:
+- Protocolo de palabras/sentencias de RouterOS API (puerto 8728)
+- /login (método plano y por challenge), /system/identity
+- /ppp/secret print|set|add|remove y /ppp/active print|remove
+- Queries ?name=, ?.id= y =.proplist= en print
+- Tags (.tag) para clientes que hacen pipelining
+- N usuarios sintéticos (hasta 1M) sobre el estado de MockRouterAPI
+- Latencia, jitter, inyección de !trap y límite de comandos por segundo
+
+Uso:
+    python -m app.mikrotik.mock_server --port 8729 --users 100000 --latency 0.005
+"""
+
+import time
+import random
+import asyncio
+import argparse
+import threading
+from hashlib import md5
+from binascii import hexlify, unhexlify
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Tuple, Iterable, Iterator
+from loguru import logger
+
+from .mock_router import MockRouterAPI
+
+
+class RouterOSProtocolError(Exception):
+    """Error de framing en el protocolo de RouterOS API"""
+    pass
+
+
+@dataclass
+class MockServerConfig:
+    """Configuración del servidor mock"""
+    host: str = "127.0.0.1"
+    port: int = 8728
+    username: str = "admin"
+    password: str = "admin"
+    identity: str = "MockRouter-Nordia"
+    users: int = 1000
+    disabled_ratio: float = 0.0
+    active_ratio: float = 0.0
+    latency: float = 0.0  # segundos por comando
+    jitter: float = 0.0  # +/- segundos sobre la latencia
+    trap_rate: float = 0.0  # fracción de comandos que responden !trap
+    max_commands_per_second: float = 0.0  # 0 = sin límite
+    seed: Optional[int] = None
+
+
+# Codificación de longitudes del protocolo
+
+def encode_length(length: int) -> bytes:
+    """Codificar la longitud de una palabra en formato RouterOS"""
+    if length < 0x80:
+        return bytes((length,))
+    if length < 0x4000:
+        return (length | 0x8000).to_bytes(2, 'big')
+    if length < 0x200000:
+        return (length | 0xC00000).to_bytes(3, 'big')
+    if length < 0x10000000:
+        return (length | 0xE0000000).to_bytes(4, 'big')
+    return b'\xF0' + length.to_bytes(4, 'big')
+
+
+def encode_sentence(words: List[str]) -> bytes:
+    """Codificar una sentencia (lista de palabras + palabra vacía)"""
+    parts = []
+    for word in words:
+        data = word.encode('utf-8')
+        parts.append(encode_length(len(data)))
+        parts.append(data)
+    parts.append(b'\x00')
+    return b''.join(parts)
+
+
+async def read_length(reader: asyncio.StreamReader) -> int:
+    """Leer una longitud codificada desde el stream"""
+    first = (await reader.readexactly(1))[0]
+    if first < 0x80:
+        return first
+    if first < 0xC0:
+        return ((first & 0x3F) << 8) + (await reader.readexactly(1))[0]
+    if first < 0xE0:
+        return ((first & 0x1F) << 16) + int.from_bytes(await reader.readexactly(2), 'big')
+    if first < 0xF0:
+        return ((first & 0x0F) << 24) + int.from_bytes(await reader.readexactly(3), 'big')
+    if first == 0xF0:
+        return int.from_bytes(await reader.readexactly(4), 'big')
+    raise RouterOSProtocolError(f"Byte de control inválido: {first:#x}")
+
+
+async def read_sentence(reader: asyncio.StreamReader) -> List[str]:
+    """Leer palabras hasta la palabra vacía que cierra la sentencia"""
+    words = []
+    while True:
+        length = await read_length(reader)
+        if length == 0:
+            return words
+        words.append((await reader.readexactly(length)).decode('utf-8', errors='replace'))
+
+
+def parse_command(words: List[str]) -> Tuple[str, Dict[str, str], Dict[str, str], Optional[str]]:
+    """
+    Separar una sentencia en comando, atributos, queries y tag
+
+    Returns:
+        (comando, {atributo: valor}, {query: valor}, tag)
+    """
+    command = words[0] if words else ''
+    attributes: Dict[str, str] = {}
+    queries: Dict[str, str] = {}
+    tag = None
+
+    for word in words[1:]:
+        if word.startswith('.tag='):
+            tag = word[5:]
+        elif word.startswith('='):
+            key, _, value = word[1:].partition('=')
+            attributes[key] = value
+        elif word.startswith('?'):
+            # ?name=valor y ?=name=valor son equivalentes
+            body = word[2:] if word.startswith('?=') else word[1:]
+            key, _, value = body.partition('=')
+            queries[key] = value
+
+    return command, attributes, queries, tag
+
+
+class TokenBucket:
+    """Límite de comandos por segundo compartido por todas las conexiones"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class MockRouterOSServer:
+    """
+    Servidor TCP de RouterOS API sobre el estado de MockRouterAPI
+
+    Ejemplo de uso:
+        server = MockRouterOSServer(MockServerConfig(port=0, users=50000))
+        host, port = server.start_in_thread()
+        api = librouteros.connect(host, "admin", "admin", port=port)
+        ...
+        server.stop()
+    """
+
+    # Sentencias por escritura en respuestas grandes
+    WRITE_CHUNK = 512
+
+    def __init__(self, config: Optional[MockServerConfig] = None, api: Optional[MockRouterAPI] = None):
+        """
+        Args:
+            config: Configuración del servidor
+            api: Estado a servir (por defecto, MockRouterAPI con config.users usuarios)
+        """
+        self.config = config or MockServerConfig()
+        self._rng = random.Random(self.config.seed)
+
+        if api is None:
+            api = MockRouterAPI(simulate_delays=False, sample_users=False)
+            api.populate_users(
+                self.config.users,
+                disabled_ratio=self.config.disabled_ratio,
+                active_ratio=self.config.active_ratio,
+                seed=self.config.seed
+            )
+        self.api = api
+        self.paths = api.path()
+
+        self._bucket = TokenBucket(self.config.max_commands_per_second) \
+            if self.config.max_commands_per_second > 0 else None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._clients: set = set()
+
+        self.stats = {
+            'connections': 0,
+            'commands': 0,
+            'traps': 0,
+            'injected_traps': 0
+        }
+
+    # Ciclo de vida
+
+    async def start(self) -> Tuple[str, int]:
+        """Empezar a escuchar; retorna (host, puerto) reales"""
+        self._server = await asyncio.start_server(self._handle_client, self.config.host, self.config.port)
+        host, port = self._server.sockets[0].getsockname()[:2]
+        logger.info(f"Mock RouterOS API escuchando en {host}:{port} ({len(self.api.users)} usuarios)")
+        return host, port
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    def start_in_thread(self) -> Tuple[str, int]:
+        """Levantar el servidor en un hilo propio (para benchmarks y tests)"""
+        ready = threading.Event()
+        address: List[Tuple[str, int]] = []
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            address.append(self._loop.run_until_complete(self.start()))
+            ready.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name="mock-routeros", daemon=True)
+        self._thread.start()
+        ready.wait()
+        return address[0]
+
+    def stop(self):
+        """Detener un servidor levantado con start_in_thread"""
+        if self._loop is None:
+            return
+
+        async def shutdown():
+            self._server.close()
+            for task in list(self._clients):
+                task.cancel()
+            await asyncio.gather(*self._clients, return_exceptions=True)
+            await self._server.wait_closed()
+
+        asyncio.run_coroutine_threadsafe(shutdown(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = None
+
+    # Conexiones
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.stats['connections'] += 1
+        session = {'logged_in': False, 'challenge': None}
+        tasks = set()
+        client = asyncio.current_task()
+        self._clients.add(client)
+
+        try:
+            while True:
+                words = await read_sentence(reader)
+                if not words:
+                    continue
+
+                command, attributes, queries, tag = parse_command(words)
+
+                if command == '/quit':
+                    writer.write(encode_sentence(['!fatal', 'session terminated on request']))
+                    break
+
+                if tag is None:
+                    # Sin tag las respuestas salen en orden
+                    await self._run_command(writer, session, command, attributes, queries, tag)
+                else:
+                    # Con tag se procesan en paralelo (pipelining)
+                    task = asyncio.ensure_future(
+                        self._run_command(writer, session, command, attributes, queries, tag)
+                    )
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+
+                await writer.drain()
+
+        except (asyncio.IncompleteReadError, ConnectionResetError, asyncio.CancelledError):
+            pass
+        except RouterOSProtocolError as e:
+            logger.warning(f"Mock RouterOS: {e}")
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
+            self._clients.discard(client)
+
+    async def _run_command(self, writer: asyncio.StreamWriter, session: Dict[str, Any],
+                           command: str, attributes: Dict[str, str], queries: Dict[str, str],
+                           tag: Optional[str]):
+        """Aplicar límites y latencia, ejecutar el comando y escribir la respuesta"""
+        self.stats['commands'] += 1
+
+        if self._bucket:
+            await self._bucket.acquire()
+
+        delay = self.config.latency
+        if self.config.jitter:
+            delay += self._rng.uniform(-self.config.jitter, self.config.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        if command != '/login' and self.config.trap_rate and self._rng.random() < self.config.trap_rate:
+            self.stats['injected_traps'] += 1
+            sentences = self._trap("mock injected failure")
+        else:
+            try:
+                sentences = self._dispatch(session, command, attributes, queries)
+            except Exception as e:
+                sentences = self._trap(str(e))
+
+        # Las respuestas se generan en streaming; cada escritura lleva
+        # sentencias completas y las grandes respetan el backpressure del socket
+        tag_word = [f".tag={tag}"] if tag is not None else []
+        chunk: List[bytes] = []
+        iterator = iter(sentences)
+        while True:
+            try:
+                sentence = next(iterator)
+            except StopIteration:
+                break
+            except Exception as e:
+                # Falla a mitad del print: !trap + !done, como RouterOS
+                iterator = iter(self._trap(str(e)))
+                continue
+            chunk.append(encode_sentence(sentence + tag_word))
+            if len(chunk) >= self.WRITE_CHUNK:
+                writer.write(b''.join(chunk))
+                chunk = []
+                await writer.drain()
+        if chunk:
+            writer.write(b''.join(chunk))
+
+    def _trap(self, message: str) -> List[List[str]]:
+        self.stats['traps'] += 1
+        return [['!trap', f'=message={message}'], ['!done']]
+
+    # Comandos
+
+    def _dispatch(self, session: Dict[str, Any], command: str,
+                  attributes: Dict[str, str], queries: Dict[str, str]) -> Iterable[List[str]]:
+        if command == '/login':
+            return self._login(session, attributes)
+
+        if not session['logged_in']:
+            return self._trap("not logged in")
+
+        if command == '/system/identity/print':
+            return [['!re', f'=name={self.config.identity}'], ['!done']]
+
+        path, _, action = command.rpartition('/')
+        if path == '/ppp/secret':
+            target = self.paths.ppp.secret
+        elif path == '/ppp/active':
+            target = self.paths.ppp.active
+        else:
+            return self._trap("no such command prefix")
+
+        if action == 'print':
+            return self._print(target, attributes, queries)
+        if action == 'set' and path == '/ppp/secret':
+            target.set(**attributes)
+            return [['!done']]
+        if action == 'add' and path == '/ppp/secret':
+            return [['!done', f'=ret={target.add(**attributes)}']]
+        if action == 'remove':
+            for item_id in attributes.get('.id', '').split(','):
+                target.remove(**{'.id': item_id})
+            return [['!done']]
+
+        return self._trap("no such command")
+
+    def _login(self, session: Dict[str, Any], attributes: Dict[str, str]) -> List[List[str]]:
+        username = attributes.get('name')
+
+        if username is None:
+            # Login por challenge (RouterOS < 6.43): primer /login sin argumentos
+            session['challenge'] = hexlify(self._rng.randbytes(16)).decode('ascii')
+            return [['!done', f"=ret={session['challenge']}"]]
+
+        if 'response' in attributes and session['challenge']:
+            hasher = md5()
+            hasher.update(b'\x00' + self.config.password.encode('ascii') + unhexlify(session['challenge']))
+            valid = attributes['response'] == '00' + hasher.hexdigest()
+        else:
+            valid = attributes.get('password') == self.config.password
+
+        if username != self.config.username or not valid:
+            return self._trap("invalid user name or password (6)")
+
+        session['logged_in'] = True
+        return [['!done']]
+
+    def _print(self, target: Any, attributes: Dict[str, str], queries: Dict[str, str]) -> Iterator[List[str]]:
+        # Los filtros por name/.id los resuelve el mock; el resto se filtra acá
+        filters = {**attributes, **queries}
+        filters.pop('.proplist', None)
+        lookup = {key: filters.pop(key) for key in ('.id', 'name') if key in filters}
+        if len(lookup) > 1:
+            lookup.pop('name')
+
+        rows = target.stream(**lookup)
+
+        if filters:
+            rows = (row for row in rows if all(row.get(key) == value for key, value in filters.items()))
+
+        proplist = attributes.get('.proplist')
+        keys = proplist.split(',') if proplist else None
+
+        for row in rows:
+            items = ((key, row[key]) for key in keys if key in row) if keys else row.items()
+            yield ['!re'] + [f'={key}={value}' for key, value in items]
+        yield ['!done']
+
+
+def main():
+    """Levantar el servidor mock desde la línea de comandos"""
+    parser = argparse.ArgumentParser(description="Servidor mock de RouterOS API")
+
+    parser.add_argument('--host', default='127.0.0.1', help='Dirección de escucha')
+    parser.add_argument('--port', type=int, default=8728, help='Puerto TCP')
+    parser.add_argument('--username', default='admin', help='Usuario válido')
+    parser.add_argument('--password', default='admin', help='Contraseña válida')
+    parser.add_argument('--users', type=int, default=1000, help='Usuarios PPPoE sintéticos (hasta 1M)')
+    parser.add_argument('--disabled-ratio', type=float, default=0.0, help='Fracción de usuarios deshabilitados')
+    parser.add_argument('--active-ratio', type=float, default=0.0, help='Fracción de usuarios con sesión activa')
+    parser.add_argument('--latency', type=float, default=0.0, help='Latencia por comando (segundos)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Jitter +/- sobre la latencia (segundos)')
+    parser.add_argument('--trap-rate', type=float, default=0.0, help='Fracción de comandos que responden !trap')
+    parser.add_argument('--max-rate', type=float, default=0.0, help='Comandos por segundo (0 = sin límite)')
+    parser.add_argument('--seed', type=int, help='Semilla para datos y fallas reproducibles')
+
+    args = parser.parse_args()
+
+    config = MockServerConfig(
+        host=args.host,
+        port=args.port,
+        username=args.username,
+        password=args.password,
+        users=args.users,
+        disabled_ratio=args.disabled_ratio,
+        active_ratio=args.active_ratio,
+        latency=args.latency,
+        jitter=args.jitter,
+        trap_rate=args.trap_rate,
+        max_commands_per_second=args.max_rate,
+        seed=args.seed
+    )
+
+    server = MockRouterOSServer(config)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        logger.info(f"Mock RouterOS detenido: {server.stats}")
+
+
+if __name__ == "__main__":
+    main()
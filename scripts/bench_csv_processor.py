@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Benchmark del CSV Processor - Nordia ISP Suite
+Tiempo y memoria por etapa sobre datasets de 1k a 5M filas, con curva de escala y baseline
+
+Uso:
+    python scripts/bench_csv_processor.py
+    python scripts/bench_csv_processor.py --sizes 1000 10000 100000 1000000 --encodings utf-8 latin-1 cp1252
+    python scripts/bench_csv_processor.py --error-rates 0 0.05 --save-baseline output/csv_bench_baseline.json
+    python scripts/bench_csv_processor.py --baseline output/csv_bench_baseline.json
+"""
+
+import sys
+import argparse
+from pathlib import Path
+from datetime import datetime
+from typing import List, Dict, Any
+
+# Add app to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+try:
+    from app.core.csv_benchmark import (
+        CSVBenchmark, CSVBenchmarkConfig, STAGES, ENCODINGS, PIPELINES,
+        save_results, load_results, compare_to_baseline
+    )
+    from rich.console import Console
+    from rich.table import Table
+    from rich.panel import Panel
+except ImportError as e:
+    print(f"❌ Error importando dependencias: {e}")
+    print("Instala las dependencias con: pip install -r requirements.txt")
+    sys.exit(1)
+
+console = Console()
+
+
+def show_runs(results: Dict[str, Any]):
+    """Tabla de tiempo/memoria por etapa para cada corrida"""
+    stages = results['meta']['stages']
+    table = Table(title="⏱️ Tiempo por etapa (s) y pico de memoria (MB)")
+    table.add_column("Pipeline", style="cyan")
+    table.add_column("Filas", justify="right")
+    table.add_column("Encoding")
+    table.add_column("Errores", justify="right")
+    for stage in stages:
+        table.add_column(stage, justify="right")
+    table.add_column("Total", style="bold", justify="right")
+    table.add_column("Filas/s", style="green", justify="right")
+    table.add_column("Pico MB", style="magenta", justify="right")
+
+    for run in results['runs']:
+        cells = []
+        for stage in stages:
+            data = run['stages'].get(stage, {})
+            cell = f"{data.get('time_s', 0):.3f}"
+            if 'peak_mb' in data:
+                cell += f"\n{data['peak_mb']:.1f}MB"
+            cells.append(cell)
+        table.add_row(
+            run['pipeline'], f"{run['rows']:,}", run['encoding'], f"{run['error_rate']:.0%}",
+            *cells,
+            f"{run['total_s']:.2f}", f"{run['rows_per_s']:,.0f}", f"{run['peak_mb']:.1f}"
+        )
+
+    console.print(table)
+
+
+def show_fits(results: Dict[str, Any]):
+    """Exponente de la curva t = a * n^b por etapa (1.0 = lineal)"""
+    stages = results['meta']['stages'] + ['total']
+    table = Table(title="📈 Curva de escala (exponente b en t = a·n^b, µs/fila en el mayor tamaño)")
+    table.add_column("Pipeline | encoding | errores", style="cyan")
+    for stage in stages:
+        table.add_column(stage, justify="right")
+
+    for key, fits in results['fits'].items():
+        cells = []
+        for stage in stages:
+            fit = fits.get(stage)
+            if not fit:
+                cells.append("-")
+                continue
+            style = "red" if fit['exponent'] > 1.2 else "green"
+            cells.append(f"[{style}]{fit['exponent']:.2f}[/{style}]\n{fit['us_per_row']:.1f}µs")
+        table.add_row(key, *cells)
+
+    console.print(table)
+
+
+def show_comparison(rows: List[Dict[str, Any]]) -> int:
+    """Diferencias contra baseline; retorna la cantidad de regresiones"""
+    flagged = [row for row in rows if row['status'] != 'ok']
+    regressions = sum(1 for row in rows if row['status'] == 'regression')
+    if not flagged:
+        console.print(f"[green]✅ {len(rows)} etapas comparadas, sin cambios fuera de tolerancia[/green]")
+        return 0
+
+    table = Table(title="📊 Cambios respecto del baseline")
+    table.add_column("Pipeline", style="cyan")
+    table.add_column("Filas", justify="right")
+    table.add_column("Encoding")
+    table.add_column("Errores", justify="right")
+    table.add_column("Etapa")
+    table.add_column("Baseline", justify="right")
+    table.add_column("Actual", justify="right")
+    table.add_column("Delta", justify="right")
+    table.add_column("Estado")
+
+    for row in flagged:
+        status = "[red]❌ Regresión[/red]" if row['status'] == 'regression' else "[green]✅ Mejora[/green]"
+        table.add_row(row['pipeline'], f"{row['rows']:,}", row['encoding'], f"{row['error_rate']:.0%}",
+                      row['stage'], f"{row['baseline']:.3f}s", f"{row['current']:.3f}s",
+                      f"{row['delta']:+.1%}", status)
+
+    console.print(table)
+    return regressions
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Benchmark del CSV Processor")
+    parser.add_argument("--sizes", type=int, nargs='+', default=[1000, 10000, 100000],
+                        help="Filas por dataset (hasta 5M)")
+    parser.add_argument("--encodings", nargs='+', choices=ENCODINGS, default=['utf-8'], help="Encodings a generar")
+    parser.add_argument("--error-rates", type=float, nargs='+', default=[0.0], help="Fracción de filas inválidas")
+    parser.add_argument("--pipelines", nargs='+', default=['legacy'], help=f"Pipelines ({', '.join(PIPELINES)})")
+    parser.add_argument("--stages", nargs='+', choices=STAGES, default=STAGES, help="Etapas a medir")
+    parser.add_argument("--repeat", type=int, default=1, help="Corridas de tiempo por combinación (mediana)")
+    parser.add_argument("--no-memory", action="store_true", help="Omitir la corrida con tracemalloc")
+    parser.add_argument("--data-dir", help="Directorio para generar/reutilizar datasets (por defecto, temporal)")
+    parser.add_argument("--seed", type=int, default=42, help="Semilla de los datasets")
+    parser.add_argument("--output", help="JSON de resultados (por defecto output/csv_bench_<fecha>.json)")
+    parser.add_argument("--baseline", help="Baseline JSON contra el cual comparar")
+    parser.add_argument("--save-baseline", help="Guardar también los resultados como baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Aumento aceptado antes de marcar regresión")
+
+    args = parser.parse_args()
+
+    config = CSVBenchmarkConfig(
+        sizes=args.sizes,
+        encodings=args.encodings,
+        error_rates=args.error_rates,
+        pipelines=args.pipelines,
+        stages=args.stages,
+        repeat=args.repeat,
+        trace_memory=not args.no_memory,
+        data_dir=args.data_dir,
+        seed=args.seed
+    )
+
+    console.print(Panel.fit("🚀 [bold cyan]BENCHMARK CSV PROCESSOR[/bold cyan]"))
+
+    try:
+        with console.status("Preparando datasets...") as status:
+            results = CSVBenchmark(config).run(progress_callback=lambda text: status.update(f"Midiendo {text}..."))
+    except KeyboardInterrupt:
+        console.print("\n[yellow]Benchmark interrumpido por el usuario[/yellow]")
+        sys.exit(1)
+    except Exception as e:
+        console.print(f"[red]Error ejecutando benchmark: {e}[/red]")
+        sys.exit(1)
+
+    show_runs(results)
+    show_fits(results)
+
+    output = Path(args.output or f"output/csv_bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    save_results(results, output)
+    console.print(f"💾 Resultados guardados: {output}")
+
+    if args.save_baseline:
+        save_results(results, args.save_baseline)
+        console.print(f"📌 Baseline guardado: {args.save_baseline}")
+
+    if args.baseline:
+        regressions = show_comparison(compare_to_baseline(results, load_results(args.baseline), args.tolerance))
+        if regressions:
+            console.print(f"[red]❌ {regressions} regresiones respecto del baseline[/red]")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Nordia ISP Suite - Benchmark de Router Mikrotik
+Latencia por operación (p50/p95/p99/max) y throughput, con comparación contra baseline
+
+Funcionalidades:
+- Transportes: mock, tcp-mock (servidor RouterOS simulado), api y ssh (router real)
+- Usuarios, concurrencia, iteraciones, rate_limit_delay y tamaño de chunk configurables
+- Resultados en JSON
+- Comparación contra un baseline; sale con código 1 si hay regresiones y 2 si el baseline
+  se midió con otros parámetros (transporte, usuarios, latencia, escrituras...)
+
+Uso:
+    python scripts/bench_mikrotik.py --transport tcp-mock --users 50000 --concurrency 4
+    python scripts/bench_mikrotik.py --transport mock --save-baseline output/bench_baseline.json
+    python scripts/bench_mikrotik.py --transport mock --baseline output/bench_baseline.json
+    python scripts/bench_mikrotik.py --transport api --host 192.168.1.1 --no-writes
+"""
+
+import os
+import sys
+import argparse
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, Any, List
+from rich.console import Console
+from rich.table import Table
+from rich.panel import Panel
+from rich.prompt import Prompt, Confirm
+from loguru import logger
+
+# Agregar path del proyecto
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.mikrotik.connection import ConnectionConfig
+from app.mikrotik.benchmark import (
+    RouterBenchmark, BenchmarkConfig, OPERATIONS, TRANSPORTS,
+    save_results, load_results, compare_to_baseline, IncomparableBaselineError
+)
+
+console = Console()
+
+
+def print_results(results: Dict[str, Any]):
+    """Tabla de latencias y throughput por operación"""
+    meta = results['meta']
+    table = Table(title=f"⚡ Benchmark {meta['transport']} - {meta['users']} usuarios, "
+                        f"{meta['concurrency']} workers")
+    table.add_column("Operación", style="cyan")
+    table.add_column("N", style="white", justify="right")
+    table.add_column("Errores", style="red", justify="right")
+    table.add_column("p50", style="green", justify="right")
+    table.add_column("p95", style="yellow", justify="right")
+    table.add_column("p99", style="yellow", justify="right")
+    table.add_column("Max", style="magenta", justify="right")
+    table.add_column("Ops/s", style="blue", justify="right")
+    table.add_column("Usuarios/s", style="blue", justify="right")
+
+    for operation, data in results['operations'].items():
+        table.add_row(
+            operation,
+            str(data['count']),
+            str(data['errors']),
+            f"{data['p50_ms']:.2f}ms",
+            f"{data['p95_ms']:.2f}ms",
+            f"{data['p99_ms']:.2f}ms",
+            f"{data['max_ms']:.2f}ms",
+            f"{data['throughput_ops_s']:.1f}",
+            f"{data['throughput_items_s']:.0f}" if 'throughput_items_s' in data else "-"
+        )
+
+    console.print(table)
+
+    simulated = {op: data for op, data in results['operations'].items() if 'simulated_p95_ms' in data}
+    if simulated:
+        sim_table = Table(title="⏱️ Latencia simulada (reloj virtual del mock)")
+        sim_table.add_column("Operación", style="cyan")
+        sim_table.add_column("p50", style="green", justify="right")
+        sim_table.add_column("p95", style="yellow", justify="right")
+        sim_table.add_column("p99", style="yellow", justify="right")
+        for operation, data in simulated.items():
+            sim_table.add_row(operation, f"{data['simulated_p50_ms']:.2f}ms",
+                              f"{data['simulated_p95_ms']:.2f}ms", f"{data['simulated_p99_ms']:.2f}ms")
+        console.print(sim_table)
+
+
+def print_comparison(rows: List[Dict[str, Any]]) -> int:
+    """Tabla de diferencias contra el baseline; retorna la cantidad de regresiones"""
+    table = Table(title="📊 Comparación contra baseline")
+    table.add_column("Operación", style="cyan")
+    table.add_column("Métrica", style="white")
+    table.add_column("Baseline", justify="right")
+    table.add_column("Actual", justify="right")
+    table.add_column("Delta", justify="right")
+    table.add_column("Estado")
+
+    styles = {'regression': "[red]❌ Regresión[/red]", 'improvement': "[green]✅ Mejora[/green]", 'ok': "OK"}
+    for row in rows:
+        table.add_row(row['operation'], row['metric'], f"{row['baseline']:.2f}", f"{row['current']:.2f}",
+                      f"{row['delta']:+.1%}", styles[row['status']])
+
+    console.print(table)
+    return sum(1 for row in rows if row['status'] == 'regression')
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Benchmark de operaciones Mikrotik")
+
+    parser.add_argument('--transport', choices=TRANSPORTS, default='mock', help='Transporte a medir')
+    parser.add_argument('--host', default='192.168.1.1', help='IP del router (api/ssh)')
+    parser.add_argument('--port', type=int, default=8728, help='Puerto (API: 8728, SSH: 22)')
+    parser.add_argument('--username', default='admin', help='Usuario (api/ssh)')
+    parser.add_argument('--password', help='Contraseña (prompt si no se proporciona)')
+    parser.add_argument('--users', type=int, default=1000, help='Usuarios sintéticos (mock/tcp-mock)')
+    parser.add_argument('--concurrency', type=int, default=1, help='Workers en paralelo')
+    parser.add_argument('--iterations', type=int, default=50, help='Muestras por operación puntual')
+    parser.add_argument('--print-iterations', type=int, default=5, help='Muestras por print completo')
+    parser.add_argument('--warmup', type=int, default=5, help='Lecturas de warmup sin medir')
+    parser.add_argument('--operations', nargs='+', choices=OPERATIONS, default=list(OPERATIONS),
+                        help='Operaciones a medir')
+    parser.add_argument('--no-writes', action='store_true', help='Omitir disable/enable')
+    parser.add_argument('--bulk-users', type=int, default=500, help='Usuarios por llamada bulk')
+    parser.add_argument('--chunk-size', type=int, default=200, help='.id por comando set en bulk')
+    parser.add_argument('--rate-limit-delay', type=float, help='Segundos entre comandos (por defecto, el de la conexión)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Latencia simulada por comando (mock/tcp-mock)')
+    parser.add_argument('--seed', type=int, default=42, help='Semilla para datos y selección de usuarios')
+    parser.add_argument('--output', help='Archivo JSON de resultados (por defecto output/bench_mikrotik_<fecha>.json)')
+    parser.add_argument('--baseline', help='Baseline JSON contra el cual comparar')
+    parser.add_argument('--save-baseline', help='Guardar también los resultados como baseline')
+    parser.add_argument('--tolerance', type=float, default=0.15, help='Variación aceptada antes de marcar regresión')
+
+    args = parser.parse_args()
+
+    connection = None
+    if args.transport in ('api', 'ssh'):
+        if not args.password:
+            args.password = Prompt.ask("Contraseña del router", password=True)
+        connection = ConnectionConfig(
+            host=args.host,
+            port=args.port,
+            username=args.username,
+            password=args.password,
+            connection_type=args.transport
+        )
+        action = "solo lecturas" if args.no_writes else "lecturas y disable/enable de usuarios habilitados"
+        if not Confirm.ask(f"¿Ejecutar benchmark contra router real {args.host}? ({action})"):
+            console.print("❌ Benchmark cancelado por el usuario")
+            return
+
+    config = BenchmarkConfig(
+        transport=args.transport,
+        users=args.users,
+        concurrency=args.concurrency,
+        iterations=args.iterations,
+        print_iterations=args.print_iterations,
+        warmup=args.warmup,
+        operations=tuple(args.operations),
+        writes=not args.no_writes,
+        bulk_users=args.bulk_users,
+        chunk_size=args.chunk_size,
+        rate_limit_delay=args.rate_limit_delay,
+        latency=args.latency,
+        seed=args.seed,
+        connection=connection
+    )
+
+    console.print(Panel.fit(
+        "[bold yellow]⚡ NORDIA ISP SUITE - BENCHMARK MIKROTIK[/bold yellow]",
+        border_style="yellow"
+    ))
+
+    try:
+        with console.status("Preparando benchmark...") as status:
+            results = RouterBenchmark(config).run(
+                progress_callback=lambda operation: status.update(f"Midiendo {operation}...")
+            )
+    except KeyboardInterrupt:
+        console.print("\n❌ Benchmark interrumpido por el usuario")
+        sys.exit(1)
+    except Exception as e:
+        console.print(f"❌ Error en benchmark: {str(e)}")
+        logger.error(f"Benchmark error: {str(e)}")
+        sys.exit(1)
+
+    print_results(results)
+
+    output = Path(args.output or f"output/bench_mikrotik_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    save_results(results, output)
+    console.print(f"💾 Resultados guardados: {output}")
+
+    if args.save_baseline:
+        save_results(results, args.save_baseline)
+        console.print(f"📌 Baseline guardado: {args.save_baseline}")
+
+    if args.baseline:
+        try:
+            rows = compare_to_baseline(results, load_results(args.baseline), args.tolerance)
+        except IncomparableBaselineError as e:
+            console.print(f"[yellow]⚠️ {e}: no se comparan métricas[/yellow]")
+            sys.exit(2)
+        regressions = print_comparison(rows)
+        if regressions:
+            console.print(f"[red]❌ {regressions} regresiones respecto del baseline[/red]")
+            sys.exit(1)
+        console.print("[green]✅ Sin regresiones respecto del baseline[/green]")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Benchmark de notificaciones - Nordia ISP Suite
+Envío secuencial (histórico) contra el dispatcher con concurrencia y ritmo por
+canal, usando un stub HTTP local en lugar de Twilio/SMTP
+
+Uso:
+    python scripts/bench_notifications.py
+    python scripts/bench_notifications.py --clients 5000 --latency-ms 150
+    python scripts/bench_notifications.py --whatsapp 32:50 --sms 16:20 --email 4:10   # concurrencia:mensajes/s
+    python scripts/bench_notifications.py --fail-rate 0.05
+    python scripts/bench_notifications.py --processor     # MorosidadProcessor.process_batch completo
+"""
+
+import re
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import threading
+from pathlib import Path
+from collections import defaultdict
+from typing import Any, Dict, List
+
+# Servicios del backend de la UI
+sys.path.insert(0, str(Path(__file__).parent.parent / "ui" / "backend"))
+
+try:
+    import pandas as pd
+    from services.notify_dispatch import (
+        ChannelLimits, DEFAULT_CHANNEL_LIMITS, HTTPProvider, Notification, NotificationDispatcher
+    )
+    from rich.console import Console
+    from rich.table import Table
+except ImportError as e:
+    print(f"❌ Error importando dependencias: {e}")
+    print("Instala las dependencias con: pip install httpx rich pandas")
+    sys.exit(1)
+
+console = Console()
+
+CHANNELS = ("whatsapp", "sms", "email")
+SEQUENCE = re.compile(r"^\[(?P<subscriber>[^#\]]+)#(?P<seq>\d+)\]")
+
+
+class StubProviderServer:
+    """Stub HTTP de proveedor: POST /<canal> responde 201 después de `latency` segundos.
+
+    Corre en su propio hilo y event loop, como un servicio externo. Registra el
+    orden de llegada por suscriptor y el pico de requests simultáneos por canal.
+    """
+
+    def __init__(self, latency: float, fail_rate: float = 0.0, seed: int = 42):
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.random = random.Random(seed)
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.server = None
+        self.port = 0
+        self.reset()
+
+    def reset(self):
+        self.received: Dict[str, int] = defaultdict(int)
+        self.inflight: Dict[str, int] = defaultdict(int)
+        self.max_inflight: Dict[str, int] = defaultdict(int)
+        self.order: Dict[str, List[int]] = defaultdict(list)
+
+    def start(self) -> str:
+        self.thread.start()
+        future = asyncio.run_coroutine_threadsafe(asyncio.start_server(self._handle, "127.0.0.1", 0), self.loop)
+        self.server = future.result()
+        self.port = self.server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{self.port}"
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.server.close)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=5)
+
+    def ordering_violations(self) -> int:
+        return sum(1 for seqs in self.order.values() if seqs != sorted(seqs))
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                channel = request_line.split()[1].decode().strip("/")
+
+                self.inflight[channel] += 1
+                self.max_inflight[channel] = max(self.max_inflight[channel], self.inflight[channel])
+                await asyncio.sleep(self.latency)
+                self.inflight[channel] -= 1
+
+                payload = json.loads(body)
+                match = SEQUENCE.match(payload.get("body") or "")
+                if match:
+                    self.order[match.group("subscriber")].append(int(match.group("seq")))
+
+                if self.fail_rate and self.random.random() < self.fail_rate:
+                    status, response = b"503 Service Unavailable", b'{"error": "stub"}'
+                else:
+                    self.received[channel] += 1
+                    status = b"201 Created"
+                    response = json.dumps({"sid": f"SM{sum(self.received.values()):032x}"}).encode()
+                writer.write(b"HTTP/1.1 " + status + b"\r\nContent-Type: application/json\r\n"
+                             b"Content-Length: " + str(len(response)).encode() + b"\r\n\r\n" + response)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+
+def build_notifications(clients: int) -> List[Notification]:
+    """Aviso (WhatsApp + email) o corte (WhatsApp + SMS) alternados, en orden por suscriptor"""
+    notifications = []
+    for i in range(clients):
+        dni = f"{30000000 + i}"
+        phone = f"+54937940{i:05d}"
+        if i % 2:
+            sends = [("whatsapp", phone, "whatsapp_warning"), ("email", f"cliente{i}@example.com", "email_warning")]
+        else:
+            sends = [("whatsapp", phone, "notificacion_corte"), ("sms", phone, "notificacion_corte")]
+        for seq, (channel, to, tipo) in enumerate(sends):
+            notifications.append(Notification(dni, channel, to, f"[{dni}#{seq}] Aviso de mora", tipo,
+                                              subject="Aviso" if channel == "email" else None))
+    return notifications
+
+
+def parse_limits(args: argparse.Namespace) -> Dict[str, ChannelLimits]:
+    limits = {}
+    for channel in CHANNELS:
+        value = getattr(args, channel)
+        if value:
+            concurrency, _, rate = value.partition(":")
+            rate_value = float(rate) if rate else 0.0
+            limits[channel] = ChannelLimits(int(concurrency), rate_value, max(1, int(rate_value)))
+        else:
+            limits[channel] = DEFAULT_CHANNEL_LIMITS[channel]
+    return limits
+
+
+def http_providers(base_url: str, limits: Dict[str, ChannelLimits]) -> Dict[str, HTTPProvider]:
+    """Un cliente HTTP por canal, con tantas conexiones como envíos simultáneos permite el canal"""
+    return {channel: HTTPProvider(base_url, max_connections=limits[channel].concurrency) for channel in CHANNELS}
+
+
+async def run_sequential(base_url: str, notifications: List[Notification], sample: int) -> Dict[str, Any]:
+    """Envío histórico: una notificación a la vez (sobre una muestra, extrapolando el total)"""
+    provider = HTTPProvider(base_url, max_connections=1)
+    measured = notifications[:sample] if sample else notifications
+    errors = 0
+    start = time.perf_counter()
+    try:
+        for notification in measured:
+            try:
+                await provider.send(notification)
+            except Exception:
+                errors += 1
+    finally:
+        await provider.aclose()
+    scale = len(notifications) / len(measured)
+    return {"elapsed": (time.perf_counter() - start) * scale, "errors": round(errors * scale),
+            "estimated": len(measured) < len(notifications)}
+
+
+async def run_dispatcher(base_url: str, notifications: List[Notification],
+                         limits: Dict[str, ChannelLimits]) -> Dict[str, Any]:
+    dispatcher = NotificationDispatcher(http_providers(base_url, limits), limits)
+    start = time.perf_counter()
+    deliveries = await dispatcher.dispatch(notifications)
+    return {"elapsed": time.perf_counter() - start, "errors": sum(not d.ok for d in deliveries),
+            "stats": dispatcher.stats()}
+
+
+def run_processor(base_url: str, clients: int, limits: Dict[str, ChannelLimits]) -> Dict[str, Any]:
+    """process_batch completo en modo simulación, con el stub como proveedor de los tres canales"""
+    from app.services.mikrotik_service import MorosidadProcessor, NotificationSystem
+
+    rows = []
+    for i in range(clients):
+        rows.append({
+            "nombre": f"Cliente {i}", "dni": f"{30000000 + i}", "telefono": f"+54937940{i:05d}",
+            "email": f"cliente{i}@example.com", "monto_deuda": 15000 + i, "dias_mora": 27 if i % 2 else 35,
+            "ip_address": f"10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}",
+        })
+    with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as tmp:
+        pd.DataFrame(rows).to_csv(tmp.name, index=False)
+
+    outbox_dir = tempfile.TemporaryDirectory()
+    notifier = NotificationSystem(providers=http_providers(base_url, limits), limits=limits,
+                                  outbox_path=str(Path(outbox_dir.name) / "outbox.sqlite3"))
+    processor = MorosidadProcessor(mode="simulation", notifier=notifier)
+    start = time.perf_counter()
+    resultados = processor.process_batch(tmp.name)
+    elapsed = time.perf_counter() - start
+    notifier.outbox.close()
+    outbox_dir.cleanup()
+    Path(tmp.name).unlink()
+    notificaciones = resultados["notificaciones"]
+    return {"elapsed": elapsed, "errors": notificaciones["retry"] + notificaciones["dead"], "resultados": resultados}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del dispatcher de notificaciones contra un stub local")
+    parser.add_argument("--clients", type=int, default=500, help="Clientes (2 notificaciones por cliente)")
+    parser.add_argument("--latency-ms", type=float, default=150, help="Latencia simulada del proveedor")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Fracción de envíos que el stub rechaza (503)")
+    for channel in CHANNELS:
+        parser.add_argument(f"--{channel}", help="concurrencia:mensajes_por_segundo (0 = sin límite de ritmo)")
+    parser.add_argument("--sequential-sample", type=int, default=200,
+                        help="Notificaciones medidas en el envío secuencial (0 = todas)")
+    parser.add_argument("--skip-sequential", action="store_true", help="No correr el envío secuencial")
+    parser.add_argument("--processor", action="store_true", help="Medir MorosidadProcessor.process_batch completo")
+    args = parser.parse_args()
+
+    limits = parse_limits(args)
+    stub = StubProviderServer(args.latency_ms / 1000, args.fail_rate)
+    base_url = stub.start()
+    notifications = build_notifications(args.clients)
+    console.print(f"📡 Stub de proveedor en {base_url} — {args.clients} clientes, {len(notifications)} "
+                  f"notificaciones, latencia {args.latency_ms:.0f} ms")
+
+    runs = []
+    try:
+        if not args.skip_sequential:
+            result = asyncio.run(run_sequential(base_url, notifications, args.sequential_sample))
+            name = "secuencial (estimado)" if result["estimated"] else "secuencial"
+            runs.append((name, result, dict(stub.max_inflight), stub.ordering_violations()))
+            stub.reset()
+        runs.append(("dispatcher", asyncio.run(run_dispatcher(base_url, notifications, limits)),
+                     dict(stub.max_inflight), stub.ordering_violations()))
+        stub.reset()
+        if args.processor:
+            result = run_processor(base_url, args.clients, limits)
+            runs.append(("process_batch", result, dict(stub.max_inflight), None))
+            stub.reset()
+    finally:
+        stub.stop()
+
+    table = Table(title="📨 Fan-out de notificaciones")
+    table.add_column("Modo", style="cyan")
+    table.add_column("Tiempo (s)", justify="right")
+    table.add_column("Notif/s", style="green", justify="right")
+    table.add_column("Errores", style="red", justify="right")
+    table.add_column("Pico simultáneo (wa/sms/email)", justify="right")
+    table.add_column("Orden violado", justify="right")
+    for name, result, max_inflight, violations in runs:
+        table.add_row(
+            name, f"{result['elapsed']:.2f}", f"{len(notifications) / result['elapsed']:,.0f}", str(result["errors"]),
+            "/".join(str(max_inflight.get(channel, 0)) for channel in CHANNELS),
+            "-" if violations is None else str(violations),
+        )
+    console.print(table)
+
+    limits_table = Table(title="Límites por canal")
+    limits_table.add_column("Canal", style="cyan")
+    limits_table.add_column("Concurrencia", justify="right")
+    limits_table.add_column("Mensajes/s", justify="right")
+    for channel, limit in limits.items():
+        limits_table.add_row(channel, str(limit.concurrency), f"{limit.rate_per_second:g}" if limit.rate_per_second else "sin límite")
+    console.print(limits_table)
+
+    if not args.skip_sequential:
+        legacy = runs[0][1]["elapsed"] + args.clients  # process_batch dormía 1 s por cliente
+        console.print(f"⏳ Histórico estimado con sleep(1) por cliente: {legacy / 60:.1f} min")
+    for name, result, _, _ in runs:
+        if "resultados" in result:
+            resultados = {key: value for key, value in result["resultados"].items() if key != "detalles"}
+            console.print(f"📋 resultados de process_batch: {resultados}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark del pipeline de process_batch - Nordia ISP Suite
+Corre MorosidadProcessor.process_batch en modo producción contra un router
+simulado (latencia fija por comando SSH) con distintos tamaños del pool del
+router, y muestra los contadores de cada etapa
+
+Uso:
+    python scripts/bench_pipeline.py
+    python scripts/bench_pipeline.py --clients 5000 --ssh-latency-ms 5 --workers 1 4 8
+"""
+
+import sys
+import time
+import random
+import argparse
+import tempfile
+from pathlib import Path
+from typing import Any, Dict
+
+# Servicios del backend de la UI
+sys.path.insert(0, str(Path(__file__).parent.parent / "ui" / "backend"))
+
+try:
+    import pandas as pd
+    from app.services.mikrotik_service import MIKROTIK_CONFIG, MikroTikController, MorosidadProcessor, NotificationSystem
+    from rich.console import Console
+    from rich.table import Table
+except ImportError as e:
+    print(f"❌ Error importando dependencias: {e}")
+    print("Instala las dependencias con: pip install -r requirements.txt")
+    sys.exit(1)
+
+console = Console()
+
+
+class SimulatedRouter(MikroTikController):
+    """Router que acepta todos los comandos con una latencia fija"""
+
+    latency = 0.005
+
+    def execute_command(self, command: str) -> str:
+        time.sleep(self.latency)
+        return ""
+
+
+def build_csv(path: Path, clients: int):
+    random.seed(42)
+    rows = [{
+        "nombre": f"Cliente {i}", "dni": f"{30000000 + i}", "telefono": f"+54937940{i:05d}",
+        "email": f"cliente{i}@example.com", "monto_deuda": random.choice((15000, 22000, 31000)),
+        "dias_mora": random.choice((10, 27, 30, 45, 60)), "excepcion": random.random() < 0.05,
+        "pago_recibido": random.random() < 0.2, "ip_address": f"10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}",
+    } for i in range(clients)]
+    pd.DataFrame(rows).to_csv(path, index=False)
+
+
+def run(csv_path: Path, outbox_path: Path, workers: int) -> Dict[str, Any]:
+    processor = MorosidadProcessor(mode="production", notifier=NotificationSystem(outbox_path=str(outbox_path)))
+    processor.mikrotik = SimulatedRouter(MIKROTIK_CONFIG)
+    start = time.perf_counter()
+    # Sin envío: el benchmark mide decisión, encolado y router
+    resultados = processor.process_batch(str(csv_path), flush_notifications=False, router_workers=workers)
+    elapsed = time.perf_counter() - start
+    processor.notifier.outbox.close()
+    return {"elapsed": elapsed, "resultados": resultados}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del pipeline de process_batch")
+    parser.add_argument("--clients", type=int, default=2000, help="Clientes del CSV")
+    parser.add_argument("--ssh-latency-ms", type=float, default=5, help="Latencia simulada por comando SSH")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8], help="Hilos del pool del router")
+    args = parser.parse_args()
+    SimulatedRouter.latency = args.ssh_latency_ms / 1000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / "morosos.csv"
+        build_csv(csv_path, args.clients)
+        runs = [(workers, run(csv_path, Path(tmp) / f"outbox_{workers}.sqlite3", workers)) for workers in args.workers]
+
+    counters = ("total_procesados", "notificados", "cortados", "reactivados", "errores")
+    table = Table(title=f"🏭 process_batch: {args.clients:,} clientes, {args.ssh_latency_ms:g} ms por comando SSH")
+    table.add_column("Router workers", style="cyan", justify="right")
+    table.add_column("Tiempo (s)", justify="right")
+    table.add_column("Suma de etapas (s)", justify="right")
+    for stage in ("decision", "encolado", "router"):
+        table.add_column(f"{stage} ítems/s", justify="right")
+    for workers, result in runs:
+        etapas = result["resultados"]["etapas"]
+        busy = sum(etapa["busy_s"] / etapa["workers"] for etapa in etapas.values())
+        table.add_row(
+            str(workers), f"{result['elapsed']:.2f}", f"{busy:.2f}",
+            *(f"{etapas[stage]['items_per_s']:,.0f}" for stage in ("decision", "encolado", "router")),
+        )
+    console.print(table)
+
+    first = {key: runs[0][1]["resultados"][key] for key in counters}
+    if all({key: result["resultados"][key] for key in counters} == first for _, result in runs):
+        console.print(f"✅ Mismos contadores en todas las corridas: {first}")
+    else:
+        console.print("❌ Los contadores difieren entre corridas")
+
+
+if __name__ == "__main__":
+    main()
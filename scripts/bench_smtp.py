@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Benchmark de envío SMTP - Nordia ISP Suite
+Compara una conexión por email (envío histórico) contra el pool de sesiones,
+contra un sink SMTP local (aiosmtpd) que simula la latencia del handshake
+
+Uso:
+    python scripts/bench_smtp.py
+    python scripts/bench_smtp.py --messages 2000 --connections 1 4 8 --connect-latency-ms 80
+    python scripts/bench_smtp.py --fail-every 50          # el sink corta cada 50 mensajes (reconexión)
+    python scripts/bench_smtp.py --rate 100               # límite del proveedor en mensajes/s
+"""
+
+import sys
+import time
+import socket
+import asyncio
+import argparse
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from email.message import EmailMessage
+from typing import Any, Dict, List
+
+# Servicios del backend de la UI
+sys.path.insert(0, str(Path(__file__).parent.parent / "ui" / "backend"))
+
+try:
+    import smtplib
+    from aiosmtpd.controller import Controller
+    from services.smtp_pool import SMTPPool, ProviderLimits
+    from rich.console import Console
+    from rich.table import Table
+except ImportError as e:
+    print(f"❌ Error importando dependencias: {e}")
+    print("Instala las dependencias con: pip install aiosmtpd rich")
+    sys.exit(1)
+
+console = Console()
+
+
+class SinkHandler:
+    """Sink que acepta todo, con latencia por conexión y por mensaje"""
+
+    def __init__(self, connect_latency: float, message_latency: float, fail_every: int = 0):
+        self.connect_latency = connect_latency
+        self.message_latency = message_latency
+        self.fail_every = fail_every
+        self.connections = 0
+        self.seen = 0
+        self.received = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        # STARTTLS + AUTH contra un proveedor real cuestan varios round-trips por sesión
+        self.connections += 1
+        await asyncio.sleep(self.connect_latency)
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        await asyncio.sleep(self.message_latency)
+        self.seen += 1
+        if self.fail_every and self.seen % self.fail_every == 0:
+            return "421 4.3.2 Sink: cierre de sesión simulado"
+        self.received += 1
+        return "250 OK"
+
+    def reset(self):
+        self.connections = self.seen = self.received = 0
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def build_messages(count: int) -> List[EmailMessage]:
+    messages = []
+    for i in range(count):
+        msg = EmailMessage()
+        msg["Subject"] = "⚠️ Aviso de Vencimiento - ISP Network"
+        msg["From"] = "isp-notificaciones@example.com"
+        msg["To"] = f"cliente{i:05d}@example.com"
+        msg.set_content(f"<p>Estimado/a cliente {i}, su saldo está pendiente.</p>", subtype="html")
+        messages.append(msg)
+    return messages
+
+
+def run_per_message(host: str, port: int, messages: List[EmailMessage]) -> Dict[str, Any]:
+    """Envío histórico: conectar, EHLO, enviar y QUIT por cada email"""
+    errors = 0
+    start = time.perf_counter()
+    for msg in messages:
+        try:
+            with smtplib.SMTP(host, port, timeout=30) as server:
+                server.ehlo()
+                server.send_message(msg)
+        except smtplib.SMTPException:
+            errors += 1
+    return {"elapsed": time.perf_counter() - start, "errors": errors, "reconnects": 0}
+
+
+def run_pool(host: str, port: int, messages: List[EmailMessage], connections: int,
+             per_connection: int, rate: float) -> Dict[str, Any]:
+    """Pool de sesiones, con un hilo por conexión permitida"""
+    limits = ProviderLimits(max_connections=connections, messages_per_connection=per_connection,
+                            rate_per_second=rate, burst=max(1, int(rate)))
+    pool = SMTPPool(host, port, starttls=False, limits=limits)
+    errors = 0
+
+    def send(msg: EmailMessage) -> bool:
+        try:
+            pool.send(msg)
+            return True
+        except smtplib.SMTPException:
+            return False
+
+    start = time.perf_counter()
+    with pool, ThreadPoolExecutor(max_workers=connections) as executor:
+        for ok in executor.map(send, messages):
+            errors += not ok
+    elapsed = time.perf_counter() - start
+    stats = pool.stats()
+    return {"elapsed": elapsed, "errors": errors, "reconnects": stats["reconnects"],
+            "throttled_s": stats["throttled_s"]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del pool SMTP contra un sink local")
+    parser.add_argument("--messages", type=int, default=500, help="Emails por corrida")
+    parser.add_argument("--connections", type=int, nargs="+", default=[1, 4], help="Sesiones del pool")
+    parser.add_argument("--per-connection", type=int, default=100, help="Mensajes por sesión antes de reconectar")
+    parser.add_argument("--rate", type=float, default=0, help="Límite del proveedor en mensajes/s (0 = sin límite)")
+    parser.add_argument("--connect-latency-ms", type=float, default=50, help="Latencia simulada del handshake")
+    parser.add_argument("--message-latency-ms", type=float, default=2, help="Latencia simulada por mensaje")
+    parser.add_argument("--fail-every", type=int, default=0, help="Responder 421 cada N mensajes (0 = nunca)")
+    parser.add_argument("--port", type=int, default=0, help="Puerto del sink (0 = uno libre)")
+    parser.add_argument("--skip-baseline", action="store_true", help="No correr el envío de una conexión por email")
+    args = parser.parse_args()
+
+    handler = SinkHandler(args.connect_latency_ms / 1000, args.message_latency_ms / 1000, args.fail_every)
+    host, port = "127.0.0.1", args.port or free_port()
+    controller = Controller(handler, hostname=host, port=port)
+    controller.start()
+    messages = build_messages(args.messages)
+    console.print(f"📮 Sink SMTP en {host}:{port} — {args.messages} emails por corrida, "
+                  f"handshake {args.connect_latency_ms:.0f} ms, mensaje {args.message_latency_ms:.0f} ms")
+
+    runs = []
+    try:
+        if not args.skip_baseline:
+            result = run_per_message(host, port, messages)
+            runs.append(("1 conexión por email", result, handler.connections, handler.received))
+            handler.reset()
+        for connections in args.connections:
+            result = run_pool(host, port, messages, connections, args.per_connection, args.rate)
+            runs.append((f"pool x{connections}", result, handler.connections, handler.received))
+            handler.reset()
+    finally:
+        controller.stop()
+
+    table = Table(title="✉️ Throughput de envío SMTP")
+    table.add_column("Modo", style="cyan")
+    table.add_column("Tiempo (s)", justify="right")
+    table.add_column("Emails/s", style="green", justify="right")
+    table.add_column("Conexiones", justify="right")
+    table.add_column("Reconexiones", justify="right")
+    table.add_column("Recibidos", justify="right")
+    table.add_column("Errores", style="red", justify="right")
+    table.add_column("Espera por límite (s)", justify="right")
+    table.add_column("Speedup", style="bold", justify="right")
+
+    baseline = runs[0][1]["elapsed"] if not args.skip_baseline else None
+    for name, result, connections, received in runs:
+        speedup = f"{baseline / result['elapsed']:.1f}x" if baseline else "-"
+        table.add_row(
+            name, f"{result['elapsed']:.2f}", f"{args.messages / result['elapsed']:,.0f}",
+            str(connections), str(result["reconnects"]), str(received), str(result["errors"]),
+            f"{result.get('throttled_s', 0):.2f}", speedup,
+        )
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
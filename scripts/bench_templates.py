@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark de plantillas de notificaciones - Nordia ISP Suite
+Compara el render por cliente con Jinja (un Template.render por mensaje) contra
+render_batch() sobre un lote columnar, con las plantillas precompiladas del tenant
+
+Uso:
+    python scripts/bench_templates.py
+    python scripts/bench_templates.py --clients 100000 --tenant default
+    python scripts/bench_templates.py --montos 20          # montos distintos (aciertos de caché en SMS)
+"""
+
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+from typing import Dict, List
+
+# Servicios del backend de la UI
+sys.path.insert(0, str(Path(__file__).parent.parent / "ui" / "backend"))
+
+try:
+    from services.notify_templates import NotificationTemplates
+    from rich.console import Console
+    from rich.table import Table
+except ImportError as e:
+    print(f"❌ Error importando dependencias: {e}")
+    print("Instala las dependencias con: pip install -r requirements.txt")
+    sys.exit(1)
+
+console = Console()
+
+
+def build_columns(count: int, montos: int) -> Dict[str, List]:
+    """Lote columnar de clientes sintéticos"""
+    amounts = [1500 + 500 * i for i in range(montos)]
+    return {
+        "nombre": [f"Cliente {i:06d}" for i in range(count)],
+        "dni": [str(30000000 + i) for i in range(count)],
+        "monto_deuda": [random.choice(amounts) for _ in range(count)],
+        "dias_mora": [random.choice((27, 30, 45, 60)) for _ in range(count)],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de render de notificaciones")
+    parser.add_argument("--clients", type=int, default=50000, help="Mensajes por plantilla")
+    parser.add_argument("--montos", type=int, default=50, help="Montos de deuda distintos en el lote")
+    parser.add_argument("--tenant", default=None, help="Tenant cuyas plantillas usar")
+    parser.add_argument("--baseline-sample", type=int, default=5000,
+                        help="Mensajes renderizados con Jinja por cliente (se extrapola al total)")
+    args = parser.parse_args()
+
+    random.seed(42)
+    start = time.perf_counter()
+    templates = NotificationTemplates()
+    console.print(f"🧩 Plantillas compiladas en {(time.perf_counter() - start) * 1000:.1f} ms "
+                  f"(tenants: {', '.join(templates.tenants())})")
+    columns = build_columns(args.clients, args.montos)
+    rows = [dict(zip(columns, values)) for values in zip(*columns.values())]
+
+    table = Table(title=f"📝 Render de {args.clients:,} notificaciones por plantilla")
+    table.add_column("Plantilla", style="cyan")
+    table.add_column("Jinja por cliente (s)", justify="right")
+    table.add_column("render_batch (s)", justify="right")
+    table.add_column("Mensajes/s", style="green", justify="right")
+    table.add_column("Aciertos de caché", justify="right")
+    table.add_column("Speedup", style="bold", justify="right")
+
+    total = 0.0
+    names = sorted(templates.stats().get(args.tenant or "default", {}))
+    for name in names:
+        compiled = templates.get(name, args.tenant)
+        sample = rows[:args.baseline_sample]
+        start = time.perf_counter()
+        for row in sample:
+            compiled.template.render(row)
+        baseline = (time.perf_counter() - start) * args.clients / max(1, len(sample))
+
+        start = time.perf_counter()
+        bodies = templates.render_batch(name, columns, args.tenant)
+        elapsed = time.perf_counter() - start
+        total += elapsed
+        assert len(bodies) == args.clients
+        stats = compiled.stats()
+        table.add_row(name, f"{baseline:.3f}", f"{elapsed:.3f}", f"{args.clients / elapsed:,.0f}",
+                      f"{stats['hits']:,}", f"{baseline / elapsed:.1f}x")
+    console.print(table)
+    console.print(f"⏱️ Total render_batch: {total:.3f} s para {len(names)} plantillas "
+                  f"({args.clients * len(names):,} mensajes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,9 @@ Integra procesamiento CSV + conexión Mikrotik RouterOS
 import sys
 import json
 import time
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 from typing import List, Dict, Any, Optional, Tuple
@@ -28,8 +31,12 @@ try:
     from loguru import logger
     
     from app.core.csv_processor import CSVProcessor, MorosoRecord
-    from app.mikrotik.connection import MikrotikConnection
-    from app.mikrotik.mock_router import MockRouterAPI
+    from app.core.cut_journal import (
+        CutJournal, STATE_PLANNED, STATE_SENT, STATE_CONFIRMED, STATE_FAILED, STATE_ROLLED_BACK
+    )
+    from app.core.job_index import JobIndex
+    from app.mikrotik.connection import MikrotikConnection, ConnectionConfig
+    from app.mikrotik.mock_router import create_mock_connection
     
 except ImportError as e:
     print(f"❌ Error importando dependencias: {e}")
@@ -39,14 +46,52 @@ except ImportError as e:
 console = Console()
 
 
+class FailureRateTracker:
+    """Tasa de fallas compartida para decidir el rollback (serial o concurrente)"""
+    
+    # Solo se evalúa el threshold si hay suficientes registros
+    MIN_RECORDS = 5
+    
+    def __init__(self, threshold: float, total_records: int):
+        self.threshold = threshold
+        self.total_records = total_records
+        self.processed = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+    
+    @property
+    def failure_rate(self) -> float:
+        return self.failed / self.processed if self.processed else 0.0
+    
+    def record(self, success: bool) -> bool:
+        """
+        Registra el resultado de un corte
+        
+        Returns:
+            True si la tasa de fallas supera el threshold de rollback
+        """
+        with self._lock:
+            self.processed += 1
+            if not success:
+                self.failed += 1
+            if self.total_records <= self.MIN_RECORDS:
+                return False
+            return self.failure_rate > self.threshold
+
+
 class ServiceCutter:
     """Clase principal para gestión de cortes de servicio"""
     
+    # Pausa entre lotes de batch_size cortes (segundos)
+    BATCH_DELAY = 0.5
+    
     def __init__(self, 
                  router_host: str,
                  use_mock: bool = False,
                  batch_size: int = 10,
-                 rollback_threshold: float = 0.1):
+                 rollback_threshold: float = 0.1,
+                 concurrency: int = 1,
+                 journal: Optional[CutJournal] = None):
         """
         Inicializa el cortador de servicios
         
@@ -55,11 +100,17 @@ class ServiceCutter:
             use_mock: Si usar router mock
             batch_size: Tamaño de lote para procesamiento
             rollback_threshold: % de fallas para activar rollback (0.1 = 10%)
+            concurrency: Workers concurrentes contra el router (1 = serial)
+            journal: Journal abierto donde registrar cada corte (opcional)
         """
         self.router_host = router_host
         self.use_mock = use_mock or router_host.lower() == "mock"
         self.batch_size = batch_size
         self.rollback_threshold = rollback_threshold
+        self.concurrency = max(1, concurrency)
+        self.journal = journal
+        self._secrets_index: Optional[Dict[str, bool]] = None
+        self._credentials: Tuple[Optional[str], Optional[str]] = (None, None)
         
         # Estadísticas de ejecución
         self.stats = {
@@ -75,6 +126,10 @@ class ServiceCutter:
         # Lista de acciones ejecutadas para rollback
         self.executed_actions = []
         
+        # Al reanudar, los cortes confirmados en la corrida anterior también se revierten
+        if self.journal:
+            self.load_actions_from_journal(include_unconfirmed=False)
+        
         logger.info(f"ServiceCutter inicializado: {router_host} (mock: {self.use_mock})")
     
     def connect_to_router(self, username: str = None, password: str = None) -> bool:
@@ -91,7 +146,8 @@ class ServiceCutter:
         try:
             if self.use_mock:
                 console.print("[yellow]Usando router mock para testing[/yellow]")
-                self.router = MockRouterAPI()
+                self.router = create_mock_connection()
+                self.router.connect()
                 return True
             
             # Solicitar credenciales si no se proporcionaron
@@ -100,14 +156,11 @@ class ServiceCutter:
             if not password:
                 password = Prompt.ask("🔐 Contraseña del router", password=True)
             
+            self._credentials = (username, password)
             console.print(f"[blue]Conectando a router: {self.router_host}[/blue]")
             
             with console.status("[bold blue]Estableciendo conexión..."):
-                self.router = MikrotikConnection(
-                    host=self.router_host,
-                    username=username,
-                    password=password
-                )
+                self.router = self._create_router_connection()
             
             console.print("[green]✅ Conexión establecida exitosamente[/green]")
             return True
@@ -116,71 +169,110 @@ class ServiceCutter:
             console.print(f"[red]❌ Error conectando al router: {e}[/red]")
             return False
     
-    def process_records_dry_run(self, records: List[MorosoRecord]) -> List[Dict[str, Any]]:
+    def _create_router_connection(self) -> MikrotikConnection:
+        """Crea una conexión (sin abrir) al router real con las credenciales guardadas"""
+        username, password = self._credentials
+        return MikrotikConnection(ConnectionConfig(
+            host=self.router_host,
+            username=username,
+            password=password
+        ))
+    
+    def fetch_secrets_index(self, snapshot_path: Optional[Path] = None) -> Dict[str, bool]:
+        """
+        Obtiene el índice name -> disabled de /ppp/secret con una sola lectura
+        
+        El índice queda cacheado en la instancia. Si se indica un snapshot y el
+        archivo existe se usa en lugar del router; si no existe, se guarda ahí
+        la lectura para reutilizarla en la próxima simulación.
+        
+        Args:
+            snapshot_path: Archivo JSON con el print de /ppp/secret (opcional)
+            
+        Returns:
+            Dict con el estado disabled de cada usuario del router
+        """
+        if self._secrets_index is not None:
+            return self._secrets_index
+        
+        if snapshot_path and Path(snapshot_path).exists():
+            with open(snapshot_path, 'r', encoding='utf-8') as f:
+                secrets = json.load(f)
+            console.print(f"📸 Usando snapshot de secrets: {snapshot_path}")
+        else:
+            with console.status("[bold blue]Leyendo /ppp/secret del router..."):
+                if self.use_mock:
+                    secrets = self.router.get_ppp_secrets()
+                else:
+                    with self.router:
+                        secrets = self.router.get_ppp_secrets()
+            
+            if snapshot_path:
+                Path(snapshot_path).parent.mkdir(parents=True, exist_ok=True)
+                with open(snapshot_path, 'w', encoding='utf-8') as f:
+                    json.dump([dict(secret) for secret in secrets], f, ensure_ascii=False, default=str)
+        
+        # RouterOS devuelve 'true'/'false'; librouteros lo convierte a bool
+        self._secrets_index = {
+            secret['name']: str(secret.get('disabled', 'false')).lower() in ('true', 'yes')
+            for secret in secrets
+        }
+        logger.info(f"Índice de secrets: {len(self._secrets_index)} usuarios")
+        return self._secrets_index
+    
+    def process_records_dry_run(self, records: List[MorosoRecord],
+                                snapshot_path: Optional[Path] = None) -> List[Dict[str, Any]]:
         """
         Simula el procesamiento sin ejecutar cambios reales
         
+        Cruza los registros contra una sola lectura de /ppp/secret y clasifica
+        cada uno como would_cut, already_disabled o user_not_found.
+        
         Args:
             records: Lista de registros a procesar
+            snapshot_path: Snapshot de secrets a usar en lugar del router (opcional)
             
         Returns:
             Lista de resultados simulados
         """
         console.print("\n[bold cyan]🔍 MODO DRY-RUN - SIMULACIÓN[/bold cyan]")
         
-        results = []
+        start_time = time.time()
+        index = self.fetch_secrets_index(snapshot_path)
         
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            BarColumn(),
-            MofNCompleteColumn(),
-            console=console
-        ) as progress:
-            
-            task = progress.add_task("Simulando cortes...", total=len(records))
+        results = []
+        counts = {'would_cut': 0, 'already_disabled': 0, 'user_not_found': 0}
+        timestamp = datetime.now().isoformat()
+        
+        for record in records:
+            disabled = index.get(record.username)
+            if disabled is None:
+                action, message = 'user_not_found', "Usuario no encontrado en el router"
+            elif disabled:
+                action, message = 'already_disabled', "Usuario ya deshabilitado"
+            else:
+                action, message = 'would_cut', f"Cortaría servicio - {record.dias_mora} días mora"
+            counts[action] += 1
             
-            for i, record in enumerate(records, 1):
-                try:
-                    # Simular verificación de usuario
-                    time.sleep(0.1)  # Simular latencia de red
-                    
-                    # Determinar si el usuario existe (simulado)
-                    user_exists = True  # En mock siempre existe
-                    if not self.use_mock:
-                        # En router real, verificar existencia
-                        user_exists = True  # Placeholder - implementar verificación real
-                    
-                    result = {
-                        'username': record.username,
-                        'dni': record.dni,
-                        'nombre': record.nombre,
-                        'dias_mora': record.dias_mora,
-                        'monto_deuda': record.monto_deuda,
-                        'action': 'would_cut' if user_exists else 'user_not_found',
-                        'success': user_exists,
-                        'message': f"Cortaría servicio - {record.dias_mora} días mora" if user_exists else "Usuario no encontrado",
-                        'timestamp': datetime.now().isoformat()
-                    }
-                    
-                    results.append(result)
-                    
-                    progress.update(task, advance=1, description=f"Simulado {i}/{len(records)}: {record.username}")
-                    
-                except Exception as e:
-                    result = {
-                        'username': record.username,
-                        'action': 'error',
-                        'success': False,
-                        'message': f"Error en simulación: {e}",
-                        'timestamp': datetime.now().isoformat()
-                    }
-                    results.append(result)
-                    logger.error(f"Error simulando {record.username}: {e}")
+            results.append({
+                'username': record.username,
+                'dni': record.dni,
+                'nombre': record.nombre,
+                'dias_mora': record.dias_mora,
+                'monto_deuda': record.monto_deuda,
+                'action': action,
+                'success': action == 'would_cut',
+                'message': message,
+                'timestamp': timestamp
+            })
+        
+        self.stats['total_records'] = len(records)
+        self.stats['processed'] = len(records)
+        self.stats['dry_run'] = counts
+        self.stats['execution_time'] = time.time() - start_time
         
         # Mostrar resumen de simulación
-        successful_sims = sum(1 for r in results if r['success'])
-        self.show_dry_run_summary(results, successful_sims)
+        self.show_dry_run_summary(results, counts)
         
         return results
     
@@ -188,6 +280,11 @@ class ServiceCutter:
         """
         Ejecuta el corte real de servicios
         
+        Con concurrency > 1 los cortes se reparten entre un pool de workers;
+        los resultados se confirman en el orden de entrada, así que el
+        trigger de rollback y el orden de executed_actions coinciden con
+        el modo serial.
+        
         Args:
             records: Lista de registros a procesar
             
@@ -196,13 +293,24 @@ class ServiceCutter:
         """
         console.print("\n[bold red]⚡ MODO EXECUTE - EJECUCIÓN REAL[/bold red]")
         
+        if self.journal:
+            # Reanudación: saltear usuarios con corte ya confirmado
+            confirmed = set(self.journal.state.confirmed_users())
+            if confirmed:
+                pending = [record for record in records if record.username not in confirmed]
+                self.stats['resumed_skipped'] = len(records) - len(pending)
+                console.print(f"[yellow]↩️ Reanudando: {self.stats['resumed_skipped']} usuarios ya confirmados en el journal[/yellow]")
+                records = pending
+        
         # Confirmación final
         if not self.confirm_execution(records):
             console.print("[yellow]Operación cancelada por el usuario[/yellow]")
             return []
         
-        results = []
-        failed_count = 0
+        if self.journal:
+            self.journal.record_many((record.username for record in records), STATE_PLANNED, durable=True)
+        
+        tracker = FailureRateTracker(self.rollback_threshold, len(records))
         start_time = time.time()
         
         with Progress(
@@ -215,106 +323,295 @@ class ServiceCutter:
             
             task = progress.add_task("Ejecutando cortes...", total=len(records))
             
-            for i, record in enumerate(records, 1):
-                try:
-                    # Ejecutar corte real
-                    success = self.cut_single_service(record)
+            if self.concurrency > 1 and len(records) > 1:
+                results = self._execute_concurrent(records, tracker, progress, task)
+            else:
+                results = self._execute_serial(records, tracker, progress, task)
+        
+        self.stats['execution_time'] = time.time() - start_time
+        if self.use_mock:
+            self.stats['simulated_timing'] = self.router.timing_report()
+        
+        return results
+    
+    def _execute_serial(self, records: List[MorosoRecord], tracker: FailureRateTracker,
+                        progress: Progress, task: TaskID) -> List[Dict[str, Any]]:
+        """Procesa los registros de a uno sobre la conexión principal"""
+        results = []
+        
+        for i, record in enumerate(records, 1):
+            try:
+                # Ejecutar corte real
+                success = self.cut_single_service(record)
+                self._commit_cut_result(record, success, results)
+                
+                # Verificar threshold de rollback
+                if tracker.record(success):
+                    console.print(f"[bold red]🚨 ACTIVANDO ROLLBACK - Tasa de fallas: {tracker.failure_rate:.1%}[/bold red]")
+                    self.execute_rollback()
+                    break
+                
+                progress.update(task, advance=1, description=f"Procesado {i}/{len(records)}: {record.username}")
+                
+                # Batch delay para no sobrecargar el router
+                if i % self.batch_size == 0:
+                    self._batch_pause()
+                
+            except Exception as e:
+                result = {
+                    'username': record.username,
+                    'action': 'error',
+                    'success': False,
+                    'message': f"Error crítico: {e}",
+                    'timestamp': datetime.now().isoformat()
+                }
+                results.append(result)
+                tracker.record(False)
+                self.stats['failed_cuts'] += 1
+                self.stats['errors'].append(str(e))
+                logger.error(f"Error crítico procesando {record.username}: {e}")
+        
+        return results
+    
+    def _execute_concurrent(self, records: List[MorosoRecord], tracker: FailureRateTracker,
+                            progress: Progress, task: TaskID) -> List[Dict[str, Any]]:
+        """
+        Reparte los cortes entre workers y consume sus resultados desde una cola
+        
+        Los resultados se confirman en orden de entrada; al cruzar el threshold
+        se detienen todos los workers y los cortes que ya estaban en vuelo se
+        registran igual para que el rollback también los revierta. Los workers
+        no se adelantan más de 2 * concurrency registros al último confirmado,
+        lo que acota esos cortes extra.
+        
+        Con router real los workers comparten una cola: el primero libre toma
+        el siguiente registro. En mock no hay latencia real y un worker vaciaría
+        la cola antes de que arranquen los demás (el reloj virtual no vería
+        trabajo en paralelo), así que los registros se reparten round-robin de
+        antemano, con una ventana de 2 por worker.
+        """
+        results = []
+        results_queue: "queue.Queue[Optional[Tuple[int, MorosoRecord, bool]]]" = queue.Queue()
+        stop_event = threading.Event()
+        workers = min(self.concurrency, len(records))
+        
+        if self.use_mock:
+            work_queues: List["queue.Queue[Tuple[int, MorosoRecord]]"] = [queue.Queue() for _ in range(workers)]
+            windows = [threading.Semaphore(2) for _ in range(workers)]
+            for index, record in enumerate(records):
+                work_queues[index % workers].put((index, record))
+        else:
+            shared_queue: "queue.Queue[Tuple[int, MorosoRecord]]" = queue.Queue()
+            for item in enumerate(records):
+                shared_queue.put(item)
+            work_queues = [shared_queue] * workers
+            windows = [threading.Semaphore(2 * workers)] * workers
+        
+        pending: Dict[int, Tuple[MorosoRecord, bool]] = {}
+        next_index = 0
+        rollback = False
+        
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cut-worker") as pool:
+            for worker in range(workers):
+                pool.submit(self._cut_worker, work_queues[worker], results_queue, stop_event, windows[worker])
+            
+            alive = workers
+            while alive:
+                item = results_queue.get()
+                if item is None:
+                    alive -= 1
+                    continue
+                
+                index, record, success = item
+                pending[index] = (record, success)
+                
+                # Confirmar en orden de entrada, igual que el modo serial
+                while not rollback and next_index in pending:
+                    record, success = pending.pop(next_index)
+                    next_index += 1
+                    self._commit_cut_result(record, success, results)
+                    progress.update(task, advance=1, description=f"Procesado {next_index}/{len(records)}: {record.username}")
                     
-                    if success:
-                        result = {
-                            'username': record.username,
-                            'dni': record.dni,
-                            'nombre': record.nombre,
-                            'dias_mora': record.dias_mora,
-                            'monto_deuda': record.monto_deuda,
-                            'action': 'cut_executed',
-                            'success': True,
-                            'message': f"Servicio cortado exitosamente",
-                            'timestamp': datetime.now().isoformat()
-                        }
-                        
-                        # Registrar para posible rollback
-                        self.executed_actions.append({
-                            'username': record.username,
-                            'action': 'cut',
-                            'timestamp': datetime.now().isoformat()
-                        })
-                        
-                        self.stats['successful_cuts'] += 1
-                        
+                    if tracker.record(success):
+                        rollback = True
+                        stop_event.set()
                     else:
-                        result = {
-                            'username': record.username,
-                            'action': 'cut_failed',
-                            'success': False,
-                            'message': f"Error ejecutando corte",
-                            'timestamp': datetime.now().isoformat()
-                        }
-                        failed_count += 1
-                        self.stats['failed_cuts'] += 1
-                    
-                    results.append(result)
-                    self.stats['processed'] += 1
-                    
-                    # Verificar threshold de rollback
-                    if len(records) > 5:  # Solo verificar rollback si hay suficientes registros
-                        failure_rate = failed_count / (i)
-                        if failure_rate > self.rollback_threshold:
-                            console.print(f"[bold red]🚨 ACTIVANDO ROLLBACK - Tasa de fallas: {failure_rate:.1%}[/bold red]")
-                            self.execute_rollback()
-                            break
-                    
-                    progress.update(task, advance=1, description=f"Procesado {i}/{len(records)}: {record.username}")
-                    
-                    # Batch delay para no sobrecargar el router
-                    if i % self.batch_size == 0:
-                        time.sleep(0.5)
-                    
-                except Exception as e:
-                    result = {
-                        'username': record.username,
-                        'action': 'error',
-                        'success': False,
-                        'message': f"Error crítico: {e}",
-                        'timestamp': datetime.now().isoformat()
-                    }
-                    results.append(result)
-                    failed_count += 1
-                    self.stats['failed_cuts'] += 1
-                    self.stats['errors'].append(str(e))
-                    logger.error(f"Error crítico procesando {record.username}: {e}")
+                        # Lugar en la ventana de quien procesó el registro (en mock, su worker round-robin)
+                        windows[(next_index - 1) % workers].release()
         
-        self.stats['execution_time'] = time.time() - start_time
+        # En mock, el hilo principal "espera" a los workers en el reloj virtual
+        if self.use_mock:
+            self.router.clock.sync()
+        
+        # Cortes en vuelo al momento del trigger
+        for index in sorted(pending):
+            record, success = pending[index]
+            self._commit_cut_result(record, success, results)
+        
+        if rollback:
+            console.print(f"[bold red]🚨 ACTIVANDO ROLLBACK - Tasa de fallas: {tracker.failure_rate:.1%}[/bold red]")
+            self.execute_rollback()
         
         return results
     
-    def cut_single_service(self, record: MorosoRecord) -> bool:
+    def _cut_worker(self, work_queue: queue.Queue, results_queue: queue.Queue,
+                    stop_event: threading.Event, window: threading.Semaphore):
+        """Worker del pool: toma registros de la cola hasta vaciarla o recibir stop"""
+        router = None
+        connected = True
+        try:
+            if not self.use_mock:
+                # Conexión dedicada por worker; el mock se comparte en memoria
+                router = self._create_router_connection()
+                router.connect()
+        except Exception as e:
+            logger.error(f"Worker sin conexión al router: {e}")
+            router = None
+            connected = False
+        
+        try:
+            processed = 0
+            while not stop_event.is_set():
+                # Esperar lugar en la ventana sin dejar de mirar el stop
+                if not window.acquire(timeout=0.1):
+                    continue
+                if stop_event.is_set():
+                    break
+                try:
+                    index, record = work_queue.get_nowait()
+                except queue.Empty:
+                    break
+                
+                # Sin conexión propia el corte se reporta como fallido
+                success = self.cut_single_service(record, router) if connected else False
+                results_queue.put((index, record, success))
+                
+                # Batch delay por worker; se interrumpe si hay rollback
+                processed += 1
+                if processed % self.batch_size == 0:
+                    self._batch_pause(stop_event)
+        finally:
+            if router is not None:
+                router.disconnect()
+            results_queue.put(None)
+    
+    def _batch_pause(self, stop_event: Optional[threading.Event] = None):
+        """Pausa entre lotes; en mock avanza el reloj virtual en vez de dormir"""
+        if self.use_mock:
+            self.router.clock.sleep(self.BATCH_DELAY)
+        elif stop_event is not None:
+            stop_event.wait(self.BATCH_DELAY)
+        else:
+            time.sleep(self.BATCH_DELAY)
+    
+    def _commit_cut_result(self, record: MorosoRecord, success: bool, results: List[Dict[str, Any]]):
+        """Registra el resultado de un corte en resultados, rollback y estadísticas"""
+        if success:
+            result = {
+                'username': record.username,
+                'dni': record.dni,
+                'nombre': record.nombre,
+                'dias_mora': record.dias_mora,
+                'monto_deuda': record.monto_deuda,
+                'action': 'cut_executed',
+                'success': True,
+                'message': f"Servicio cortado exitosamente",
+                'timestamp': datetime.now().isoformat()
+            }
+            
+            # Registrar para posible rollback
+            self.executed_actions.append({
+                'username': record.username,
+                'action': 'cut',
+                'timestamp': datetime.now().isoformat()
+            })
+            
+            self.stats['successful_cuts'] += 1
+            
+        else:
+            result = {
+                'username': record.username,
+                'action': 'cut_failed',
+                'success': False,
+                'message': f"Error ejecutando corte",
+                'timestamp': datetime.now().isoformat()
+            }
+            self.stats['failed_cuts'] += 1
+        
+        results.append(result)
+        self.stats['processed'] += 1
+    
+    def cut_single_service(self, record: MorosoRecord, router: Optional[MikrotikConnection] = None) -> bool:
         """
         Ejecuta el corte de un servicio individual
         
         Args:
             record: Registro del moroso
+            router: Conexión ya abierta de un worker (None usa la conexión principal)
             
         Returns:
             True si el corte fue exitoso
         """
+        # Write-ahead: el envío queda en disco antes de tocar el router
+        if self.journal:
+            self.journal.record(record.username, STATE_SENT, durable=True)
+        
         try:
-            if self.use_mock:
+            if router is not None:
+                success = router.disable_user(record.username)
+            elif self.use_mock:
                 # Usar mock router
-                return self.router.disable_user(record.username)
+                success = self.router.disable_user(record.username)
             else:
                 # Usar router real
                 with self.router:
-                    return self.router.disable_user(record.username)
+                    success = self.router.disable_user(record.username)
                     
         except Exception as e:
             logger.error(f"Error cortando servicio {record.username}: {e}")
-            return False
+            success = False
+        
+        if self.journal:
+            self.journal.record(record.username, STATE_CONFIRMED if success else STATE_FAILED)
+        
+        return success
+    
+    def load_actions_from_journal(self, include_unconfirmed: bool = True) -> int:
+        """
+        Reconstruye executed_actions desde el journal, para poder revertir
+        una ejecución interrumpida
+        
+        Args:
+            include_unconfirmed: Incluir usuarios enviados sin confirmación
+            
+        Returns:
+            Cantidad de acciones recuperadas
+        """
+        state = self.journal.state
+        candidates = state.cut_users() if include_unconfirmed else state.confirmed_users()
+        known = {action['username'] for action in self.executed_actions}
+        recovered = [username for username in candidates if username not in known]
+        
+        for username in recovered:
+            self.executed_actions.append({
+                'username': username,
+                'action': 'cut',
+                'timestamp': datetime.now().isoformat(),
+                'source': 'journal'
+            })
+        
+        if recovered:
+            logger.info(f"Acciones recuperadas del journal: {len(recovered)}")
+        return len(recovered)
     
     def execute_rollback(self) -> bool:
         """
         Ejecuta rollback de las acciones realizadas
         
+        Usa el camino masivo del router: una lectura del índice de secrets,
+        sets agrupados con disabled=no y una única pasada de verificación,
+        todo sobre una sola conexión.
+        
         Returns:
             True si el rollback fue exitoso
         """
@@ -322,9 +619,13 @@ class ServiceCutter:
             console.print("[yellow]No hay acciones para revertir[/yellow]")
             return True
         
+        # Revertir en orden inverso
+        usernames = [action['username'] for action in reversed(self.executed_actions)
+                     if action['action'] == 'cut']
+        
         console.print(f"\n[bold yellow]🔄 EJECUTANDO ROLLBACK - {len(self.executed_actions)} acciones[/bold yellow]")
         
-        success_count = 0
+        start_time = time.time()
         
         with Progress(
             SpinnerColumn(),
@@ -334,31 +635,41 @@ class ServiceCutter:
             console=console
         ) as progress:
             
-            task = progress.add_task("Revirtiendo cambios...", total=len(self.executed_actions))
+            task = progress.add_task("Revirtiendo cambios...", total=len(usernames))
             
-            # Revertir en orden inverso
-            for action in reversed(self.executed_actions):
-                try:
-                    if action['action'] == 'cut':
-                        # Reactivar usuario
-                        if self.use_mock:
-                            success = self.router.enable_user(action['username'])
-                        else:
-                            with self.router:
-                                success = self.router.enable_user(action['username'])
-                        
-                        if success:
-                            success_count += 1
-                            logger.info(f"Rollback exitoso: {action['username']}")
-                        else:
-                            logger.error(f"Fallo en rollback: {action['username']}")
-                    
-                    progress.advance(task)
-                    
-                except Exception as e:
-                    logger.error(f"Error en rollback {action['username']}: {e}")
+            def on_progress(sent: int, total: int):
+                progress.update(task, completed=sent, total=total)
+            
+            try:
+                if self.use_mock:
+                    results = self.router.bulk_enable(usernames, progress_callback=on_progress)
+                else:
+                    with self.router:
+                        results = self.router.bulk_enable(usernames, progress_callback=on_progress)
+            except Exception as e:
+                logger.error(f"Error en rollback masivo: {e}")
+                results = {username: False for username in usernames}
+        
+        failed_users = [username for username, success in results.items() if not success]
+        success_count = len(results) - len(failed_users)
+        for username in failed_users:
+            logger.error(f"Fallo en rollback: {username}")
+        
+        if self.journal:
+            self.journal.record_many(
+                (username for username, success in results.items() if success),
+                STATE_ROLLED_BACK, durable=True
+            )
         
         self.stats['rollback_triggered'] = True
+        self.stats['rollback'] = {
+            'method': 'bulk',
+            'requested': len(usernames),
+            'reenabled': success_count,
+            'failed_users': failed_users,
+            'duration': time.time() - start_time,
+            'timestamp': datetime.now().isoformat()
+        }
         rollback_success_rate = success_count / len(self.executed_actions) if self.executed_actions else 0
         
         if rollback_success_rate > 0.8:
@@ -387,6 +698,7 @@ class ServiceCutter:
         table.add_row("Router", self.router_host)
         table.add_row("Modo", "MOCK" if self.use_mock else "REAL")
         table.add_row("Batch size", str(self.batch_size))
+        table.add_row("Concurrencia", str(self.concurrency))
         table.add_row("Rollback threshold", f"{self.rollback_threshold:.1%}")
         
         console.print(table)
@@ -424,16 +736,18 @@ class ServiceCutter:
         
         return Confirm.ask("¿Confirmas la ejecución?", default=False)
     
-    def show_dry_run_summary(self, results: List[Dict[str, Any]], successful: int):
+    def show_dry_run_summary(self, results: List[Dict[str, Any]], counts: Dict[str, int]):
         """Muestra resumen del dry run"""
         table = Table(title="📊 Resumen Simulación")
         table.add_column("Concepto", style="white")
         table.add_column("Cantidad", style="cyan")
         
+        successful = counts.get('would_cut', 0)
         table.add_row("Total simulados", str(len(results)))
-        table.add_row("Cortes exitosos", str(successful))
-        table.add_row("Usuarios no encontrados", str(len(results) - successful))
-        table.add_row("Tasa de éxito", f"{(successful/len(results)*100):.1f}%" if results else "0%")
+        table.add_row("Se cortarían", str(successful))
+        table.add_row("Ya deshabilitados", str(counts.get('already_disabled', 0)))
+        table.add_row("Usuarios no encontrados", str(counts.get('user_not_found', 0)))
+        table.add_row("Tasa de corte", f"{(successful/len(results)*100):.1f}%" if results else "0%")
         
         console.print(table)
     
@@ -477,6 +791,9 @@ class ServiceCutter:
             with open(json_path, 'w', encoding='utf-8') as f:
                 json.dump(report_data, f, indent=2, ensure_ascii=False)
             
+            # Índice liviano para el historial del dashboard (sin los resultados por usuario)
+            JobIndex.for_output_dir(output_dir).record(json_path, report_data)
+            
             console.print(f"\n📁 [green]Reportes generados:[/green]")
             console.print(f"   📊 CSV: {csv_path}")
             console.print(f"   📋 JSON: {json_path}")
@@ -487,17 +804,24 @@ class ServiceCutter:
 
 
 @click.command()
-@click.option('--csv', required=True, type=click.Path(exists=True), help='Archivo CSV con morosos')
+@click.option('--csv', type=click.Path(exists=True), help='Archivo CSV con morosos (no requerido en modo rollback)')
 @click.option('--router', required=True, help='IP del router Mikrotik o "mock" para testing')
-@click.option('--mode', type=click.Choice(['dry-run', 'execute']), default='dry-run', 
-              help='Modo de ejecución: dry-run (simulación) o execute (real)')
+@click.option('--mode', type=click.Choice(['dry-run', 'execute', 'rollback']), default='dry-run', 
+              help='Modo de ejecución: dry-run (simulación), execute (real) o rollback (desde el journal)')
 @click.option('--min-days', default=30, type=int, help='Días mínimos de mora para incluir')
 @click.option('--batch-size', default=10, type=int, help='Tamaño de lote para procesamiento')
+@click.option('--concurrency', default=1, type=int, help='Workers concurrentes por router (1 = serial)')
 @click.option('--output', default='output', type=click.Path(), help='Directorio para reportes')
+@click.option('--journal', 'journal_path', default='output/journal_cortes.jsonl', type=click.Path(),
+              help='Journal de cortes para reanudar o revertir')
+@click.option('--secrets-snapshot', type=click.Path(),
+              help='Snapshot JSON de /ppp/secret para dry-run (se crea si no existe)')
+@click.option('--resume', is_flag=True, help='Reanudar la última ejecución del journal salteando cortes confirmados')
 @click.option('--username', help='Usuario del router (opcional, se solicitará si no se proporciona)')
 @click.option('--password', help='Contraseña del router (opcional, se solicitará si no se proporciona)')
 @click.option('--verbose', '-v', is_flag=True, help='Salida verbosa')
-def main(csv, router, mode, min_days, batch_size, output, username, password, verbose):
+def main(csv, router, mode, min_days, batch_size, concurrency, output, journal_path, secrets_snapshot,
+         resume, username, password, verbose):
     """
     🔥 Nordia ISP Suite - Automatización de Cortes por Mora
     
@@ -510,8 +834,20 @@ def main(csv, router, mode, min_days, batch_size, output, username, password, ve
       
       # Ejecución real en router
       python cut_service.py --csv morosos.csv --router 192.168.1.1 --mode execute --min-days 45
+      
+      # Ejecución con 4 conexiones concurrentes al router
+      python cut_service.py --csv morosos.csv --router 192.168.1.1 --mode execute --concurrency 4
+      
+      # Reanudar una ejecución interrumpida
+      python cut_service.py --csv morosos.csv --router 192.168.1.1 --mode execute --resume
+      
+      # Revertir los cortes registrados en el journal
+      python cut_service.py --router 192.168.1.1 --mode rollback
     """
     
+    if mode != 'rollback' and not csv:
+        raise click.UsageError("--csv es requerido en modo dry-run y execute")
+    
     # Configurar logging
     if verbose:
         logger.add(sys.stderr, level="DEBUG")
@@ -526,27 +862,38 @@ def main(csv, router, mode, min_days, batch_size, output, username, password, ve
         f"🎯 Modo: [bold]{mode.upper()}[/bold]"
     ))
     
+    journal = None
+    
     try:
         # 1. Procesar CSV
-        console.print(f"\n[bold cyan]📂 PASO 1: Procesando CSV[/bold cyan]")
-        processor = CSVProcessor(min_dias_mora=min_days)
-        
-        with console.status("[bold blue]Cargando y validando CSV..."):
-            records = processor.process_csv(csv)
-            csv_stats = processor.get_stats_summary()
-        
-        console.print(f"✅ CSV procesado: {len(records)} registros válidos de {csv_stats['total_records']} totales")
+        records = []
+        if mode != 'rollback':
+            console.print(f"\n[bold cyan]📂 PASO 1: Procesando CSV[/bold cyan]")
+            processor = CSVProcessor(min_dias_mora=min_days)
+            
+            with console.status("[bold blue]Cargando y validando CSV..."):
+                records = processor.process_csv(csv)
+                csv_stats = processor.get_stats_summary()
+            
+            console.print(f"✅ CSV procesado: {len(records)} registros válidos de {csv_stats['total_records']} totales")
+            
+            if len(records) == 0:
+                console.print("[red]❌ No hay registros válidos para procesar[/red]")
+                sys.exit(1)
         
-        if len(records) == 0:
-            console.print("[red]❌ No hay registros válidos para procesar[/red]")
-            sys.exit(1)
+        # El journal solo se usa cuando se tocan usuarios reales
+        if mode != 'dry-run':
+            journal = CutJournal(journal_path, resume=resume or mode == 'rollback').open()
+            console.print(f"📓 Journal: {journal_path} ({journal.state.counts() or 'nueva ejecución'})")
         
         # 2. Conectar a router
         console.print(f"\n[bold cyan]🔌 PASO 2: Conectando al Router[/bold cyan]")
         cutter = ServiceCutter(
             router_host=router,
             use_mock=router.lower() == "mock",
-            batch_size=batch_size
+            batch_size=batch_size,
+            concurrency=concurrency,
+            journal=journal
         )
         
         if not cutter.connect_to_router(username, password):
@@ -557,7 +904,11 @@ def main(csv, router, mode, min_days, batch_size, output, username, password, ve
         console.print(f"\n[bold cyan]⚡ PASO 3: Procesamiento en Modo {mode.upper()}[/bold cyan]")
         
         if mode == 'dry-run':
-            results = cutter.process_records_dry_run(records)
+            results = cutter.process_records_dry_run(records, secrets_snapshot)
+        elif mode == 'rollback':
+            cutter.load_actions_from_journal()
+            cutter.execute_rollback()
+            results = []
         else:
             results = cutter.process_records_execute(records)
         
@@ -578,6 +929,10 @@ def main(csv, router, mode, min_days, batch_size, output, username, password, ve
         summary_table.add_row("Cortes fallidos", str(final_stats.get('failed_cuts', 0)))
         if final_stats.get('execution_time', 0) > 0:
             summary_table.add_row("Tiempo ejecución", f"{final_stats['execution_time']:.1f}s")
+        if final_stats.get('simulated_timing'):
+            timing = final_stats['simulated_timing']
+            summary_table.add_row("Tiempo simulado (router)", f"{timing['simulated_seconds']:.1f}s")
+            summary_table.add_row("Tiempo CPU simulación", f"{timing['cpu_seconds']:.1f}s")
         summary_table.add_row("Rollback activado", "Sí" if final_stats.get('rollback_triggered') else "No")
         
         console.print(summary_table)
@@ -589,6 +944,9 @@ def main(csv, router, mode, min_days, batch_size, output, username, password, ve
         console.print(f"\n[red]❌ Error crítico: {e}[/red]")
         logger.error(f"Error crítico en main: {e}")
         sys.exit(1)
+    finally:
+        if journal:
+            journal.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Agenda de cobranza - Nordia ISP Suite
+Programa la próxima acción de cada suscriptor (aviso, corte, escalamiento,
+reactivación) y ejecuta solo las vencidas con MorosidadProcessor
+
+Uso:
+    python scripts/dunning_scheduler.py sync --csv morosos.csv
+    python scripts/dunning_scheduler.py stats
+    python scripts/dunning_scheduler.py due --limit 20
+    python scripts/dunning_scheduler.py tick --csv morosos.csv --mode simulation   # para cron
+    python scripts/dunning_scheduler.py run --csv morosos.csv                      # continuo
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+from datetime import date, datetime
+
+# Servicios del backend de la UI
+sys.path.insert(0, str(Path(__file__).parent.parent / "ui" / "backend"))
+
+try:
+    from app.services.mikrotik_service import SCHEDULE_PATH, MorosidadProcessor
+    from services.dunning_scheduler import DunningScheduler
+    from rich.console import Console
+    from rich.table import Table
+except ImportError as e:
+    print(f"❌ Error importando dependencias: {e}")
+    print("Instala las dependencias con: pip install -r requirements.txt")
+    sys.exit(1)
+
+console = Console()
+
+ACTION_LABELS = {
+    "aviso_previo": "Aviso previo",
+    "corte": "Corte",
+    "escalamiento": "Escalamiento",
+    "reactivacion": "Reactivación",
+}
+
+
+def show_stats(scheduler: DunningScheduler):
+    stats = scheduler.stats()
+    table = Table(title=f"📅 Agenda {scheduler.path}")
+    table.add_column("Próxima acción", style="cyan")
+    table.add_column("Suscriptores", justify="right")
+    for action, label in ACTION_LABELS.items():
+        table.add_row(label, f"{stats[action]:,}")
+    console.print(table)
+    proxima = datetime.fromtimestamp(stats["proxima"]).strftime("%Y-%m-%d %H:%M") if stats["proxima"] else "-"
+    console.print(f"👥 {stats['suscriptores']:,} suscriptores, {stats['vencidas']:,} acciones vencidas, "
+                  f"próxima: {proxima}")
+
+
+def show_due(scheduler: DunningScheduler, limit: int):
+    table = Table(title="⏰ Acciones vencidas")
+    for column in ("DNI", "Cliente", "Acción", "Días de mora", "Vencida desde"):
+        table.add_column(column)
+    for item in scheduler.due(limit=limit):
+        table.add_row(item.subscriber, str(item.client.get("nombre", "")), ACTION_LABELS[item.action],
+                      str(item.client["dias_mora"]), datetime.fromtimestamp(item.due_at).strftime("%Y-%m-%d %H:%M"))
+    console.print(table)
+
+
+def sync(scheduler: DunningScheduler, args: argparse.Namespace, force: bool = False):
+    counts = scheduler.sync_csv(Path(args.csv), args.as_of, force=force)
+    if counts is None:
+        console.print(f"💤 {args.csv} sin cambios desde la última sincronización")
+    else:
+        console.print(f"🔄 {counts['nuevos']} nuevos, {counts['modificados']} modificados, "
+                      f"{counts['sin_cambios']} sin cambios, {counts['eliminados']} eliminados")
+
+
+def tick(scheduler: DunningScheduler, processor: MorosidadProcessor, args: argparse.Namespace):
+    """Sincronizar el CSV si cambió y ejecutar lo vencido"""
+    if args.csv:
+        sync(scheduler, args)
+    resultados = processor.run_due(scheduler)
+    if resultados["total_procesados"] or resultados["errores"]:
+        console.print(f"✅ {resultados['total_procesados']} procesados: {resultados['notificados']} avisos, "
+                      f"{resultados['cortados']} cortes, {resultados['escalados']} escalamientos, "
+                      f"{resultados['reactivados']} reactivaciones, {resultados['errores']} errores")
+
+
+def run(scheduler: DunningScheduler, processor: MorosidadProcessor, args: argparse.Namespace):
+    """Dormir hasta el próximo vencimiento (o hasta revisar el CSV) y ejecutar lo vencido"""
+    console.print(f"📅 Agenda de cobranza {scheduler.path} (Ctrl+C para detener)")
+    while True:
+        tick(scheduler, processor, args)
+        proxima = scheduler.next_due_at()
+        espera = args.max_sleep if proxima is None else min(args.max_sleep, max(0.0, proxima - time.time()))
+        time.sleep(espera)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Agenda de cobranza: acciones por vencimiento")
+    parser.add_argument("--path", default=SCHEDULE_PATH, help="Archivo SQLite de la agenda")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("stats", help="Suscriptores por próxima acción")
+    due = sub.add_parser("due", help="Listar acciones vencidas")
+    due.add_argument("--limit", type=int, default=50)
+    sync_parser = sub.add_parser("sync", help="Reprogramar los suscriptores que cambiaron en el CSV")
+    sync_parser.add_argument("--force", action="store_true", help="Sincronizar aunque el archivo no haya cambiado")
+
+    for name, help_text in (("tick", "Sincronizar y ejecutar lo vencido una vez"), ("run", "Agenda continua")):
+        worker = sub.add_parser(name, help=help_text)
+        worker.add_argument("--mode", choices=("production", "simulation"), default="simulation")
+        worker.add_argument("--max-sleep", type=float, default=300.0,
+                            help="Segundos máximos entre revisiones del CSV")
+
+    for command in ("sync", "tick", "run"):
+        sub.choices[command].add_argument("--csv", required=command == "sync", help="CSV de morosos")
+        sub.choices[command].add_argument("--as-of", type=date.fromisoformat,
+                                          help="Fecha de dias_mora (default: hoy)")
+
+    args = parser.parse_args()
+    scheduler = DunningScheduler(Path(args.path))
+
+    try:
+        if args.command == "stats":
+            show_stats(scheduler)
+        elif args.command == "due":
+            show_due(scheduler, args.limit)
+        elif args.command == "sync":
+            sync(scheduler, args, force=args.force)
+            show_stats(scheduler)
+        else:
+            processor = MorosidadProcessor(mode=args.mode)
+            if args.command == "tick":
+                tick(scheduler, processor, args)
+                show_stats(scheduler)
+            else:
+                try:
+                    run(scheduler, processor, args)
+                except KeyboardInterrupt:
+                    console.print("\n⏹️ Agenda detenida")
+    finally:
+        scheduler.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Outbox de notificaciones - Nordia ISP Suite
+Worker y administración del outbox SQLite que alimenta MorosidadProcessor
+
+Uso:
+    python scripts/notify_outbox.py stats
+    python scripts/notify_outbox.py run                      # worker continuo (Twilio + SMTP)
+    python scripts/notify_outbox.py drain --stub-url http://127.0.0.1:8099
+    python scripts/notify_outbox.py dead --limit 20
+    python scripts/notify_outbox.py requeue [--id 12 --id 15]
+    python scripts/notify_outbox.py purge --days 30
+"""
+
+import os
+import sys
+import asyncio
+import argparse
+from pathlib import Path
+from datetime import datetime
+
+# Servicios del backend de la UI
+sys.path.insert(0, str(Path(__file__).parent.parent / "ui" / "backend"))
+
+try:
+    from services.notify_dispatch import DEFAULT_CHANNEL_LIMITS, HTTPProvider, NotificationDispatcher
+    from services.notify_outbox import DEFAULT_OUTBOX_PATH, NotificationOutbox, OutboxWorker, RetryPolicy
+    from rich.console import Console
+    from rich.table import Table
+except ImportError as e:
+    print(f"❌ Error importando dependencias: {e}")
+    print("Instala las dependencias con: pip install -r requirements.txt")
+    sys.exit(1)
+
+console = Console()
+
+
+def build_worker(args: argparse.Namespace, outbox: NotificationOutbox) -> OutboxWorker:
+    """Worker con el stub HTTP indicado o con los proveedores reales de NotificationSystem"""
+    policy = RetryPolicy(max_attempts=args.max_attempts, base_delay=args.base_delay)
+    if args.stub_url:
+        providers = {channel: HTTPProvider(args.stub_url, max_connections=limit.concurrency)
+                     for channel, limit in DEFAULT_CHANNEL_LIMITS.items()}
+        dispatcher = NotificationDispatcher(providers)
+    else:
+        from app.services.mikrotik_service import NotificationSystem
+
+        dispatcher = NotificationSystem(outbox_path=str(outbox.path)).dispatcher
+    return OutboxWorker(outbox, dispatcher, batch_size=args.batch_size, poll_interval=args.poll_interval,
+                        policy=policy)
+
+
+def show_stats(outbox: NotificationOutbox):
+    stats = outbox.stats()
+    table = Table(title=f"📬 Outbox {outbox.path}")
+    table.add_column("Estado", style="cyan")
+    table.add_column("Notificaciones", justify="right")
+    for status in ("due", "pending", "sending", "sent", "dead"):
+        table.add_row(status, f"{stats[status]:,}")
+    console.print(table)
+
+
+def show_dead(outbox: NotificationOutbox, limit: int):
+    table = Table(title="☠️ Dead-letter")
+    for column in ("ID", "Clave", "Canal", "Destino", "Intentos", "Último error", "Encolada"):
+        table.add_column(column)
+    for row in outbox.dead_letters(limit):
+        table.add_row(
+            str(row["id"]), row["idempotency_key"], row["channel"], row["recipient"], str(row["attempts"]),
+            (row["last_error"] or "")[:60], datetime.fromtimestamp(row["created_at"]).strftime("%Y-%m-%d %H:%M"),
+        )
+    console.print(table)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Worker y administración del outbox de notificaciones")
+    parser.add_argument("--path", default=os.getenv("NORDIA_OUTBOX_PATH", str(DEFAULT_OUTBOX_PATH)),
+                        help="Archivo SQLite del outbox")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("stats", help="Notificaciones por estado")
+    dead = sub.add_parser("dead", help="Listar dead-letters")
+    dead.add_argument("--limit", type=int, default=50)
+    requeue = sub.add_parser("requeue", help="Reencolar dead-letters")
+    requeue.add_argument("--id", type=int, action="append", dest="ids", help="Solo estas filas (repetible)")
+    purge = sub.add_parser("purge", help="Borrar enviadas antiguas")
+    purge.add_argument("--days", type=float, default=30)
+
+    for name, help_text in (("drain", "Enviar todo lo vencido y salir"), ("run", "Worker continuo")):
+        worker = sub.add_parser(name, help=help_text)
+        worker.add_argument("--stub-url", help="Enviar a un stub HTTP en lugar de Twilio/SMTP")
+        worker.add_argument("--batch-size", type=int, default=500)
+        worker.add_argument("--poll-interval", type=float, default=5.0)
+        worker.add_argument("--max-attempts", type=int, default=RetryPolicy.max_attempts)
+        worker.add_argument("--base-delay", type=float, default=RetryPolicy.base_delay)
+
+    args = parser.parse_args()
+    outbox = NotificationOutbox(Path(args.path))
+
+    try:
+        if args.command == "stats":
+            show_stats(outbox)
+        elif args.command == "dead":
+            show_dead(outbox, args.limit)
+        elif args.command == "requeue":
+            console.print(f"🔁 {outbox.requeue_dead(args.ids)} notificaciones reencoladas")
+        elif args.command == "purge":
+            console.print(f"🧹 {outbox.purge(args.days)} notificaciones enviadas borradas")
+        elif args.command == "drain":
+            result = asyncio.run(build_worker(args, outbox).drain())
+            console.print(f"✅ {result['sent']} enviadas, {result['retry']} a reintentar, "
+                          f"{result['dead']} a dead-letter")
+            show_stats(outbox)
+        elif args.command == "run":
+            console.print(f"📮 Worker del outbox {outbox.path} (Ctrl+C para detener)")
+            try:
+                asyncio.run(build_worker(args, outbox).run())
+            except KeyboardInterrupt:
+                console.print("\n⏹️ Worker detenido")
+    finally:
+        outbox.close()
+
+
+if __name__ == "__main__":
+    main()
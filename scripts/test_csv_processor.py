@@ -11,13 +11,13 @@ import json
 from pathlib import Path
 from typing import List, Dict, Any
 import argparse
-import time
 
 # Add app to path
 sys.path.append(str(Path(__file__).parent.parent))
 
 try:
     from app.core.csv_processor import CSVProcessor, MorosoRecord, generate_sample_csv
+    from app.core.csv_benchmark import CSVBenchmark, CSVBenchmarkConfig
     from rich.console import Console
     from rich.table import Table
     from rich.panel import Panel
@@ -362,32 +362,21 @@ user3,33333333,User Three,67,22000.00,true"""
             self.assert_test(False, "Procesamiento archivo de muestra", str(e))
     
     def run_performance_test(self):
-        """Test de rendimiento básico"""
+        """Test de rendimiento: tiempos por etapa y escala casi lineal"""
         console.print("\n🚀 [bold cyan]Test de Rendimiento[/bold cyan]")
         
-        # Generar CSV grande en memoria
-        large_csv_lines = ["username,dni,nombre,dias_mora,monto_deuda,excepcion,telefono"]
-        for i in range(1000):
-            large_csv_lines.append(f"user{i:04d},{20000000+i:08d},User {i},{30+i%100},{5000+i*10}.50,false,+54937941{i:05d}")
-        
-        large_csv_content = "\n".join(large_csv_lines)
-        temp_file = self.create_temp_csv(large_csv_content)
-        
         try:
-            processor = CSVProcessor(min_dias_mora=50)
-            
-            start_time = time.time()
-            records = processor.process_csv(temp_file)
-            end_time = time.time()
-            
-            processing_time = end_time - start_time
-            records_per_second = len(records) / processing_time if processing_time > 0 else 0
+            # Datasets en un directorio temporal que el benchmark borra al terminar
+            results = CSVBenchmark(CSVBenchmarkConfig(sizes=[1000, 10000], trace_memory=False)).run()
             
-            self.assert_test(processing_time < 5.0, "Tiempo de procesamiento razonable",
-                           f"Tiempo: {processing_time:.2f}s para 1000 registros")
+            largest = results['runs'][-1]
+            self.assert_test(largest['records_out'] > 0, "Procesamiento de dataset grande",
+                           f"{largest['records_out']} registros de {largest['rows']} filas "
+                           f"en {largest['total_s']:.2f}s ({largest['rows_per_s']:.0f} filas/s)")
             
-            self.assert_test(len(records) > 0, "Procesamiento de dataset grande",
-                           f"Registros procesados: {len(records)} en {processing_time:.2f}s ({records_per_second:.1f} rec/s)")
+            fit = results['fits']['legacy|utf-8|0']['total']
+            self.assert_test(fit['exponent'] < 1.5, "Escala casi lineal",
+                           f"Exponente {fit['exponent']:.2f}, {fit['us_per_row']:.1f}µs/fila")
             
         except Exception as e:
             self.assert_test(False, "Test de rendimiento", str(e))
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Test de la agenda de cobranza - Nordia ISP Suite
+Recorre día por día el ciclo de un suscriptor con MorosidadProcessor en modo
+simulación y verifica las acciones que ejecuta la agenda
+
+Uso:
+    python scripts/test_dunning_scheduler.py
+    pytest scripts/test_dunning_scheduler.py
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Servicios del backend de la UI
+sys.path.insert(0, str(Path(__file__).parent.parent / "ui" / "backend"))
+
+try:
+    import pandas as pd
+    import pytest
+    from app.services.mikrotik_service import MorosidadProcessor, NotificationSystem
+    from services.dunning_scheduler import DunningScheduler
+    from rich.console import Console
+    from rich.table import Table
+except ImportError as e:
+    if __name__ != "__main__":
+        # Bajo pytest: saltear el módulo sin cortar la colección de los demás tests
+        import pytest
+        pytest.skip(f"Dependencias no disponibles: {e}", allow_module_level=True)
+    print(f"❌ Error importando dependencias: {e}")
+    print("Instala las dependencias con: pip install -r requirements.txt")
+    sys.exit(1)
+
+console = Console()
+
+START = date(2026, 10, 1)
+CLIENT = {
+    "nombre": "Cliente Test", "dni": 30111222, "telefono": "+5493794000000", "email": "test@example.com",
+    "monto_deuda": 15000, "dias_mora": 27, "excepcion": False, "pago_recibido": False, "ip_address": "10.0.0.1",
+}
+
+
+def at(day: int) -> float:
+    """Mediodía del día `day` del escenario (las acciones vencen a la mañana)"""
+    return datetime.combine(START + timedelta(days=day), datetime.min.time()).timestamp() + 12 * 3600
+
+
+class Scenario:
+    """Agenda y procesador en un directorio temporal"""
+
+    def __init__(self, tmp: Path, name: str):
+        self.scheduler = DunningScheduler(tmp / f"{name}.sqlite3")
+        self.processor = MorosidadProcessor(
+            mode="simulation", notifier=NotificationSystem(outbox_path=str(tmp / f"{name}_outbox.sqlite3")))
+        self.log: List[Tuple[int, str]] = []
+
+    def export(self, day: int, as_of_day: Optional[int] = None, **changes):
+        """Export del día `day` (dias_mora contado a `as_of_day`, para simular fechas corridas)"""
+        as_of_day = day if as_of_day is None else as_of_day
+        self.scheduler.sync(pd.DataFrame([{**CLIENT, **changes}]), START + timedelta(days=as_of_day), now=at(day))
+
+    def run(self, day: int):
+        for item in self.scheduler.due(at(day)):
+            self.log.append((day, item.action))
+        self.processor.run_due(self.scheduler, now=at(day), flush_notifications=False)
+
+    def close(self):
+        self.scheduler.close()
+        self.processor.notifier.outbox.close()
+
+
+def check_reactivation_after_payment(scenario: Scenario) -> List[Tuple[int, str]]:
+    """Aviso el día 27, corte el 30 y pago con dias_mora en 0: se reactiva"""
+    for day in range(0, 5):
+        if day == 0:
+            scenario.export(day)
+        scenario.run(day)
+    scenario.export(5, dias_mora=0, pago_recibido=True)
+    scenario.run(5)
+    return [(0, "aviso_previo"), (3, "corte"), (5, "reactivacion")]
+
+
+def check_export_date_drift(scenario: Scenario) -> List[Tuple[int, str]]:
+    """Export con la fecha corrida un día después del corte: no se vuelve a avisar ni a cortar"""
+    scenario.export(0)
+    for day in range(0, 5):
+        scenario.run(day)
+    scenario.export(5, as_of_day=6, dias_mora=32)
+    for day in range(5, 10):
+        scenario.run(day)
+    return [(0, "aviso_previo"), (3, "corte")]
+
+
+def check_new_cycle_after_reactivation(scenario: Scenario) -> List[Tuple[int, str]]:
+    """Después de reactivar, una mora nueva vuelve a empezar por el aviso"""
+    expected = check_reactivation_after_payment(scenario)
+    scenario.export(40, dias_mora=27)
+    scenario.run(40)
+    return expected + [(40, "aviso_previo")]
+
+
+CHECKS: Dict[str, Callable[[Scenario], List[Tuple[int, str]]]] = {
+    "Reactivación tras pago": check_reactivation_after_payment,
+    "Fecha de export corrida": check_export_date_drift,
+    "Mora nueva tras reactivar": check_new_cycle_after_reactivation,
+}
+
+
+@pytest.fixture
+def scenario(tmp_path: Path):
+    scenario = Scenario(tmp_path, "test")
+    yield scenario
+    scenario.close()
+
+
+def test_reactivation_after_payment(scenario: Scenario):
+    assert scenario.log == check_reactivation_after_payment(scenario)
+
+
+def test_export_date_drift(scenario: Scenario):
+    assert scenario.log == check_export_date_drift(scenario)
+
+
+def test_new_cycle_after_reactivation(scenario: Scenario):
+    assert scenario.log == check_new_cycle_after_reactivation(scenario)
+
+
+def main():
+    table = Table(title="📅 Test de la agenda de cobranza")
+    table.add_column("Test", style="cyan")
+    table.add_column("Estado")
+    table.add_column("Acciones (día: acción)", style="yellow")
+
+    failed = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        for index, (name, check) in enumerate(CHECKS.items()):
+            scenario = Scenario(Path(tmp), f"test_{index}")
+            try:
+                expected = check(scenario)
+                ok = scenario.log == expected
+            except Exception as e:
+                console.print(f"❌ {name}: {e}")
+                ok = False
+            finally:
+                scenario.close()
+            failed += not ok
+            table.add_row(name, "✅ PASS" if ok else "❌ FAIL",
+                          ", ".join(f"{day}: {action}" for day, action in scenario.log))
+    console.print(table)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -36,6 +36,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from app.mikrotik.connection import MikrotikConnection, ConnectionConfig, MikrotikConnectionError
 from app.mikrotik.mock_router import create_mock_connection, generate_test_scenario
+from app.mikrotik.benchmark import RouterBenchmark, BenchmarkConfig
 
 console = Console()
 
@@ -345,63 +346,28 @@ class MikrotikTester:
             return False
     
     def run_benchmark(self) -> Dict[str, Any]:
-        """Ejecutar benchmark de rendimiento"""
+        """Ejecutar benchmark de rendimiento (ver scripts/bench_mikrotik.py para todas las opciones)"""
         console.print(Panel.fit(
             "[bold yellow]⚡ BENCHMARK DE RENDIMIENTO[/bold yellow]",
             border_style="yellow"
         ))
         
         if self.use_mock:
-            connection = create_mock_connection(simulate_delays=True)
+            config = BenchmarkConfig(transport='mock', latency=0.05, iterations=20, print_iterations=3)
         else:
-            connection = MikrotikConnection(self.config)
+            # Router real: solo lecturas (para disable/enable usar scripts/bench_mikrotik.py, que lo confirma aparte)
+            config = BenchmarkConfig(
+                transport=self.config.connection_type,
+                connection=self.config,
+                iterations=5,
+                print_iterations=1,
+                warmup=1,
+                writes=False
+            )
         
-        benchmark_results = {}
+        benchmark_results = RouterBenchmark(config).run()
         
-        with connection as mt:
-            # Benchmark: Obtener usuarios
-            start_time = time.time()
-            users = mt.get_ppp_secrets()
-            get_users_time = time.time() - start_time
-            
-            benchmark_results['get_users'] = {
-                'time': get_users_time,
-                'count': len(users),
-                'rate': len(users) / get_users_time if get_users_time > 0 else 0
-            }
-            
-            # Benchmark: Verificar estados individuales
-            if len(users) >= 5:
-                test_users = users[:5]
-                start_time = time.time()
-                
-                for user in test_users:
-                    mt.get_user_status(user['name'])
-                
-                status_check_time = time.time() - start_time
-                
-                benchmark_results['status_checks'] = {
-                    'time': status_check_time,
-                    'count': len(test_users),
-                    'avg_time': status_check_time / len(test_users)
-                }
-            
-            # Benchmark: Operaciones de cambio de estado
-            if len(users) >= 2:
-                test_user = users[0]['name']
-                
-                start_time = time.time()
-                mt.disable_ppp_user(test_user)
-                mt.enable_ppp_user(test_user)
-                operation_time = time.time() - start_time
-                
-                benchmark_results['state_operations'] = {
-                    'time': operation_time,
-                    'operations': 2,
-                    'avg_time': operation_time / 2
-                }
-        
-        self._print_benchmark_results(benchmark_results)
+        self._print_benchmark_results(benchmark_results['operations'])
         return benchmark_results
     
     def _print_summary(self, results: Dict[str, Any]):
@@ -456,18 +422,21 @@ class MikrotikTester:
         """Imprimir resultados de benchmark"""
         table = Table(title="⚡ Resultados de Benchmark")
         table.add_column("Operación", style="cyan")
-        table.add_column("Tiempo Total", style="green")
         table.add_column("Cantidad", style="yellow")
-        table.add_column("Promedio", style="magenta")
+        table.add_column("p50", style="green")
+        table.add_column("p95", style="magenta")
+        table.add_column("Max", style="magenta")
         table.add_column("Rate", style="blue")
         
         for operation, data in results.items():
-            total_time = f"{data['time']:.3f}s"
-            count = str(data.get('count', 1))
-            avg_time = f"{data.get('avg_time', data['time']):.3f}s"
-            rate = f"{data.get('rate', 0):.1f}/s" if 'rate' in data else "N/A"
-            
-            table.add_row(operation, total_time, count, avg_time, rate)
+            table.add_row(
+                operation,
+                str(data['count']),
+                f"{data['p50_ms']:.1f}ms",
+                f"{data['p95_ms']:.1f}ms",
+                f"{data['max_ms']:.1f}ms",
+                f"{data['throughput_ops_s']:.1f}/s"
+            )
         
         console.print(table)
 
@@ -1,12 +1,13 @@
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import hashlib
 import random
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict
 
-import pandas as pd
 import urllib.parse
 from fastapi import Depends, FastAPI, Form, Request
 from fastapi.middleware.cors import CORSMiddleware
@@ -17,15 +18,32 @@ from pydantic import BaseModel
 
 from .deps import get_brand_config
 from .routers import dashboard, dashboard_real, mikrotik, tenants
+from services import client_index
+from services.executor import blocking
+from services.tenant_registry import tenant_registry
 
 BASE_DIR = Path(__file__).resolve().parent
 TEMPLATES_DIR = BASE_DIR / "templates"
 STATIC_DIR = BASE_DIR / "static"
-CSV_PATH = Path(__file__).resolve().parents[3] / "data" / "sample_morosos.csv"
 FAVICON_PATH = Path(__file__).resolve().parents[3] / "favicon.ico"
 PAYMENT_REDIRECT_DELAY = 5
 
-app = FastAPI(title="Nordia ISP Suite API", version="0.1.0")
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Temas cargados antes del primer request; luego se vigilan en segundo plano
+    tenant_registry.reload()
+    watcher = asyncio.create_task(tenant_registry.watch())
+    try:
+        yield
+    finally:
+        watcher.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await watcher
+        blocking.shutdown(wait=False)
+
+
+app = FastAPI(title="Nordia ISP Suite API", version="0.1.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -46,6 +64,7 @@ templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
 async def inject_brand(request: Request, call_next):
     tenant = request.headers.get("X-Tenant-ID") or request.query_params.get("tenant")
     request.state.tenant = tenant or "default"
+    request.state.brand = tenant_registry.resolve(request.state.tenant)
     return await call_next(request)
 
 
@@ -55,6 +74,8 @@ async def health(brand=Depends(get_brand_config)):
         "status": "ok",
         "tenant": brand["id"],
         "brand": brand["name"],
+        "tenants": len(tenant_registry),
+        "tenants_version": tenant_registry.version,
     }
 
 
@@ -76,25 +97,13 @@ async def portal_suspended(request: Request, client_ip: str):
 
     client_data = _build_default_client(client_ip)
 
-    if CSV_PATH.exists():
-        try:
-            df = pd.read_csv(CSV_PATH)
-            if "IP_Address" in df.columns:
-                client_row = df[df["IP_Address"] == client_ip]
-                if not client_row.empty:
-                    row = client_row.iloc[0]
-                    client_data = {
-                        "id": hashlib.md5(str(row.get("DNI", client_ip)).encode(), usedforsecurity=False).hexdigest()[:8],
-                        "name": row.get("Nombre", client_data["name"]),
-                        "dni_masked": "****" + str(row.get("DNI", "0000"))[-4:],
-                        "plan": row.get("Plan", client_data["plan"]),
-                        "days_overdue": int(row.get("Dias Mora", client_data["days_overdue"])),
-                        "debt_amount": float(row.get("Monto Deuda", client_data["debt_amount"])),
-                        "ip": client_ip,
-                    }
-        except Exception:
-            # Si falla la lectura del CSV, mantenemos los datos simulados.
-            pass
+    try:
+        client = await client_index.lookup_client_async(client_ip, request.state.tenant)
+    except Exception:
+        # Si falla la lectura del CSV, mantenemos los datos simulados.
+        client = None
+    if client:
+        client_data.update(client)
 
     return_path = f"/portal/suspended/{client_data['ip']}"
     payment_url = f"/api/process-payment/{client_data['id']}?return_to={urllib.parse.quote(return_path)}"
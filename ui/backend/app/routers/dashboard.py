@@ -1,15 +1,17 @@
-from fastapi import APIRouter, Depends
+from typing import Literal
 
-from ..deps import get_brand_with_request
+from fastapi import APIRouter, Depends, Query, Response
+
+from ..deps import get_brand_with_request, get_tenant
 from services import data_loader
+from services.executor import run_blocking
 
 router = APIRouter(tags=["dashboard"])
 
 
 @router.get("/dashboard")
-async def get_dashboard(brand=Depends(get_brand_with_request)):
-    summary = data_loader.load_summary()
-    jobs = data_loader.load_jobs()
+async def get_dashboard(brand=Depends(get_brand_with_request), tenant: str = Depends(get_tenant)):
+    summary, jobs = await run_blocking(data_loader.load_dashboard, tenant, key=("dashboard", tenant))
     return {
         "tenant": brand["id"],
         "brand": brand,
@@ -19,10 +21,34 @@ async def get_dashboard(brand=Depends(get_brand_with_request)):
 
 
 @router.get("/jobs")
-async def get_jobs():
-    return data_loader.load_jobs()
+async def get_jobs(
+    response: Response,
+    limit: int = Query(data_loader.JOBS_DEFAULT_LIMIT, ge=1, le=data_loader.JOBS_MAX_LIMIT),
+    cursor: int | None = Query(None, ge=0),
+    tenant: str = Depends(get_tenant),
+):
+    # El cuerpo sigue siendo la lista de jobs; la página siguiente va en X-Next-Cursor
+    jobs, next_cursor = await run_blocking(
+        data_loader.load_jobs_page, limit, cursor, tenant, key=("jobs", tenant, limit, cursor)
+    )
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = str(next_cursor)
+    return jobs
 
 
 @router.get("/reports")
-async def get_reports():
-    return data_loader.list_reports()
+async def get_reports(
+    response: Response,
+    sort: Literal["date", "size", "name"] = "date",
+    order: Literal["asc", "desc"] = "desc",
+    mode: Literal["dry-run", "execute", "rollback"] | None = None,
+    limit: int | None = Query(None, ge=1, le=data_loader.REPORTS_MAX_LIMIT),
+    offset: int = Query(0, ge=0),
+    tenant: str = Depends(get_tenant),
+):
+    reports, total = await run_blocking(
+        data_loader.list_reports, sort, order == "desc", mode, limit, offset, tenant,
+        key=("reports", tenant, sort, order, mode, limit, offset),
+    )
+    response.headers["X-Total-Count"] = str(total)
+    return reports
@@ -3,53 +3,41 @@
 Elimina datos hardcodeados y usa información real
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from typing import Dict, Any
-import pandas as pd
-from datetime import datetime
-from pathlib import Path
 
-router = APIRouter(tags=["dashboard-real"])
+from ..deps import get_tenant
+from services.dashboard_metrics import aggregates_stale, get_aggregates_async
 
-# Ruta al CSV real
-CSV_PATH = Path(__file__).resolve().parents[4] / "data" / "sample_morosos.csv"
+router = APIRouter(tags=["dashboard-real"])
 
-def load_real_dashboard_data() -> Dict[str, Any]:
-    """Cargar datos REALES del CSV en lugar de hardcodeados"""
+async def load_real_dashboard_data(tenant: str | None = None) -> Dict[str, Any]:
+    """Cargar datos REALES del CSV (agregados cacheados) en lugar de hardcodeados"""
     try:
-        # Leer CSV real
-        df = pd.read_csv(CSV_PATH)
+        agg = await get_aggregates_async(tenant)
         
-        # Calcular métricas REALES
-        total_clientes = len(df)
-        morosos_activos = len(df[df['dias_mora'] > 0])
-        cortes_pendientes = len(df[df['dias_mora'] >= 30])
-        deuda_total = float(df['monto_deuda'].sum())
+        # Métricas REALES precalculadas
+        total_clientes = agg.total_clientes
+        cortes_pendientes = agg.cortes_pendientes
+        deuda_total = agg.deuda_total
         
         # Calcular ROI y ahorros
         tiempo_manual_horas = round(total_clientes * 5 / 60, 1)  # 5 min por cliente
-        recupero_proyectado = float(df[df['dias_mora'] >= 30]['monto_deuda'].sum() * 0.75)
-        
-        # Peor moroso (más días)
-        peor_idx = df['dias_mora'].idxmax()
-        peor_moroso = {
-            "nombre": df.loc[peor_idx, 'nombre'],
-            "dias": int(df.loc[peor_idx, 'dias_mora']),
-            "deuda": float(df.loc[peor_idx, 'monto_deuda'])
-        }
+        recupero_proyectado = agg.deuda_cortable * 0.75
         
         return {
             "origen": "CSV_CLIENTE_REAL",
-            "archivo": "sample_morosos.csv",
-            "fecha_analisis": datetime.now().isoformat(),
+            "archivo": agg.archivo,
+            "fecha_analisis": agg.calculado,
+            "cache_desactualizado": aggregates_stale(tenant),
             "metricas_reales": {
                 "clients_active": total_clientes,
-                "morosos_activos": morosos_activos,
+                "morosos_activos": agg.morosos_activos,
                 "pending_cuts": cortes_pendientes,
                 "deuda_total": deuda_total,
                 "recupero_proyectado": recupero_proyectado,
-                "dias_mora_promedio": round(float(df['dias_mora'].mean()), 1),
-                "peor_moroso": peor_moroso
+                "dias_mora_promedio": agg.dias_mora_promedio,
+                "peor_moroso": agg.peor_moroso
             },
             "comparacion_vs_hardcoded": {
                 "antes_hardcode": {
@@ -86,12 +74,12 @@ def load_real_dashboard_data() -> Dict[str, Any]:
         raise HTTPException(status_code=500, detail=f"Error leyendo CSV: {str(e)}")
 
 @router.get("/dashboard/real")
-async def get_dashboard_real():
+async def get_dashboard_real(tenant: str = Depends(get_tenant)):
     """
     Dashboard con datos REALES del CSV del cliente
     Reemplaza los datos hardcodeados con información real
     """
-    data = load_real_dashboard_data()
+    data = await load_real_dashboard_data(tenant)
     
     return {
         "success": True,
@@ -100,17 +88,17 @@ async def get_dashboard_real():
     }
 
 @router.get("/dashboard/summary-real")
-async def get_summary_real():
+async def get_summary_real(tenant: str = Depends(get_tenant)):
     """
     Resumen compatible con frontend existente pero con datos REALES
     """
     try:
-        df = pd.read_csv(CSV_PATH)
+        agg = await get_aggregates_async(tenant)
         
         # Datos REALES calculados del CSV
-        total_clientes = len(df)
-        cortes_pendientes = len(df[df['dias_mora'] >= 30])
-        deuda_total = float(df['monto_deuda'].sum())
+        total_clientes = agg.total_clientes
+        cortes_pendientes = agg.cortes_pendientes
+        deuda_total = agg.deuda_total
         tiempo_ahorrado = max(12 - (total_clientes * 0.1), 1)  # Realista
         
         return {
@@ -124,10 +112,10 @@ async def get_summary_real():
             
             # NUEVO: Indicadores de que son datos REALES
             "data_source": "CSV_REAL",
-            "csv_file": "sample_morosos.csv",
-            "last_updated": datetime.now().isoformat(),
+            "csv_file": agg.archivo,
+            "last_updated": agg.calculado,
             "total_debt": deuda_total,
-            "recoverable_today": float(df[df['dias_mora'] >= 30]['monto_deuda'].sum())
+            "recoverable_today": agg.deuda_cortable
         }
     except Exception as e:
         # Fallback a datos hardcodeados si falla
@@ -143,26 +131,23 @@ async def get_summary_real():
         }
 
 @router.get("/dashboard/business-metrics")
-async def get_business_metrics():
+async def get_business_metrics(tenant: str = Depends(get_tenant)):
     """
     💼 Métricas de NEGOCIO para dueños de ISPs
     Enfoque en dinero, acciones y ROI concreto
     """
     try:
-        df = pd.read_csv(CSV_PATH)
+        agg = await get_aggregates_async(tenant)
         
         # Cálculos de negocio REALES
-        total_clientes = len(df)
-        morosos = df[df['dias_mora'] > 0]
-        cortables_hoy = df[df['dias_mora'] >= 30]
-        deuda_total = float(df['monto_deuda'].sum())
-        recuperable_inmediato = float(cortables_hoy['monto_deuda'].sum())
-        promedio_por_cliente = float(df['monto_deuda'].mean())
+        deuda_total = agg.deuda_total
+        recuperable_inmediato = agg.deuda_cortable
+        promedio_por_cliente = agg.deuda_promedio
         
         # ROI y tiempo
         costo_hora_empleado = 1500  # ARS por hora
         minutos_por_gestion = 8
-        tiempo_manual_horas = (len(cortables_hoy) * minutos_por_gestion) / 60
+        tiempo_manual_horas = (agg.cortes_pendientes * minutos_por_gestion) / 60
         costo_gestion_manual = tiempo_manual_horas * costo_hora_empleado
         
         return {
@@ -181,7 +166,7 @@ async def get_business_metrics():
                     "id": "para_cortar_hoy",
                     "icon": "⚡",
                     "title": "Para cortar HOY",
-                    "value": len(cortables_hoy),
+                    "value": agg.cortes_pendientes,
                     "format": "number",
                     "tooltip": "Clientes con +30 días de mora. Acción inmediata para recuperar ingresos.",
                     "trend": "urgent",
@@ -233,7 +218,7 @@ async def get_business_metrics():
                 {
                     "id": "ejecutar_cortes",
                     "title": "Ejecutar cortes masivos",
-                    "description": f"Cortar {len(cortables_hoy)} servicios y recuperar ${int(recuperable_inmediato):,}",
+                    "description": f"Cortar {agg.cortes_pendientes} servicios y recuperar ${int(recuperable_inmediato):,}",
                     "icon": "⚡",
                     "urgent": True,
                     "estimated_time": "5 minutos",
@@ -242,7 +227,7 @@ async def get_business_metrics():
                 {
                     "id": "enviar_notificaciones",
                     "title": "Notificar morosos",
-                    "description": f"Avisar a {len(morosos)} clientes antes del corte",
+                    "description": f"Avisar a {agg.morosos_activos} clientes antes del corte",
                     "icon": "📧",
                     "urgent": False,
                     "estimated_time": "2 minutos",
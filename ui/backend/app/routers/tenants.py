@@ -1,12 +1,17 @@
 from fastapi import APIRouter
 
+from services.tenant_data import tenant_cache
+from services.tenant_registry import tenant_registry
+
 router = APIRouter(prefix="/tenants", tags=["tenants"])
 
 
 @router.get("")
 async def list_tenants():
-    return [
-        {"id": "default", "name": "Nordia ISP Suite"},
-        {"id": "telecorr", "name": "TeleCorrientes SA"},
-        {"id": "isp_demo", "name": "Demo ISP"},
-    ]
+    return tenant_registry.list_tenants()
+
+
+@router.get("/cache")
+async def tenant_cache_stats():
+    """Uso de la caché de datos por tenant (bytes, hits, misses, desalojos)."""
+    return tenant_cache.stats()
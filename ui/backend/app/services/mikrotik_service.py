@@ -3,20 +3,37 @@
 Sistema real de corte de servicio y comunicación con clientes
 """
 
+import asyncio
+import io
 import os
+import threading
 
 import paramiko
 import requests
 import time
+from collections import deque
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, TextIO, Tuple, Union
+import numpy as np
 import pandas as pd
+from pandas.api.types import is_numeric_dtype
 from twilio.rest import Client
-import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import logging
 
+from services.batch_pipeline import Pipeline, Stage, StageStats
+from services.dunning_scheduler import DEFAULT_POLICY, DEFAULT_SCHEDULE_PATH, DunningScheduler
+from services.notify_dispatch import (
+    DEFAULT_CHANNEL_LIMITS, ChannelLimits, Notification, NotificationDispatcher, NotificationProvider,
+    ThreadedProvider,
+)
+from services.notify_outbox import DEFAULT_OUTBOX_PATH, NotificationOutbox, OutboxWorker
+from services.notify_templates import NotificationTemplates, notification_templates
+from services.report_sink import ReportCounters, ReportWriter
+from services.smtp_pool import SMTPPool
+
 # Configuración
 MIKROTIK_CONFIG = {
     'host': '192.168.88.1',  # IP del MikroTik
@@ -41,6 +58,24 @@ EMAIL_CONFIG = {
     'password': 'app_password'
 }
 
+# Outbox de notificaciones (SQLite): lo que no se pudo enviar sobrevive a un corte del proceso
+OUTBOX_PATH = os.getenv('NORDIA_OUTBOX_PATH', str(DEFAULT_OUTBOX_PATH))
+
+# Pipeline de process_batch: clientes por chunk, chunks en vuelo entre etapas y conexiones SSH al router
+PIPELINE_CHUNK = 500
+PIPELINE_QUEUE = 4
+ROUTER_CHUNK = 20  # chunks chicos en el router: cada cliente son varios comandos SSH
+ROUTER_WORKERS = int(os.getenv('NORDIA_ROUTER_WORKERS', '4'))
+
+# Resultados que MorosidadProcessor guarda en memoria (los últimos N; 0 = ninguno). El reporte
+# completo se escribe a medida que se procesa con stream_report()
+HISTORY_LIMIT = int(os.getenv('NORDIA_HISTORY_LIMIT', '1000'))
+
+# Agenda de cobranza (services/dunning_scheduler): acciones vencidas por tanda y espera ante un error
+SCHEDULE_PATH = os.getenv('NORDIA_SCHEDULE_PATH', str(DEFAULT_SCHEDULE_PATH))
+SCHEDULE_BATCH = 500
+SCHEDULE_RETRY_SECONDS = 900
+
 logger = logging.getLogger(__name__)
 
 class MikroTikController:
@@ -69,6 +104,12 @@ class MikroTikController:
             logger.error(f"❌ Error conectando a MikroTik: {str(e)}")
             return False
     
+    def close(self):
+        """Cerrar la sesión SSH"""
+        if self.ssh_client is not None:
+            self.ssh_client.close()
+        self.connected = False
+    
     def execute_command(self, command: str) -> str:
         """Ejecutar comando en MikroTik"""
         if not self.connected:
@@ -211,11 +252,29 @@ class MikroTikController:
 class NotificationSystem:
     """Sistema de notificaciones multicanal"""
     
-    def __init__(self):
+    def __init__(self, providers: Optional[Dict[str, NotificationProvider]] = None,
+                 limits: Optional[Dict[str, ChannelLimits]] = None, outbox_path: Optional[str] = None):
         self.twilio_client = None
         self.email_configured = False
+        self.smtp_pool: Optional[SMTPPool] = None
         self.setup()
         
+        # Envío por lotes: concurrencia y ritmo por canal. Los proveedores se pueden
+        # reemplazar (p. ej. HTTPProvider contra un stub local para benchmarks)
+        limits = {**DEFAULT_CHANNEL_LIMITS, **(limits or {})}
+        self.dispatcher = NotificationDispatcher(
+            providers or {
+                'whatsapp': ThreadedProvider(self._deliver_whatsapp, limits['whatsapp'].concurrency),
+                'sms': ThreadedProvider(self._deliver_sms, limits['sms'].concurrency),
+                'email': ThreadedProvider(self._deliver_email, limits['email'].concurrency),
+            },
+            limits,
+        )
+        
+        # Las notificaciones se encolan y el worker las envía en lotes, con reintentos
+        self.outbox = NotificationOutbox(outbox_path or OUTBOX_PATH)
+        self.outbox_worker = OutboxWorker(self.outbox, self.dispatcher)
+        
     def setup(self):
         """Configurar servicios de notificación"""
         try:
@@ -225,7 +284,8 @@ class NotificationSystem:
                 TWILIO_CONFIG['auth_token']
             )
             
-            # Verificar email
+            # Email: sesiones SMTP reutilizadas entre envíos (una conexión por email satura al proveedor)
+            self.smtp_pool = SMTPPool.from_config(EMAIL_CONFIG)
             self.email_configured = True
             
         except Exception as e:
@@ -234,11 +294,7 @@ class NotificationSystem:
     def send_whatsapp(self, to_number: str, message: str) -> bool:
         """Enviar mensaje por WhatsApp"""
         try:
-            message = self.twilio_client.messages.create(
-                from_=TWILIO_CONFIG['whatsapp_from'],
-                body=message,
-                to=f'whatsapp:{to_number}'
-            )
+            self._twilio_create(TWILIO_CONFIG['whatsapp_from'], f'whatsapp:{to_number}', message)
             logger.info(f"✅ WhatsApp enviado a {to_number}")
             return True
         except Exception as e:
@@ -248,11 +304,7 @@ class NotificationSystem:
     def send_sms(self, to_number: str, message: str) -> bool:
         """Enviar SMS"""
         try:
-            message = self.twilio_client.messages.create(
-                from_=TWILIO_CONFIG['sms_from'],
-                body=message,
-                to=to_number
-            )
+            self._twilio_create(TWILIO_CONFIG['sms_from'], to_number, message)
             logger.info(f"✅ SMS enviado a {to_number}")
             return True
         except Exception as e:
@@ -262,19 +314,7 @@ class NotificationSystem:
     def send_email(self, to_email: str, subject: str, body: str, is_html: bool = True) -> bool:
         """Enviar email"""
         try:
-            msg = MIMEMultipart('alternative')
-            msg['Subject'] = subject
-            msg['From'] = EMAIL_CONFIG['email']
-            msg['To'] = to_email
-            
-            part = MIMEText(body, 'html' if is_html else 'plain')
-            msg.attach(part)
-            
-            with smtplib.SMTP(EMAIL_CONFIG['smtp_server'], EMAIL_CONFIG['smtp_port']) as server:
-                server.starttls()
-                server.login(EMAIL_CONFIG['email'], EMAIL_CONFIG['password'])
-                server.send_message(msg)
-            
+            self._smtp_send(self._build_email(to_email, subject, body, is_html))
             logger.info(f"✅ Email enviado a {to_email}")
             return True
             
@@ -282,127 +322,306 @@ class NotificationSystem:
             logger.error(f"❌ Error enviando email: {str(e)}")
             return False
 
+    def enqueue(self, notifications: List[Notification]) -> List[bool]:
+        """Encolar notificaciones en el outbox; False para las ya encoladas hoy (no se reenvían)"""
+        if not notifications:
+            return []
+        return self.outbox.enqueue(notifications)
+
+    def flush(self) -> Dict:
+        """Enviar ahora todo lo vencido del outbox (los reintentos a futuro quedan para el worker)"""
+        return asyncio.run(self.outbox_worker.drain())
+
+    def flush_until(self, done: threading.Event, poll_interval: float = 0.05) -> Dict:
+        """Enviar lo que se va encolando hasta que se setee `done` y no quede nada vencido"""
+        return asyncio.run(self._drain_until(done, poll_interval))
+
+    async def _drain_until(self, done: threading.Event, poll_interval: float) -> Dict:
+        totals = {'sent': 0, 'retry': 0, 'dead': 0}
+        while True:
+            # Leer done antes de vaciar: lo encolado justo antes de setearlo entra en esta vuelta
+            finished = done.is_set()
+            result = await self.outbox_worker.drain()
+            for key, value in result.items():
+                totals[key] += value
+            if finished:
+                return totals
+            await asyncio.sleep(poll_interval)
+
+    def close(self):
+        """Cerrar las sesiones SMTP abiertas"""
+        if self.smtp_pool is not None:
+            self.smtp_pool.close()
+
+    def _twilio_create(self, from_: str, to: str, body: str):
+        return self.twilio_client.messages.create(from_=from_, body=body, to=to)
+
+    def _smtp_send(self, msg: MIMEMultipart):
+        if self.smtp_pool is None:
+            self.smtp_pool = SMTPPool.from_config(EMAIL_CONFIG)
+        return self.smtp_pool.send(msg)
+
+    @staticmethod
+    def _build_email(to_email: str, subject: str, body: str, is_html: bool = True) -> MIMEMultipart:
+        msg = MIMEMultipart('alternative')
+        msg['Subject'] = subject
+        msg['From'] = EMAIL_CONFIG['email']
+        msg['To'] = to_email
+        msg.attach(MIMEText(body, 'html' if is_html else 'plain'))
+        return msg
+
+    # Funciones bloqueantes de los proveedores del dispatcher (lanzan excepción si fallan)
+    def _deliver_whatsapp(self, notification: Notification):
+        return self._twilio_create(TWILIO_CONFIG['whatsapp_from'], f'whatsapp:{notification.to}', notification.body).sid
+
+    def _deliver_sms(self, notification: Notification):
+        return self._twilio_create(TWILIO_CONFIG['sms_from'], notification.to, notification.body).sid
+
+    def _deliver_email(self, notification: Notification):
+        return self._smtp_send(self._build_email(notification.to, notification.subject or '', notification.body))
+
+@dataclass
+class ClientPlan:
+    """Decisión sobre un cliente: notificaciones a enviar y acción a ejecutar en el router"""
+    result: Dict
+    notifications: List[Notification] = field(default_factory=list)
+    router_action: Optional[str] = None  # 'disable', 'enable' o None
+    reason: str = ''
+
+@dataclass(frozen=True)
+class MessageSpec:
+    """Notificación de una acción: plantilla (services/notify_templates), canal y campo de destino"""
+    template: str
+    channel: str
+    tipo: str
+    to_field: str
+    subject: Optional[str] = None
+
+# Notificaciones por acción, en el orden en que se envían
+MESSAGES = {
+    'aviso_previo': [
+        MessageSpec('aviso_previo.whatsapp', 'whatsapp', 'whatsapp_warning', 'telefono'),
+        MessageSpec('aviso_previo.email', 'email', 'email_warning', 'email', subject='aviso_previo.subject'),
+    ],
+    'corte': [
+        MessageSpec('corte.whatsapp', 'whatsapp', 'notificacion_corte', 'telefono'),
+        MessageSpec('corte.sms', 'sms', 'notificacion_corte', 'telefono'),
+    ],
+    'reactivacion': [
+        MessageSpec('reactivacion.whatsapp', 'whatsapp', 'whatsapp_reactivacion', 'telefono'),
+    ],
+    # Solo desde la agenda de cobranza (run_due): sigue cortado pasado el día de escalamiento
+    'escalamiento': [
+        MessageSpec('escalamiento.whatsapp', 'whatsapp', 'whatsapp_escalamiento', 'telefono'),
+    ],
+}
+
+def _text(value) -> str:
+    """Contacto del CSV como texto ('' si falta o quedó NaN)"""
+    if value is None or (isinstance(value, float) and value != value):
+        return ''
+    return str(value)
+
 class MorosidadProcessor:
     """Procesador principal que integra todo"""
     
-    def __init__(self, mode: str = "production"):
+    def __init__(self, mode: str = "production", notifier: Optional[NotificationSystem] = None,
+                 tenant: Optional[str] = None, templates: Optional[NotificationTemplates] = None,
+                 history_limit: Optional[int] = None):
         self.mode = mode  # "production" o "simulation"
         self.mikrotik = MikroTikController(MIKROTIK_CONFIG) if mode == "production" else None
-        self.notifier = NotificationSystem()
-        self.history = []
+        self.notifier = notifier or NotificationSystem()
+        # Textos de las notificaciones: plantillas del tenant, compiladas al importar el módulo
+        self.tenant = tenant
+        self.templates = templates or notification_templates
+        # Historial acotado; los totales del reporte cuentan todos los clientes procesados
+        self.history = deque(maxlen=HISTORY_LIMIT if history_limit is None else history_limit)
+        self.report_counters = ReportCounters()
+        self.report_writer: Optional[ReportWriter] = None
         
     def process_client(self, client: Dict) -> Dict:
-        """Procesar un cliente moroso con el flujo completo"""
+        """Procesar un cliente moroso con el flujo completo (las notificaciones quedan en el outbox)"""
+        plan = self.plan_client(client)
+        return self.complete_client(plan, self.notifier.enqueue(plan.notifications))
+    
+    @staticmethod
+    def classify(client: Dict) -> Optional[str]:
+        """Acción que corresponde al cliente: 'aviso_previo', 'corte', 'reactivacion' o None"""
+        # PASO 1: NOTIFICACIÓN PREVIA (3 días antes)
+        if client['dias_mora'] == DEFAULT_POLICY.warn_day:
+            return 'aviso_previo'
+        # PASO 2: CORTE DE SERVICIO (30+ días)
+        if client['dias_mora'] >= DEFAULT_POLICY.cut_day and not client.get('excepcion', False):
+            return 'corte'
+        # PASO 3: REACTIVACIÓN (cuando paga)
+        if client.get('pago_recibido', False):
+            return 'reactivacion'
+        return None
+    
+    def classify_batch(self, df: pd.DataFrame) -> Optional[List[Optional[str]]]:
+        """Acción de todos los clientes del lote de una vez, con el mismo criterio que classify
+        
+        Returns:
+            Una acción (o None) por fila; None si dias_mora falta o no es numérico
+            (en ese caso se decide cliente por cliente y los errores se cuentan por fila)
+        """
+        if 'dias_mora' not in df or not is_numeric_dtype(df['dias_mora']):
+            return None
+        dias = df['dias_mora']
+        aviso = (dias == DEFAULT_POLICY.warn_day).to_numpy()
+        corte = ~aviso & (dias >= DEFAULT_POLICY.cut_day).to_numpy() & ~self._flag(df, 'excepcion')
+        reactivacion = ~aviso & ~corte & self._flag(df, 'pago_recibido')
+        acciones = np.select([aviso, corte, reactivacion], ['aviso_previo', 'corte', 'reactivacion'], default='')
+        return [accion or None for accion in acciones.tolist()]
+    
+    @staticmethod
+    def _flag(df: pd.DataFrame, column: str) -> np.ndarray:
+        # Misma veracidad que client.get(column, False): NaN cuenta como verdadero
+        if column not in df:
+            return np.zeros(len(df), dtype=bool)
+        return df[column].astype(bool).to_numpy()
+    
+    def plan_client(self, client: Dict) -> ClientPlan:
+        """Decidir qué hacer con el cliente y armar sus notificaciones, sin enviar nada"""
+        return self.plan_action(client, self.classify(client))
+    
+    def plan_action(self, client: Dict, accion: Optional[str]) -> ClientPlan:
+        """Armar el plan de una acción ya decidida (por classify o por la agenda de cobranza)"""
+        plan = self._new_plan(client)
+        if accion is None:
+            return plan
+        
+        for spec in MESSAGES[accion]:
+            subject = self.templates.render(spec.subject, client, self.tenant) if spec.subject else None
+            plan.notifications.append(Notification(
+                client['dni'], spec.channel, _text(client.get(spec.to_field)),
+                self.templates.render(spec.template, client, self.tenant), spec.tipo, subject=subject))
+        self._set_router_action(plan, accion, client)
+        return plan
+    
+    def plan_batch(self, df: pd.DataFrame,
+                   acciones: Optional[List[Optional[str]]] = None) -> Tuple[List[ClientPlan], int]:
+        """Planificar un lote: decisión vectorizada y textos renderizados por columnas
+        
+        Los clientes se agrupan por acción y cada plantilla se renderiza una vez
+        para todo su grupo (render_batch), en lugar de un render por cliente.
         
-        result = {
+        Args:
+            df: Clientes del lote
+            acciones: Resultado de classify_batch si ya se calculó para estas filas
+        
+        Returns:
+            Planes en el orden del CSV y cantidad de clientes con error
+        """
+        if acciones is None:
+            acciones = self.classify_batch(df)
+        plans: List[Optional[ClientPlan]] = []
+        grupos: Dict[str, List[int]] = {}
+        errores = 0
+        for position, client in enumerate(df.to_dict('records')):
+            try:
+                plan = self._new_plan(client)
+                accion = acciones[position] if acciones is not None else self.classify(client)
+            except Exception as e:
+                logger.error(f"Error procesando cliente {client.get('nombre', 'Unknown')}: {str(e)}")
+                errores += 1
+                plans.append(None)
+                continue
+            if accion is not None:
+                grupos.setdefault(accion, []).append(position)
+                self._set_router_action(plan, accion, client)
+            plans.append(plan)
+        
+        for accion, positions in grupos.items():
+            grupo = df.iloc[positions]
+            try:
+                mensajes = []
+                for spec in MESSAGES[accion]:
+                    bodies = self.templates.render_batch(spec.template, grupo, self.tenant)
+                    subjects = (self.templates.render_batch(spec.subject, grupo, self.tenant) if spec.subject
+                                else [None] * len(positions))
+                    destinos = ([_text(value) for value in grupo[spec.to_field].tolist()]
+                                if spec.to_field in grupo else [''] * len(positions))
+                    mensajes.append((spec, bodies, subjects, destinos))
+            except KeyError as e:
+                # Falta una columna que usan los textos: como en plan_client, esos clientes son errores
+                logger.error(f"Error armando notificaciones de {accion}: falta {str(e)}")
+                errores += len(positions)
+                for position in positions:
+                    plans[position] = None
+                continue
+            
+            for row, position in enumerate(positions):
+                plan = plans[position]
+                subscriber = plan.result['dni']
+                for spec, bodies, subjects, destinos in mensajes:
+                    plan.notifications.append(Notification(subscriber, spec.channel, destinos[row], bodies[row],
+                                                           spec.tipo, subject=subjects[row]))
+        
+        return [plan for plan in plans if plan is not None], errores
+    
+    @staticmethod
+    def _new_plan(client: Dict) -> ClientPlan:
+        return ClientPlan({
             'cliente': client['nombre'],
             'dni': client['dni'],
             'ip': client.get('ip_address', '192.168.1.100'),
             'timestamp': datetime.now().isoformat(),
             'acciones': []
-        }
+        })
+    
+    @staticmethod
+    def _set_router_action(plan: ClientPlan, accion: str, client: Dict):
+        if accion == 'corte':
+            # EJECUTAR CORTE EN MIKROTIK (después de notificar)
+            plan.router_action = 'disable'
+            plan.reason = f"Mora {client['dias_mora']} días"
+        elif accion == 'reactivacion':
+            # REACTIVAR EN MIKROTIK
+            plan.router_action = 'enable'
+    
+    def complete_client(self, plan: ClientPlan, queued: List[bool]) -> Dict:
+        """Registrar las notificaciones encoladas y ejecutar la acción en el router"""
+        result = self._complete(plan, queued, self.mikrotik)
+        self._record(result)
+        return result
+    
+    def _complete(self, plan: ClientPlan, queued: List[bool], mikrotik: Optional[MikroTikController]) -> Dict:
+        result = plan.result
+        ip = result['ip']
+        timestamp = datetime.now().isoformat()
         
-        # PASO 1: NOTIFICACIÓN PREVIA (3 días antes)
-        if client['dias_mora'] == 27:
-            mensaje = f"""
-            🔔 AVISO IMPORTANTE - ISP Network
-            
-            Estimado/a {client['nombre']},
-            
-            Su servicio tiene un saldo pendiente de ${client['monto_deuda']}.
-            Días de mora: {client['dias_mora']}
-            
-            ⚠️ Si no regulariza su situación en 3 días, 
-            su servicio será suspendido automáticamente.
-            
-            💳 Puede pagar por:
-            • MercadoPago: link.mercadopago.com.ar/ispnetwork
-            • Transferencia: CBU 0000003100056789123456
-            • Efectivo: En nuestras oficinas
-            
-            Ignore este mensaje si ya realizó el pago.
-            """
-            
-            # Enviar por todos los canales
-            if self.notifier.send_whatsapp(client['telefono'], mensaje):
-                result['acciones'].append({
-                    'tipo': 'whatsapp_warning',
-                    'estado': 'enviado',
-                    'timestamp': datetime.now().isoformat()
-                })
-            
-            email_html = f"""
-            <html>
-                <body style="font-family: Arial, sans-serif;">
-                    <div style="background: #f0f0f0; padding: 20px;">
-                        <h2 style="color: #ff9800;">⚠️ Aviso de Vencimiento</h2>
-                        <p>Estimado/a {client['nombre']},</p>
-                        <div style="background: white; padding: 15px; border-radius: 5px;">
-                            <p><strong>Saldo pendiente:</strong> ${client['monto_deuda']}</p>
-                            <p><strong>Días de mora:</strong> {client['dias_mora']}</p>
-                            <p style="color: red;">Su servicio será suspendido en 3 días si no regulariza.</p>
-                        </div>
-                        <a href="https://pagar.ispnetwork.com/{client['dni']}" 
-                           style="background: #4CAF50; color: white; padding: 10px 20px; 
-                                  text-decoration: none; border-radius: 5px; display: inline-block; 
-                                  margin-top: 10px;">
-                            PAGAR AHORA
-                        </a>
-                    </div>
-                </body>
-            </html>
-            """
-            
-            if self.notifier.send_email(client.get('email', ''), 
-                                       "⚠️ Aviso de Vencimiento - ISP Network", 
-                                       email_html):
+        canales_corte = []
+        for notification, nueva in zip(plan.notifications, queued):
+            if not nueva:
+                # Misma clave de idempotencia (suscriptor, tipo, canal, día): ya encolada en otra corrida
+                logger.info(f"Notificación {notification.tipo}/{notification.channel} de {notification.subscriber} ya encolada hoy")
+                continue
+            if notification.tipo == 'notificacion_corte':
+                canales_corte.append(notification.channel)
+            elif notification.tipo.endswith(('_warning', '_escalamiento')):
                 result['acciones'].append({
-                    'tipo': 'email_warning',
-                    'estado': 'enviado',
-                    'timestamp': datetime.now().isoformat()
+                    'tipo': notification.tipo,
+                    'estado': 'encolado',
+                    'canal': notification.channel,
+                    'timestamp': timestamp
                 })
-        
-        # PASO 2: CORTE DE SERVICIO (30+ días)
-        elif client['dias_mora'] >= 30 and not client.get('excepcion', False):
-            
-            # Notificar el corte
-            mensaje_corte = f"""
-            ❌ SERVICIO SUSPENDIDO - ISP Network
-            
-            {client['nombre']}, su servicio ha sido suspendido.
-            
-            Deuda: ${client['monto_deuda']}
-            Días de mora: {client['dias_mora']}
-            
-            Para reactivar:
-            1. Realice el pago total
-            2. Envíe comprobante por WhatsApp
-            3. Reactivación en 30 minutos
-            
-            📞 Atención: 0800-ISP-NETWORK
-            """
-            
-            # Enviar notificación de corte
-            self.notifier.send_whatsapp(client['telefono'], mensaje_corte)
-            self.notifier.send_sms(client['telefono'], 
-                                  f"ISP: Servicio suspendido por mora. Deuda ${client['monto_deuda']}. Info: 0800-ISP")
-            
+        if any(notification.tipo == 'notificacion_corte' for notification in plan.notifications):
             result['acciones'].append({
                 'tipo': 'notificacion_corte',
-                'estado': 'enviado',
-                'canales': ['whatsapp', 'sms'],
-                'timestamp': datetime.now().isoformat()
+                'estado': 'encolado' if canales_corte else 'duplicado',
+                'canales': canales_corte,
+                'timestamp': timestamp
             })
-            
-            # EJECUTAR CORTE EN MIKROTIK
-            if self.mode == "production" and self.mikrotik:
-                if self.mikrotik.disable_client(client.get('ip_address', '192.168.1.100'), 
-                                               f"Mora {client['dias_mora']} días"):
+        
+        if plan.router_action == 'disable':
+            if self.mode == "production" and mikrotik:
+                if mikrotik.disable_client(ip, plan.reason):
                     result['acciones'].append({
                         'tipo': 'corte_servicio',
                         'estado': 'ejecutado',
                         'metodo': 'mikrotik_api',
-                        'ip_bloqueada': client.get('ip_address'),
+                        'ip_bloqueada': ip,
                         'timestamp': datetime.now().isoformat()
                     })
             else:
@@ -414,40 +633,38 @@ class MorosidadProcessor:
                     'timestamp': datetime.now().isoformat()
                 })
         
-        # PASO 3: REACTIVACIÓN (cuando paga)
-        elif client.get('pago_recibido', False):
-            
-            mensaje_reactivacion = f"""
-            ✅ SERVICIO REACTIVADO - ISP Network
-            
-            {client['nombre']}, ¡gracias por su pago!
-            
-            Su servicio ha sido reactivado.
-            Puede tardar hasta 5 minutos en estabilizarse.
-            
-            Si tiene problemas, reinicie su router.
-            
-            Gracias por confiar en ISP Network 🙏
-            """
-            
-            self.notifier.send_whatsapp(client['telefono'], mensaje_reactivacion)
-            
-            # REACTIVAR EN MIKROTIK
-            if self.mode == "production" and self.mikrotik:
-                if self.mikrotik.enable_client(client.get('ip_address', '192.168.1.100')):
+        elif plan.router_action == 'enable':
+            if self.mode == "production" and mikrotik:
+                if mikrotik.enable_client(ip):
                     result['acciones'].append({
                         'tipo': 'reactivacion_servicio',
                         'estado': 'ejecutado',
                         'timestamp': datetime.now().isoformat()
                     })
         
-        # Guardar en historial
-        self.history.append(result)
-        
         return result
     
-    def process_batch(self, csv_file: str) -> Dict:
-        """Procesar lote completo de morosos"""
+    def process_batch(self, csv_file: str, flush_notifications: bool = True,
+                      router_workers: Optional[int] = None, keep_details: bool = True) -> Dict:
+        """Procesar lote completo de morosos
+        
+        El lote pasa por un pipeline de etapas solapadas, unidas por colas acotadas:
+        
+        1. decision: clasifica todo el lote de una vez (vectorizado) y arma los
+           planes y textos por chunk
+        2. encolado: guarda las notificaciones de cada chunk en el outbox (una
+           transacción por chunk)
+        3. router: pool de `router_workers` hilos, cada uno con su sesión SSH,
+           que ejecuta cortes y reactivaciones (siempre después de encolar el aviso)
+        4. reporte: registra cada resultado en el orden del CSV (contadores,
+           historial y reporte en curso de stream_report)
+        
+        Con flush_notifications=True un hilo aparte envía lo que se va encolando
+        (etapa envio); si no, el envío queda para el worker
+        (scripts/notify_outbox.py run). Los contadores por etapa quedan en
+        resultados['etapas']. Con keep_details=False resultados['detalles'] queda
+        vacío: para lotes grandes el detalle va al reporte en streaming.
+        """
         
         df = pd.read_csv(csv_file)
         
@@ -456,76 +673,247 @@ class MorosidadProcessor:
             'notificados': 0,
             'cortados': 0,
             'reactivados': 0,
+            'escalados': 0,
             'errores': 0,
             'detalles': []
         }
         
-        for _, cliente in df.iterrows():
+        controllers = self._router_controllers(router_workers or ROUTER_WORKERS)
+        pipeline = Pipeline([
+            Stage('encolado', self._enqueue_stage),
+            Stage('router', self._router_stage, workers=len(controllers), setup=controllers.pop,
+                  teardown=self._release_controller, chunk_size=ROUTER_CHUNK),
+            Stage('reporte', self._report_stage(resultados, keep_details)),
+        ], queue_size=PIPELINE_QUEUE, source_name='decision')
+        
+        done = threading.Event()
+        envio = StageStats('envio', workers=sum(limit.concurrency for limit in self.notifier.dispatcher.limits.values()))
+        totales_envio: Dict = {}
+        sender = None
+        if flush_notifications:
+            # Primer intento de envío con concurrencia y ritmo por canal, mientras el lote avanza;
+            # los fallos quedan programados en el outbox con espera exponencial
+            def send():
+                envio.started = time.perf_counter()
+                totales_envio.update(self.notifier.flush_until(done))
+                envio.finished = time.perf_counter()
+            sender = threading.Thread(target=send, name='pipeline-envio', daemon=True)
+            sender.start()
+        
+        try:
+            pipeline.run(self._plan_chunks(df))
+        finally:
+            done.set()
+            if sender is not None:
+                sender.join()
+        
+        resultados['etapas'] = pipeline.stats()
+        if flush_notifications:
+            resultados['notificaciones'] = totales_envio
+            envio.items = sum(totales_envio.values())
+            envio.busy_s = envio.elapsed_s
+            resultados['etapas']['envio'] = envio.as_dict()
+        
+        # Fin del lote: no dejar sesiones SMTP abiertas hasta el próximo
+        self.notifier.close()
+        
+        return resultados
+    
+    def _plan_chunks(self, df: pd.DataFrame):
+        """Etapa de decisión: todo el lote clasificado de una vez, planes y textos por chunk
+        
+        Los clientes con error viajan como (índice, None): solo la etapa de
+        reporte toca los contadores de resultados.
+        """
+        acciones = self.classify_batch(df)
+        index = 0
+        for start in range(0, len(df), PIPELINE_CHUNK):
+            end = start + PIPELINE_CHUNK
+            plans, errores = self.plan_batch(df.iloc[start:end], acciones[start:end] if acciones is not None else None)
+            chunk = [*plans, *[None] * errores]
+            if chunk:
+                yield [(index + offset, plan) for offset, plan in enumerate(chunk)]
+                index += len(chunk)
+    
+    def _enqueue_stage(self, chunk: List[Tuple[int, ClientPlan]], _state=None) -> List[Tuple]:
+        """Etapa de encolado: las notificaciones del chunk en una sola transacción"""
+        queued = self.notifier.enqueue([n for _, plan in chunk if plan is not None for n in plan.notifications])
+        salida = []
+        offset = 0
+        for index, plan in chunk:
+            if plan is None:
+                salida.append((index, None, []))
+                continue
+            salida.append((index, plan, queued[offset:offset + len(plan.notifications)]))
+            offset += len(plan.notifications)
+        return salida
+    
+    def _router_stage(self, chunk: List[Tuple], mikrotik: Optional[MikroTikController]) -> List[Tuple]:
+        """Etapa del router: cada worker ejecuta las acciones con su propia sesión"""
+        salida = []
+        for index, plan, queued in chunk:
+            if plan is None:
+                salida.append((index, None))
+                continue
             try:
-                cliente_dict = cliente.to_dict()
-                resultado = self.process_client(cliente_dict)
-                
-                resultados['total_procesados'] += 1
-                
-                # Contar acciones
-                for accion in resultado['acciones']:
-                    if 'warning' in accion['tipo']:
-                        resultados['notificados'] += 1
-                    elif 'corte' in accion['tipo']:
-                        resultados['cortados'] += 1
-                    elif 'reactivacion' in accion['tipo']:
-                        resultados['reactivados'] += 1
-                
-                resultados['detalles'].append(resultado)
-                
-                # Delay para no saturar
-                time.sleep(1)
-                
+                salida.append((index, self._complete(plan, queued, mikrotik)))
             except Exception as e:
-                logger.error(f"Error procesando cliente {cliente.get('nombre', 'Unknown')}: {str(e)}")
-                resultados['errores'] += 1
+                logger.error(f"Error procesando cliente {plan.result.get('cliente', 'Unknown')}: {str(e)}")
+                salida.append((index, None))
+        return salida
+    
+    def _report_stage(self, resultados: Dict, keep_details: bool):
+        """Etapa de reporte: los resultados llegan del pool del router en cualquier orden y se
+        registran en el orden del CSV (los adelantados esperan en un buffer)"""
+        pendientes: Dict[int, Optional[Dict]] = {}
+        siguiente = 0
+        
+        def registrar(chunk: List[Tuple], _state=None):
+            nonlocal siguiente
+            pendientes.update(chunk)
+            while siguiente in pendientes:
+                resultado = pendientes.pop(siguiente)
+                siguiente += 1
+                if resultado is None:
+                    resultados['errores'] += 1
+                    continue
+                self._record(resultado)
+                self._count(resultados, resultado)
+                if keep_details:
+                    resultados['detalles'].append(resultado)
+        
+        return registrar
+    
+    @staticmethod
+    def _count(resultados: Dict, resultado: Dict):
+        """Sumar un cliente procesado y sus acciones a los contadores del lote"""
+        resultados['total_procesados'] += 1
+        for accion in resultado['acciones']:
+            if 'warning' in accion['tipo']:
+                resultados['notificados'] += 1
+            elif 'corte' in accion['tipo']:
+                resultados['cortados'] += 1
+            elif 'reactivacion' in accion['tipo']:
+                resultados['reactivados'] += 1
+            elif 'escalamiento' in accion['tipo']:
+                resultados['escalados'] += 1
+    
+    def run_due(self, scheduler: DunningScheduler, now: Optional[float] = None,
+                flush_notifications: bool = True) -> Dict:
+        """Ejecutar las acciones vencidas de la agenda de cobranza
+        
+        A diferencia de process_batch no recorre el padrón: toma de la agenda
+        solo los suscriptores cuya próxima acción venció, de la más atrasada a la
+        más reciente, en tandas de SCHEDULE_BATCH. La acción la decide la agenda
+        (un aviso que no salió el día 27 sale igual, y el corte se corre hasta
+        cumplir el preaviso). Cada cliente se marca ejecutado apenas termina y la
+        agenda programa su siguiente acción; si falla, se reintenta en
+        SCHEDULE_RETRY_SECONDS.
         
+        Returns:
+            Los mismos contadores que process_batch
+        """
+        now = time.time() if now is None else now
+        resultados = {
+            'total_procesados': 0,
+            'notificados': 0,
+            'cortados': 0,
+            'reactivados': 0,
+            'escalados': 0,
+            'errores': 0,
+            'detalles': []
+        }
+        
+        while True:
+            vencidas = scheduler.due(now, SCHEDULE_BATCH)
+            if not vencidas:
+                break
+            planes = []
+            for item in vencidas:
+                try:
+                    planes.append((item, self.plan_action(item.client, item.action)))
+                except Exception as e:
+                    logger.error(f"Error procesando cliente {item.client.get('nombre', 'Unknown')}: {str(e)}")
+                    resultados['errores'] += 1
+                    scheduler.postpone(item.subscriber, SCHEDULE_RETRY_SECONDS, now)
+            
+            queued = self.notifier.enqueue([n for _, plan in planes for n in plan.notifications])
+            offset = 0
+            for item, plan in planes:
+                encoladas = queued[offset:offset + len(plan.notifications)]
+                offset += len(plan.notifications)
+                try:
+                    resultado = self.complete_client(plan, encoladas)
+                except Exception as e:
+                    logger.error(f"Error procesando cliente {plan.result.get('cliente', 'Unknown')}: {str(e)}")
+                    resultados['errores'] += 1
+                    scheduler.postpone(item.subscriber, SCHEDULE_RETRY_SECONDS, now)
+                    continue
+                scheduler.complete(item.subscriber, item.action, now)
+                self._count(resultados, resultado)
+                resultados['detalles'].append(resultado)
+        
+        if flush_notifications:
+            resultados['notificaciones'] = self.notifier.flush()
+        self.notifier.close()
         return resultados
     
-    def generate_report(self) -> str:
-        """Generar reporte de todas las acciones realizadas"""
-        
-        report = """
-        =====================================
-        📊 REPORTE DE GESTIÓN DE MOROSIDAD
-        =====================================
-        
-        Fecha: {fecha}
-        Modo: {modo}
-        
-        RESUMEN EJECUTIVO:
-        ------------------
-        • Total clientes procesados: {total}
-        • Notificaciones enviadas: {notificaciones}
-        • Servicios cortados: {cortes}
-        • Servicios reactivados: {reactivaciones}
-        
-        DETALLE POR CLIENTE:
-        --------------------
-        """.format(
-            fecha=datetime.now().strftime('%Y-%m-%d %H:%M'),
-            modo=self.mode.upper(),
-            total=len(self.history),
-            notificaciones=sum(1 for h in self.history if any('warning' in a['tipo'] for a in h['acciones'])),
-            cortes=sum(1 for h in self.history if any('corte' in a['tipo'] for a in h['acciones'])),
-            reactivaciones=sum(1 for h in self.history if any('reactivacion' in a['tipo'] for a in h['acciones']))
-        )
+    def _router_controllers(self, workers: int) -> List[Optional[MikroTikController]]:
+        """Una sesión SSH por worker del router: la del procesador y copias con la misma configuración"""
+        if self.mikrotik is None:
+            return [None] * max(1, workers)
+        extra = [type(self.mikrotik)(self.mikrotik.config) for _ in range(max(1, workers) - 1)]
+        return extra + [self.mikrotik]
+    
+    def _release_controller(self, mikrotik: MikroTikController):
+        # La sesión del procesador queda abierta para el próximo lote
+        if mikrotik is not self.mikrotik:
+            mikrotik.close()
+    
+    def _record(self, result: Dict):
+        """Registrar un resultado: historial acotado, totales y reporte en curso"""
+        self.history.append(result)
+        self.report_counters.update(result)
+        if self.report_writer is not None:
+            self.report_writer.write(result)
+    
+    def stream_report(self, target: Union[str, TextIO], fmt: Optional[str] = None) -> ReportWriter:
+        """Escribir el detalle de cada cliente a medida que se procesa
         
-        for item in self.history:
-            report += f"""
-        Cliente: {item['cliente']} (DNI: {item['dni'][-3:]}***)
-        IP: {item['ip']}
-        Acciones realizadas:
+        Args:
+            target: Ruta del archivo (el formato sale de la extensión) o archivo ya abierto
+            fmt: text, jsonl o csv
         """
-            for accion in item['acciones']:
-                report += f"  • {accion['tipo']}: {accion['estado']} ({accion['timestamp']})\n"
+        self.close_report()
+        if isinstance(target, str):
+            self.report_writer = ReportWriter.open(target, fmt, modo=self.mode.upper())
+        else:
+            self.report_writer = ReportWriter(target, fmt or 'text', modo=self.mode.upper())
+        return self.report_writer
+    
+    def close_report(self) -> Optional[ReportCounters]:
+        """Cerrar el reporte en curso con su resumen; devuelve sus totales"""
+        if self.report_writer is None:
+            return None
+        writer, self.report_writer = self.report_writer, None
+        return writer.close()
+    
+    def generate_report(self) -> str:
+        """Generar reporte de todas las acciones realizadas
         
-        return report
+        Los totales cuentan todos los clientes procesados; el detalle, los que
+        quedan en el historial (HISTORY_LIMIT). Para el detalle completo de
+        lotes grandes usar stream_report().
+        """
+        buffer = io.StringIO()
+        writer = ReportWriter(buffer, 'text', modo=self.mode.upper())
+        for item in self.history:
+            writer.write(item)
+        note = None
+        if len(self.history) < self.report_counters.total:
+            note = f"Detalle de los últimos {len(self.history)} de {self.report_counters.total} clientes"
+        writer.close(self.report_counters, note)
+        return buffer.getvalue()
 
 # SIMULADOR PARA DEMOS
 class DemoSimulator:
@@ -639,9 +1027,12 @@ if __name__ == "__main__":
         processor = MorosidadProcessor(mode="simulation")
         print("\n🎮 MODO SIMULACIÓN - Solo para demostración")
     
-    # Procesar archivo
+    # Procesar archivo; el reporte se escribe a medida que avanza el lote
+    archivo_reporte = f"reporte_morosidad_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
+    processor.stream_report(archivo_reporte)
     print("\nProcesando morosos...")
-    resultados = processor.process_batch('sample_morosos.csv')
+    resultados = processor.process_batch('sample_morosos.csv', keep_details=False)
+    processor.close_report()
     
     print(f"""
     ✅ PROCESO COMPLETADO
@@ -653,10 +1044,4 @@ if __name__ == "__main__":
     Errores: {resultados['errores']}
     """)
     
-    # Generar reporte
-    reporte = processor.generate_report()
-    
-    with open(f"reporte_morosidad_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt", 'w') as f:
-        f.write(reporte)
-    
-    print("\n📄 Reporte guardado en archivo")
+    print(f"\n📄 Reporte guardado en {archivo_reporte}")
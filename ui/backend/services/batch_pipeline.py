@@ -0,0 +1,241 @@
+"""Pipeline por etapas con colas acotadas.
+
+Cada etapa tiene su propio pool de hilos y procesa lotes (chunks) que le
+deja la etapa anterior en una cola de tamaño máximo: si una etapa se atrasa,
+las anteriores se bloquean al encolar (backpressure) en lugar de acumular
+todo el lote en memoria. Como las etapas trabajan solapadas, el tiempo total
+queda acotado por la etapa más lenta y no por la suma de todas.
+
+Cada etapa registra sus contadores (StageStats): ítems, tiempo de trabajo,
+espera por entrada y espera por lugar en la cola siguiente.
+"""
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+QUEUE_SIZE = 4  # chunks en vuelo entre dos etapas
+_DONE = object()
+_POLL = 0.1  # segundos entre verificaciones de abort mientras se espera una cola
+
+
+@dataclass
+class StageStats:
+    """Contadores de una etapa.
+
+    Args:
+        name: Nombre de la etapa
+        workers: Hilos de la etapa
+        items: Ítems procesados
+        chunks: Chunks procesados
+        busy_s: Tiempo de trabajo, sumado entre hilos
+        idle_s: Tiempo esperando entrada, sumado entre hilos
+        blocked_s: Tiempo esperando lugar en la cola siguiente (backpressure)
+    """
+
+    name: str
+    workers: int = 1
+    items: int = 0
+    chunks: int = 0
+    busy_s: float = 0.0
+    idle_s: float = 0.0
+    blocked_s: float = 0.0
+    started: Optional[float] = None
+    finished: Optional[float] = None
+
+    @property
+    def elapsed_s(self) -> float:
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.perf_counter()) - self.started
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Contadores más throughput real (ítems/s de pared) y capacidad (ítems/s si nunca esperara)."""
+        return {
+            "workers": self.workers,
+            "items": self.items,
+            "chunks": self.chunks,
+            "busy_s": round(self.busy_s, 4),
+            "idle_s": round(self.idle_s, 4),
+            "blocked_s": round(self.blocked_s, 4),
+            "elapsed_s": round(self.elapsed_s, 4),
+            "items_per_s": round(self.items / self.elapsed_s, 1) if self.elapsed_s else 0.0,
+            "capacity_per_s": round(self.items * self.workers / self.busy_s, 1) if self.busy_s else 0.0,
+        }
+
+
+@dataclass
+class Stage:
+    """Etapa del pipeline.
+
+    Args:
+        name: Nombre (clave en stats())
+        func: Recibe un chunk y el estado del hilo; devuelve el chunk para la etapa siguiente (o None)
+        workers: Hilos de la etapa
+        setup: Crea el estado de cada hilo (p. ej. su propia conexión)
+        teardown: Libera el estado del hilo al terminar
+        chunk_size: Máximo de ítems por chunk que recibe la etapa (los chunks más grandes se parten);
+            chunks chicos reparten mejor el trabajo entre hilos lentos (p. ej. conexiones de red)
+    """
+
+    name: str
+    func: Callable[[List[Any], Any], Optional[List[Any]]]
+    workers: int = 1
+    setup: Optional[Callable[[], Any]] = None
+    teardown: Optional[Callable[[Any], None]] = None
+    chunk_size: Optional[int] = None
+
+
+class Pipeline:
+    """Etapas encadenadas por colas acotadas.
+
+    Args:
+        stages: Etapas en orden
+        queue_size: Chunks que pueden esperar entre dos etapas
+        source_name: Nombre de la etapa que produce los chunks (el iterable de run())
+    """
+
+    def __init__(self, stages: List[Stage], queue_size: int = QUEUE_SIZE, source_name: str = "source"):
+        self.stages = stages
+        self.queue_size = queue_size
+        self.source_name = source_name
+        self._stats: Dict[str, StageStats] = {}
+        self._lock = threading.Lock()
+
+    def run(self, chunks: Iterable[List[Any]]) -> List[Any]:
+        """Pasar todos los chunks por las etapas.
+
+        El iterable se consume en el hilo que llama (es la primera etapa): puede
+        ser un generador que produce cada chunk a medida que hace falta.
+
+        Returns:
+            Ítems producidos por la última etapa (en orden de llegada)
+
+        Raises:
+            La primera excepción de una etapa; el resto del pipeline se detiene
+        """
+        self._stats = {self.source_name: StageStats(self.source_name)}
+        self._stats.update({stage.name: StageStats(stage.name, stage.workers) for stage in self.stages})
+        queues: List[queue.Queue] = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        remaining = [stage.workers for stage in self.stages]
+        output: List[Any] = []
+        errors: List[BaseException] = []
+        abort = threading.Event()
+
+        def work(index: int, stage: Stage) -> None:
+            stats = self._stats[stage.name]
+            state = None
+            try:
+                state = stage.setup() if stage.setup else None
+                while True:
+                    waited = time.perf_counter()
+                    chunk = self._get(queues[index], abort)
+                    started = time.perf_counter()
+                    if chunk is _DONE or chunk is None:
+                        break
+                    result = stage.func(chunk, state)
+                    finished = time.perf_counter()
+                    with self._lock:
+                        stats.started = stats.started or started
+                        stats.idle_s += started - waited
+                        stats.busy_s += finished - started
+                        stats.items += len(chunk)
+                        stats.chunks += 1
+                    if result:
+                        if index + 1 < len(self.stages):
+                            blocked = self._put_chunks(queues[index + 1], result, self.stages[index + 1], abort)
+                            with self._lock:
+                                stats.blocked_s += blocked
+                        else:
+                            with self._lock:
+                                output.extend(result)
+            except BaseException as exc:  # noqa: BLE001 - se relanza desde run()
+                logger.exception("Error en la etapa %s", stage.name)
+                with self._lock:
+                    errors.append(exc)
+                abort.set()
+            finally:
+                if stage.teardown is not None and state is not None:
+                    try:
+                        stage.teardown(state)
+                    except Exception:  # noqa: BLE001 - no tapar el resultado por un cierre fallido
+                        logger.exception("Error cerrando un worker de la etapa %s", stage.name)
+                with self._lock:
+                    remaining[index] -= 1
+                    last = remaining[index] == 0
+                    if last:
+                        stats.finished = time.perf_counter()
+                if last and index + 1 < len(self.stages):
+                    for _ in range(self.stages[index + 1].workers):
+                        self._put(queues[index + 1], _DONE, abort)
+
+        threads = [
+            threading.Thread(target=work, args=(index, stage), name=f"pipeline-{stage.name}-{worker}", daemon=True)
+            for index, stage in enumerate(self.stages) for worker in range(stage.workers)
+        ]
+        for thread in threads:
+            thread.start()
+
+        source = self._stats[self.source_name]
+        source.started = time.perf_counter()
+        try:
+            iterator = iter(chunks)
+            while not abort.is_set():
+                started = time.perf_counter()
+                try:
+                    chunk = next(iterator)
+                except StopIteration:
+                    break
+                source.busy_s += time.perf_counter() - started
+                source.items += len(chunk)
+                source.chunks += 1
+                source.blocked_s += self._put_chunks(queues[0], chunk, self.stages[0], abort)
+        except BaseException as exc:
+            errors.append(exc)
+            abort.set()
+        finally:
+            source.finished = time.perf_counter()
+            for _ in range(self.stages[0].workers if self.stages else 0):
+                self._put(queues[0], _DONE, abort)
+            for thread in threads:
+                thread.join()
+
+        if errors:
+            raise errors[0]
+        return output
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Contadores por etapa, en orden (la fuente primero)."""
+        with self._lock:
+            return {name: stats.as_dict() for name, stats in self._stats.items()}
+
+    def _put_chunks(self, target: queue.Queue, chunk: List[Any], stage: Stage, abort: threading.Event) -> float:
+        size = stage.chunk_size or len(chunk) or 1
+        return sum(self._put(target, chunk[start:start + size], abort) for start in range(0, len(chunk), size))
+
+    @staticmethod
+    def _get(source: queue.Queue, abort: threading.Event) -> Any:
+        while True:
+            try:
+                return source.get(timeout=_POLL)
+            except queue.Empty:
+                if abort.is_set():
+                    return None
+
+    @staticmethod
+    def _put(target: queue.Queue, item: Any, abort: threading.Event) -> float:
+        """Encolar esperando lugar; devuelve los segundos bloqueado."""
+        started = time.perf_counter()
+        while not abort.is_set():
+            try:
+                target.put(item, timeout=_POLL)
+                break
+            except queue.Full:
+                continue
+        return time.perf_counter() - started
@@ -0,0 +1,112 @@
+"""Índice IP → cliente para el portal de suspensión.
+
+Tras un corte masivo, cada navegador suspendido es redirigido al portal, así
+que la búsqueda por IP no puede leer el CSV por request. El índice se arma una
+vez por versión del CSV de cada tenant (FileSnapshotCache en tenant_data) y
+guarda solo los campos que usa la plantilla, como tuplas para ocupar poco.
+"""
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .file_cache import FileSnapshotCache
+from .tenant_data import TenantPaths, estimate_size, tenant_cache
+
+KIND = "client_index"
+CHECK_INTERVAL = 2.0  # segundos entre stat() del CSV
+
+# Tupla del índice: (DNI, Nombre, Plan, Dias Mora, Monto Deuda); None si no hay dato.
+# id y dni_masked se derivan del DNI recién al servir el cliente.
+ClientRow = Tuple[Optional[str], Optional[str], Optional[str], Optional[int], Optional[float]]
+TEXT_COLUMNS = ("DNI", "Nombre", "Plan")
+
+
+def _column(df: pd.DataFrame, name: str, integer: bool = False) -> list:
+    """Valores de la columna como lista de Python, con None en lugar de NaN."""
+    if name not in df.columns:
+        return [None] * len(df)
+    series = df[name]
+    if name not in TEXT_COLUMNS:
+        series = pd.to_numeric(series, errors="coerce")
+        if integer:
+            # int() del código anterior: trunca hacia cero
+            series = np.trunc(series).astype("Int64")
+    return series.astype(object).where(series.notna(), None).tolist()
+
+
+def build_client_index(path: Path) -> Dict[str, ClientRow]:
+    """Armar el índice desde el CSV de morosos.
+
+    Args:
+        path: CSV con columna IP_Address (DNI, Nombre, Plan, Dias Mora y Monto Deuda opcionales)
+
+    Returns:
+        Dict IP → ClientRow. Si una IP se repite, gana la primera fila
+        (igual que el filtro anterior).
+    """
+    df = pd.read_csv(path, dtype=dict.fromkeys(("IP_Address",) + TEXT_COLUMNS, str))
+    if "IP_Address" not in df.columns:
+        return {}
+
+    df = df.dropna(subset=["IP_Address"]).drop_duplicates("IP_Address", keep="first")
+    return dict(zip(df["IP_Address"].str.strip().tolist(), zip(
+        _column(df, "DNI"),
+        _column(df, "Nombre"),
+        _column(df, "Plan"),
+        _column(df, "Dias Mora", integer=True),
+        _column(df, "Monto Deuda"),
+    )))
+
+
+def _index_holder(paths: TenantPaths) -> FileSnapshotCache[Dict[str, ClientRow]]:
+    return FileSnapshotCache(paths.csv_path, build_client_index, name=f"client_index:{paths.tenant}",
+                             check_interval=CHECK_INTERVAL)
+
+
+tenant_cache.register(
+    KIND,
+    _index_holder,
+    sizer=lambda holder: estimate_size(holder.value),
+    generation=lambda holder: holder.loaded_at,
+)
+
+
+def lookup_client(client_ip: str, tenant: str | None = None) -> Optional[Dict[str, Any]]:
+    """Datos de plantilla (suspended.html) del cliente con esa IP, o None.
+
+    Solo incluye los campos con valor; el portal completa el resto con sus defaults.
+
+    Raises:
+        FileNotFoundError: Si el CSV no existe y el índice nunca se cargó
+    """
+    index = tenant_cache.holder(tenant, KIND).get()
+    tenant_cache.account(tenant, KIND)
+    return _client_data(client_ip, index.get(client_ip))
+
+
+async def lookup_client_async(client_ip: str, tenant: str | None = None) -> Optional[Dict[str, Any]]:
+    """lookup_client() sin bloquear el event loop mientras se arma el índice."""
+    index = await tenant_cache.holder(tenant, KIND).aget()
+    tenant_cache.account(tenant, KIND)
+    return _client_data(client_ip, index.get(client_ip))
+
+
+def _client_data(client_ip: str, row: Optional[ClientRow]) -> Optional[Dict[str, Any]]:
+    if row is None:
+        return None
+
+    dni, name, plan, days_overdue, debt_amount = row
+    client = {
+        "id": hashlib.md5((dni or client_ip).encode(), usedforsecurity=False).hexdigest()[:8],
+        "name": name,
+        "dni_masked": "****" + dni[-4:] if dni is not None else None,
+        "plan": plan,
+        "days_overdue": days_overdue,
+        "debt_amount": debt_amount,
+    }
+    return {field: value for field, value in client.items() if value is not None}
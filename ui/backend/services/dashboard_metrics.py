@@ -0,0 +1,107 @@
+"""Agregados del CSV de morosos para los endpoints de dashboard real.
+
+Se calculan en una sola lectura vectorizada y se comparten entre
+/dashboard/real, /dashboard/summary-real y /dashboard/business-metrics
+mediante un FileSnapshotCache sobre el CSV de cada tenant (tenant_data).
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+from .file_cache import FileSnapshotCache
+from .tenant_data import TenantPaths, estimate_size, tenant_cache
+
+KIND = "aggregates"
+DIAS_CORTE = 30
+COLUMNS = ["nombre", "dias_mora", "monto_deuda"]
+
+
+@dataclass(frozen=True)
+class DashboardAggregates:
+    """Totales del CSV; todo lo que los endpoints necesitan sin volver a leerlo."""
+
+    total_clientes: int
+    morosos_activos: int
+    cortes_pendientes: int
+    deuda_total: float
+    deuda_cortable: float
+    deuda_promedio: float
+    dias_mora_promedio: float
+    peor_moroso: Optional[Dict[str, Any]]
+    archivo: str
+    calculado: str
+
+
+def compute_aggregates(path: Path) -> DashboardAggregates:
+    """Leer el CSV (solo las columnas usadas) y calcular todos los agregados.
+
+    Args:
+        path: CSV de morosos con columnas nombre, dias_mora y monto_deuda
+
+    Returns:
+        DashboardAggregates con totales, conteos y peor moroso
+    """
+    df = pd.read_csv(path, usecols=COLUMNS)
+    dias = df["dias_mora"]
+    monto = df["monto_deuda"]
+    cortables = dias >= DIAS_CORTE
+
+    peor_moroso = None
+    if dias.notna().any():
+        peor_idx = dias.idxmax()
+        peor_moroso = {
+            "nombre": df.at[peor_idx, "nombre"],
+            "dias": int(dias.at[peor_idx]),
+            "deuda": float(monto.at[peor_idx]),
+        }
+
+    total = len(df)
+    return DashboardAggregates(
+        total_clientes=total,
+        morosos_activos=int((dias > 0).sum()),
+        cortes_pendientes=int(cortables.sum()),
+        deuda_total=float(monto.sum()),
+        deuda_cortable=float(monto[cortables].sum()),
+        deuda_promedio=float(monto.mean()) if total else 0.0,
+        dias_mora_promedio=round(float(dias.mean()), 1) if total else 0.0,
+        peor_moroso=peor_moroso,
+        archivo=path.name,
+        calculado=datetime.now().isoformat(),
+    )
+
+
+def _aggregates_holder(paths: TenantPaths) -> FileSnapshotCache[DashboardAggregates]:
+    return FileSnapshotCache(paths.csv_path, compute_aggregates, name=f"dashboard_aggregates:{paths.tenant}")
+
+
+tenant_cache.register(
+    KIND,
+    _aggregates_holder,
+    sizer=lambda holder: estimate_size(holder.value),
+    generation=lambda holder: holder.loaded_at,
+)
+
+
+def get_aggregates(tenant: str | None = None) -> DashboardAggregates:
+    """Agregados de la versión cacheada del CSV del tenant (refresca en segundo plano si cambió)."""
+    value = tenant_cache.holder(tenant, KIND).get()
+    tenant_cache.account(tenant, KIND)
+    return value
+
+
+async def get_aggregates_async(tenant: str | None = None) -> DashboardAggregates:
+    """get_aggregates() sin bloquear el event loop en la primera carga."""
+    value = await tenant_cache.holder(tenant, KIND).aget()
+    tenant_cache.account(tenant, KIND)
+    return value
+
+
+def aggregates_stale(tenant: str | None = None) -> bool:
+    """True si el CSV del tenant cambió y se están sirviendo los agregados anteriores."""
+    holder = tenant_cache.peek(tenant, KIND)
+    return holder.stale if holder is not None else False
@@ -1,23 +1,14 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
 
 import orjson
 import pandas as pd
 
-
-def _stats_files() -> List[Path]:
-    return sorted(OUTPUT_DIR.glob("estadisticas_*.json"))
-
-
-def _latest_stats() -> Path | None:
-    stats = _stats_files()
-    return stats[-1] if stats else None
-
-ROOT = Path(__file__).resolve().parents[3]
-DATA_DIR = ROOT / "data"
-OUTPUT_DIR = ROOT / "output"
+from .job_index import JOBS_INDEX_NAME, JobIndexReader
+from .report_catalog import ReportCatalog
+from .tenant_data import ROOT, estimate_size, tenant_cache
 
 SUMMARY_DEFAULT = {
     "clients_active": 1247,
@@ -28,17 +19,105 @@ SUMMARY_DEFAULT = {
     "automation_rate": 0.92,
 }
 
+JOBS_DEFAULT_LIMIT = 50
+JOBS_MAX_LIMIT = 500
+REPORTS_MAX_LIMIT = 1000
+
+DEMO_JOB = {
+    "id": "JOB-demo",
+    "timestamp": "2025-09-26T02:39:43",
+    "mode": "dry-run",
+    "processed": 20,
+    "skipped": 0,
+    "status": "completed",
+}
+
+JOBS_KIND = "jobs"
+REPORTS_KIND = "reports"
+
+# Historial y catálogo de reportes por tenant, en la caché con presupuesto de memoria
+tenant_cache.register(
+    JOBS_KIND,
+    lambda paths: JobIndexReader(paths.output_dir / JOBS_INDEX_NAME),
+    sizer=lambda reader: estimate_size(reader.cached),
+    generation=lambda reader: reader.offset,
+)
+tenant_cache.register(
+    REPORTS_KIND,
+    lambda paths: ReportCatalog(paths.output_dir, ROOT),
+    sizer=lambda catalog: estimate_size(catalog.cached),
+    generation=lambda catalog: catalog.generation,
+)
 
-def load_summary() -> Dict[str, Any]:
+
+def _stats_files(output_dir: Path) -> List[Path]:
+    # Orden por el timestamp final del nombre (estadisticas_<modo>_<YYYYmmdd_HHMMSS>)
+    return sorted(output_dir.glob("estadisticas_*.json"), key=lambda path: path.stem[-15:])
+
+
+def _legacy_entry(stats_file: Path) -> Dict[str, Any]:
+    """Entrada equivalente a la del índice, parseando el reporte completo.
+
+    Solo para directorios de output anteriores al índice (se crea en la
+    próxima ejecución de cut_service.py).
+    """
+    payload = orjson.loads(stats_file.read_bytes())
+    stats = payload.get("statistics", {})
+    statistics = dict(stats)
+    statistics.setdefault("processed", len(payload.get("results", [])))
+    return {
+        "id": stats_file.stem.replace("estadisticas_", "JOB-"),
+        "timestamp": payload.get("metadata", {}).get("timestamp"),
+        "mode": payload.get("metadata", {}).get("mode", "dry-run"),
+        "statistics": statistics,
+    }
+
+
+def _latest_entry(job_index: JobIndexReader) -> Dict[str, Any] | None:
+    if job_index.exists():
+        return job_index.latest()
+    stats = _stats_files(job_index.path.parent)
+    return _legacy_entry(stats[-1]) if stats else None
+
+
+def _jobs_page(job_index: JobIndexReader, limit: int,
+               cursor: int | None) -> Tuple[List[Dict[str, Any]], int | None]:
+    limit = max(1, min(limit, JOBS_MAX_LIMIT))
+    if job_index.exists():
+        entries, next_cursor = job_index.page(limit, cursor)
+    else:
+        # Sin índice: se paginan los nombres y solo se parsea la página pedida
+        files = _stats_files(job_index.path.parent)
+        end = len(files) if cursor is None else max(0, min(cursor, len(files)))
+        start = max(0, end - limit)
+        entries = [_legacy_entry(path) for path in reversed(files[start:end])]
+        next_cursor = start if start > 0 else None
+
+    if not entries and cursor is None:
+        return [dict(DEMO_JOB)], None
+    return [_job(entry) for entry in entries], next_cursor
+
+
+def _job(entry: Dict[str, Any]) -> Dict[str, Any]:
+    stats = entry.get("statistics", {})
+    return {
+        "id": entry["id"],
+        "timestamp": entry.get("timestamp"),
+        "mode": entry.get("mode", "dry-run"),
+        "processed": stats.get("processed", 0),
+        "skipped": stats.get("failed_cuts", 0),
+        "status": "rollback" if stats.get("rollback_triggered") else "completed",
+    }
+
+
+def _summary(latest: Dict[str, Any] | None) -> Dict[str, Any]:
     summary = SUMMARY_DEFAULT.copy()
-    latest = _latest_stats()
     if not latest:
         return summary
 
-    payload = orjson.loads(latest.read_bytes())
-    stats = payload.get("statistics", {})
+    stats = latest.get("statistics", {})
 
-    processed = stats.get("processed") or len(payload.get("results", []))
+    processed = stats.get("processed", 0)
     successful = stats.get("successful_cuts", processed)
     failed = stats.get("failed_cuts", 0)
 
@@ -49,47 +128,59 @@ def load_summary() -> Dict[str, Any]:
     summary["operational_cost"] = max(summary["operational_cost"] - successful * 2500, 0)
     summary["processed_success"] = successful
     summary["processed_failures"] = failed
-    summary["last_run"] = payload.get("metadata", {}).get("timestamp")
-    summary["mode"] = payload.get("metadata", {}).get("mode", "dry-run")
+    summary["last_run"] = latest.get("timestamp")
+    summary["mode"] = latest.get("mode", "dry-run")
     return summary
 
 
-def load_jobs() -> List[Dict[str, Any]]:
-    jobs: List[Dict[str, Any]] = []
-    for stats_file in reversed(_stats_files()):
-        payload = orjson.loads(stats_file.read_bytes())
-        metadata = payload.get("metadata", {})
-        stats = payload.get("statistics", {})
-        jobs.append(
-            {
-                "id": stats_file.stem.replace("estadisticas_", "JOB-"),
-                "timestamp": metadata.get("timestamp"),
-                "mode": metadata.get("mode", "dry-run"),
-                "processed": stats.get("processed", len(payload.get("results", []))),
-                "skipped": stats.get("failed_cuts", 0),
-                "status": "rollback" if stats.get("rollback_triggered") else "completed",
-            }
-        )
-    if jobs:
-        return jobs
-    return [
-        {
-            "id": "JOB-demo",
-            "timestamp": "2025-09-26T02:39:43",
-            "mode": "dry-run",
-            "processed": 20,
-            "skipped": 0,
-            "status": "completed",
-        }
-    ]
-
-
-def list_reports() -> List[Dict[str, Any]]:
-    reports = []
-    for path in OUTPUT_DIR.glob("*.csv"):
-        reports.append({
-            "name": path.name,
-            "path": str(path.relative_to(ROOT)),
-            "size": path.stat().st_size,
-        })
-    return reports
+def load_summary(tenant: str | None = None) -> Dict[str, Any]:
+    job_index: JobIndexReader = tenant_cache.holder(tenant, JOBS_KIND)
+    summary = _summary(_latest_entry(job_index))
+    tenant_cache.account(tenant, JOBS_KIND)
+    return summary
+
+
+def load_jobs_page(limit: int = JOBS_DEFAULT_LIMIT, cursor: int | None = None,
+                   tenant: str | None = None) -> Tuple[List[Dict[str, Any]], int | None]:
+    """Página del historial de ejecuciones, de la más reciente a la más antigua.
+
+    Args:
+        limit: Máximo de ejecuciones (acotado a JOBS_MAX_LIMIT)
+        cursor: Valor devuelto como siguiente cursor por la página anterior
+        tenant: Tenant del historial (None = default)
+
+    Returns:
+        (jobs, siguiente cursor o None si no hay más)
+    """
+    job_index: JobIndexReader = tenant_cache.holder(tenant, JOBS_KIND)
+    page = _jobs_page(job_index, limit, cursor)
+    tenant_cache.account(tenant, JOBS_KIND)
+    return page
+
+
+def load_jobs(limit: int = JOBS_DEFAULT_LIMIT, tenant: str | None = None) -> List[Dict[str, Any]]:
+    return load_jobs_page(limit, tenant=tenant)[0]
+
+
+def load_dashboard(tenant: str | None = None,
+                   limit: int = JOBS_DEFAULT_LIMIT) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """Resumen y últimas ejecuciones con un solo acceso a la caché del tenant.
+
+    Un único acceso por request evita que una consulta aislada promueva el
+    historial del tenant al segmento protegido de la caché.
+    """
+    job_index: JobIndexReader = tenant_cache.holder(tenant, JOBS_KIND)
+    summary = _summary(_latest_entry(job_index))
+    jobs = _jobs_page(job_index, limit, None)[0]
+    tenant_cache.account(tenant, JOBS_KIND)
+    return summary, jobs
+
+
+def list_reports(sort: str = "date", descending: bool = True, mode: str | None = None,
+                 limit: int | None = None, offset: int = 0,
+                 tenant: str | None = None) -> Tuple[List[Dict[str, Any]], int]:
+    """Reportes CSV del output del tenant desde el catálogo incremental: (página, total)."""
+    catalog: ReportCatalog = tenant_cache.holder(tenant, REPORTS_KIND)
+    page = catalog.list(sort=sort, descending=descending, mode=mode, limit=limit, offset=offset)
+    tenant_cache.account(tenant, REPORTS_KIND)
+    return page
@@ -0,0 +1,323 @@
+"""Agenda de cobranza: la próxima acción de cada suscriptor, persistida en SQLite.
+
+En lugar de reclasificar todo el padrón cada día, cada suscriptor tiene su
+próxima acción y el momento en que vence:
+
+    aviso_previo  día WARN_DAY de mora
+    corte         día CUT_DAY, y nunca antes de NOTICE_DAYS desde el aviso
+    escalamiento  día ESCALATE_DAY, si sigue cortado (y NOTICE_DAYS después del corte)
+    reactivacion  apenas se registra el pago (o la deuda en cero) de un suscriptor cortado
+
+La tabla, indexada por vencimiento, es la cola de prioridad: due() lee solo
+lo vencido y next_due_at() dice cuándo despertar. Sobrevive a reinicios y un
+día sin correr no pierde el aviso: queda vencido hasta que se ejecuta, y el
+corte se corre para respetar el preaviso.
+
+sync() toma el CSV de morosos y reprograma solo a los suscriptores cuya fila
+cambió. La huella de cada fila usa la fecha de inicio de la mora (fecha del
+CSV menos dias_mora) y no dias_mora, así el export diario no cambia a nadie
+que siga igual. Un corrimiento de pocos días en esa fecha (export después de
+medianoche, fecha del CSV mal indicada) sigue siendo la misma mora: solo
+empieza un ciclo nuevo cuando dias_mora se reinicia o después de reactivar.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from datetime import time as dtime
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SCHEDULE_PATH = Path(__file__).resolve().parents[3] / "output" / "dunning_schedule.sqlite3"
+
+# Estados que deja cada acción ejecutada; '' es "sin acciones en este ciclo de mora"
+ACTIONS = ("aviso_previo", "corte", "escalamiento", "reactivacion")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS schedule (
+    subscriber TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    mora_start TEXT,
+    client TEXT NOT NULL,
+    stage TEXT NOT NULL DEFAULT '',
+    stage_at REAL,
+    next_action TEXT,
+    due_at REAL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS schedule_due ON schedule (due_at) WHERE due_at IS NOT NULL;
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+
+@dataclass(frozen=True)
+class DunningPolicy:
+    """Calendario de cobranza.
+
+    Args:
+        warn_day: Día de mora del aviso previo
+        cut_day: Día de mora del corte
+        escalate_day: Día de mora del escalamiento (gestión de cobranza)
+        notice_days: Días mínimos entre el aviso y el corte
+        send_hour: Hora del día en que vencen las acciones (no se notifica de madrugada)
+        drift_days: Corrimiento del inicio de la mora que todavía cuenta como la misma mora
+    """
+
+    warn_day: int = 27
+    cut_day: int = 30
+    escalate_day: int = 60
+    notice_days: int = 3
+    send_hour: int = 9
+    drift_days: int = 3
+
+    def at(self, day: date) -> float:
+        return datetime.combine(day, dtime(self.send_hour)).timestamp()
+
+
+DEFAULT_POLICY = DunningPolicy()
+
+
+@dataclass
+class DueAction:
+    """Acción vencida de un suscriptor, con su fila del CSV (dias_mora recalculado a hoy)."""
+
+    subscriber: str
+    action: str
+    due_at: float
+    client: Dict[str, Any]
+
+
+def next_action(client: Mapping[str, Any], mora_start: Optional[date], stage: str, stage_at: Optional[float],
+                now: float, policy: DunningPolicy = DEFAULT_POLICY) -> Tuple[Optional[str], Optional[float]]:
+    """Próxima acción y su vencimiento (epoch) según el estado del suscriptor."""
+    if client.get("pago_recibido", False) or mora_start is None:
+        # Pagó o ya no debe: reactivar si estaba cortado
+        if stage in ("corte", "escalamiento"):
+            return "reactivacion", now
+        return None, None
+    if stage in ("", "reactivacion"):
+        return "aviso_previo", policy.at(mora_start + timedelta(days=policy.warn_day))
+    if stage == "aviso_previo":
+        if client.get("excepcion", False):
+            return None, None
+        notice = (stage_at or now) + policy.notice_days * 86400
+        return "corte", max(policy.at(mora_start + timedelta(days=policy.cut_day)), notice)
+    if stage == "corte":
+        notice = (stage_at or now) + policy.notice_days * 86400
+        return "escalamiento", max(policy.at(mora_start + timedelta(days=policy.escalate_day)), notice)
+    return None, None
+
+
+class DunningScheduler:
+    """Agenda persistente de acciones de cobranza.
+
+    Args:
+        path: Archivo SQLite (se crea si no existe)
+        policy: Calendario de cobranza
+    """
+
+    def __init__(self, path: Path = DEFAULT_SCHEDULE_PATH, policy: DunningPolicy = DEFAULT_POLICY):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.policy = policy
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def sync(self, df: pd.DataFrame, as_of: Optional[date] = None, full_snapshot: bool = True,
+             now: Optional[float] = None) -> Dict[str, int]:
+        """Reprogramar a los suscriptores cuya fila cambió.
+
+        Args:
+            df: Morosos (columnas de sample_morosos.csv; dni identifica al suscriptor)
+            as_of: Fecha a la que corresponde dias_mora (default: hoy)
+            full_snapshot: El CSV es el padrón completo: quien no aparece sale de la agenda
+            now: Momento de la sincronización (epoch)
+
+        Returns:
+            Cantidad de suscriptores nuevos, modificados, sin cambios y eliminados
+        """
+        now = time.time() if now is None else now
+        as_of = as_of or date.today()
+        df = df[df["dni"].notna()]
+        subscribers = df["dni"].astype(str).str.removesuffix(".0").tolist()
+        dias = pd.to_numeric(df["dias_mora"], errors="coerce")
+        starts = [None if pd.isna(dias_mora) or dias_mora <= 0 else (as_of - timedelta(days=int(dias_mora))).isoformat()
+                  for dias_mora in dias.tolist()]
+        # Huella de la fila sin dias_mora (cambia todos los días) pero con el inicio de la mora
+        stable = df.drop(columns=["dias_mora"]).assign(mora_start=starts)
+        fingerprints = pd.util.hash_pandas_object(stable.astype(str), index=False).astype(str).tolist()
+
+        with self._lock:
+            existing = {row["subscriber"]: (row["fingerprint"], row["mora_start"], row["stage"], row["stage_at"])
+                        for row in self._conn.execute(
+                            "SELECT subscriber, fingerprint, mora_start, stage, stage_at FROM schedule")}
+
+        counts = {"nuevos": 0, "modificados": 0, "sin_cambios": 0, "eliminados": 0}
+        upserts = []
+        records = None
+        for position, (subscriber, fingerprint) in enumerate(zip(subscribers, fingerprints)):
+            previous = existing.get(subscriber)
+            if previous is not None and previous[0] == fingerprint:
+                counts["sin_cambios"] += 1
+                continue
+            if records is None:
+                records = df.drop(columns=["dias_mora"]).to_dict("records")
+            client = {key: _json_value(value) for key, value in records[position].items()}
+            mora_start = starts[position]
+            stage, stage_at = ("", None)
+            if previous is not None:
+                counts["modificados"] += 1
+                _, previous_start, previous_stage, previous_stage_at = previous
+                # Misma mora: se conserva lo ya ejecutado; mora nueva: ciclo desde cero
+                if not self._new_cycle(client, mora_start, previous_start, previous_stage):
+                    stage, stage_at = previous_stage, previous_stage_at
+                    if mora_start is not None and previous_start is not None and \
+                            abs(_days_between(previous_start, mora_start)) <= self.policy.drift_days:
+                        # Se mantiene la fecha ya programada: un export corrido no mueve la agenda
+                        mora_start = previous_start
+            else:
+                counts["nuevos"] += 1
+            action, due_at = next_action(client, date.fromisoformat(mora_start) if mora_start else None,
+                                         stage, stage_at, now, self.policy)
+            upserts.append((subscriber, fingerprint, mora_start, json.dumps(client, ensure_ascii=False), stage,
+                            stage_at, action, due_at, now))
+
+        removed: List[Tuple[str]] = []
+        if full_snapshot:
+            present = set(subscribers)
+            removed = [(subscriber,) for subscriber in existing if subscriber not in present]
+            counts["eliminados"] = len(removed)
+
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO schedule (subscriber, fingerprint, mora_start, client, stage, stage_at, next_action,"
+                    " due_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (subscriber) DO UPDATE SET"
+                    " fingerprint = excluded.fingerprint, mora_start = excluded.mora_start, client = excluded.client,"
+                    " stage = excluded.stage, stage_at = excluded.stage_at, next_action = excluded.next_action,"
+                    " due_at = excluded.due_at, updated_at = excluded.updated_at", upserts)
+                self._conn.executemany("DELETE FROM schedule WHERE subscriber = ?", removed)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        logger.info("Agenda de cobranza: %(nuevos)d nuevos, %(modificados)d modificados, "
+                    "%(sin_cambios)d sin cambios, %(eliminados)d eliminados", counts)
+        return counts
+
+    def _new_cycle(self, client: Mapping[str, Any], mora_start: Optional[str], previous_start: Optional[str],
+                   previous_stage: str) -> bool:
+        """Mora nueva: vuelve a deber después de saldar o de reactivarse, o dias_mora se reinició."""
+        if mora_start is None or client.get("pago_recibido", False):
+            return False
+        if previous_start is None or previous_stage == "reactivacion":
+            return True
+        return _days_between(previous_start, mora_start) > self.policy.drift_days
+
+    def sync_csv(self, csv_path: Path, as_of: Optional[date] = None, force: bool = False) -> Optional[Dict[str, int]]:
+        """Sincronizar desde un CSV, salvo que no haya cambiado desde la última vez.
+
+        dias_mora se toma a la fecha de hoy si no se indica as_of (no a la de
+        modificación del archivo, que se pierde al copiarlo).
+
+        Returns:
+            Los conteos de sync(), o None si el archivo no cambió
+        """
+        csv_path = Path(csv_path)
+        stat = csv_path.stat()
+        signature = f"{stat.st_mtime_ns}:{stat.st_size}"
+        key = f"csv:{csv_path.resolve()}"
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        if row is not None and row["value"] == signature and not force:
+            return None
+        counts = self.sync(pd.read_csv(csv_path), as_of)
+        with self._lock:
+            self._conn.execute("INSERT INTO meta (key, value) VALUES (?, ?)"
+                               " ON CONFLICT (key) DO UPDATE SET value = excluded.value", (key, signature))
+        return counts
+
+    def due(self, now: Optional[float] = None, limit: int = 500) -> List[DueAction]:
+        """Acciones vencidas, de la más atrasada a la más reciente."""
+        now = time.time() if now is None else now
+        today = date.fromtimestamp(now)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT subscriber, next_action, due_at, mora_start, client FROM schedule"
+                " WHERE due_at IS NOT NULL AND due_at <= ? ORDER BY due_at LIMIT ?", (now, limit)).fetchall()
+        actions = []
+        for row in rows:
+            client = json.loads(row["client"])
+            mora_start = row["mora_start"]
+            client["dias_mora"] = (today - date.fromisoformat(mora_start)).days if mora_start else 0
+            actions.append(DueAction(row["subscriber"], row["next_action"], row["due_at"], client))
+        return actions
+
+    def complete(self, subscriber: str, action: str, at: Optional[float] = None) -> None:
+        """Registrar la acción ejecutada y programar la siguiente."""
+        at = time.time() if at is None else at
+        with self._lock:
+            row = self._conn.execute("SELECT mora_start, client FROM schedule WHERE subscriber = ?",
+                                     (subscriber,)).fetchone()
+            if row is None:
+                return
+            mora_start = date.fromisoformat(row["mora_start"]) if row["mora_start"] else None
+            following, due_at = next_action(json.loads(row["client"]), mora_start, action, at, at, self.policy)
+            self._conn.execute(
+                "UPDATE schedule SET stage = ?, stage_at = ?, next_action = ?, due_at = ?, updated_at = ?"
+                " WHERE subscriber = ?", (action, at, following, due_at, at, subscriber))
+
+    def postpone(self, subscriber: str, seconds: float, at: Optional[float] = None) -> None:
+        """Volver a intentar más tarde (seconds desde `at`) una acción que falló."""
+        at = time.time() if at is None else at
+        with self._lock:
+            self._conn.execute("UPDATE schedule SET due_at = ? WHERE subscriber = ? AND due_at IS NOT NULL",
+                               (at + seconds, subscriber))
+
+    def next_due_at(self) -> Optional[float]:
+        """Vencimiento más próximo (epoch), o None si no hay nada programado."""
+        with self._lock:
+            return self._conn.execute("SELECT MIN(due_at) FROM schedule WHERE due_at IS NOT NULL").fetchone()[0]
+
+    def stats(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """Suscriptores por próxima acción, vencidos ahora y próximo vencimiento."""
+        now = time.time() if now is None else now
+        with self._lock:
+            pending = {row["next_action"]: row["total"] for row in self._conn.execute(
+                "SELECT next_action, COUNT(*) AS total FROM schedule WHERE due_at IS NOT NULL GROUP BY next_action")}
+            total = self._conn.execute("SELECT COUNT(*) FROM schedule").fetchone()[0]
+            due = self._conn.execute("SELECT COUNT(*) FROM schedule WHERE due_at IS NOT NULL AND due_at <= ?",
+                                     (now,)).fetchone()[0]
+        return {"suscriptores": total, "vencidas": due, "proxima": self.next_due_at(),
+                **{action: pending.get(action, 0) for action in ACTIONS}}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def _days_between(start: str, end: str) -> int:
+    return (date.fromisoformat(end) - date.fromisoformat(start)).days
+
+
+def _json_value(value: Any) -> Any:
+    """Valor de una fila de pandas apto para JSON (NaN → None)."""
+    if isinstance(value, float) and value != value:
+        return None
+    if hasattr(value, "item"):
+        return value.item()
+    return value
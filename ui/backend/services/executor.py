@@ -0,0 +1,90 @@
+"""Ejecución de trabajo bloqueante (pandas, lectura de archivos) fuera del event loop.
+
+Los handlers async no deben llamar a pd.read_csv ni a read_bytes directo:
+mientras corren, uvicorn no atiende ningún otro request. run_blocking() los
+manda a un pool de hilos acotado y, si se pasa una clave, coalesce los pedidos
+concurrentes idénticos en un único cálculo compartido.
+"""
+from __future__ import annotations
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+MAX_WORKERS = 4
+
+
+class BlockingExecutor:
+    """Pool de hilos acotado con coalescencia de pedidos por clave.
+
+    Se usan hilos y no procesos: el parser de pandas y la E/S liberan el GIL,
+    y los resultados (DataFrames, dicts) no tienen que serializarse.
+
+    Args:
+        max_workers: Hilos del pool; los pedidos que exceden esperan en cola
+    """
+
+    def __init__(self, max_workers: int = MAX_WORKERS):
+        self.max_workers = max_workers
+        self._pool: Optional[ThreadPoolExecutor] = None
+        # (loop, clave) -> future en curso; un future solo puede esperarse en su loop
+        self._inflight: Dict[Tuple[int, Hashable], asyncio.Future] = {}
+        self.coalesced = 0
+
+    @property
+    def pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="blocking")
+        return self._pool
+
+    async def run(self, func: Callable[..., T], *args: Any, key: Hashable | None = None, **kwargs: Any) -> T:
+        """Ejecutar func(*args, **kwargs) en el pool y esperar el resultado.
+
+        Args:
+            func: Función bloqueante
+            key: Si se indica, los pedidos con la misma clave que lleguen mientras
+                 uno está en curso esperan ese mismo resultado (o excepción)
+
+        Returns:
+            Lo que devuelva func
+        """
+        loop = asyncio.get_running_loop()
+        call = functools.partial(func, *args, **kwargs)
+        if key is None:
+            return await loop.run_in_executor(self.pool, call)
+
+        inflight_key = (id(loop), key)
+        future = self._inflight.get(inflight_key)
+        if future is None:
+            future = loop.run_in_executor(self.pool, call)
+            self._inflight[inflight_key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(inflight_key, None))
+        else:
+            self.coalesced += 1
+        # shield: si un cliente corta la conexión, el cálculo sigue para los demás
+        return await asyncio.shield(future)
+
+    def stats(self) -> Dict[str, Any]:
+        """Estado del pool (para /health o debugging)."""
+        return {
+            "max_workers": self.max_workers,
+            "inflight": len(self._inflight),
+            "coalesced": self.coalesced,
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Cerrar el pool; un run() posterior crea uno nuevo."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+            self._pool = None
+
+
+blocking = BlockingExecutor()
+
+
+async def run_blocking(func: Callable[..., T], *args: Any, key: Hashable | None = None, **kwargs: Any) -> T:
+    """Atajo a blocking.run() con el executor compartido del backend."""
+    return await blocking.run(func, *args, key=key, **kwargs)
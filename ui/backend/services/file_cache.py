@@ -0,0 +1,160 @@
+"""Cache de valores derivados de un archivo, invalidado por (mtime, size).
+
+El valor se calcula una sola vez por versión del archivo. Cuando el archivo
+cambia, get() sigue devolviendo el valor anterior mientras un hilo en segundo
+plano recalcula (stale-while-revalidate); solo la primera carga bloquea.
+Con check_interval > 0 el stat() del archivo se hace a lo sumo una vez por
+intervalo, así las rutas calientes no tocan el disco en cada request.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Generic, Optional, Tuple, TypeVar
+
+from .executor import run_blocking
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+FileKey = Tuple[int, int]
+
+
+def file_key(path: Path) -> FileKey:
+    """Identidad de una versión del archivo: (mtime en ns, tamaño en bytes)."""
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+class FileSnapshotCache(Generic[T]):
+    """Valor calculado desde un archivo con refresco en segundo plano.
+
+    Args:
+        path: Archivo de origen
+        loader: Función que recibe el path y devuelve el valor a cachear
+        name: Nombre para logs (por defecto, el nombre del archivo)
+        check_interval: Segundos entre verificaciones de cambios (0 = en cada get)
+    """
+
+    def __init__(self, path: Path, loader: Callable[[Path], T], name: str | None = None,
+                 check_interval: float = 0.0):
+        self.path = Path(path)
+        self.loader = loader
+        self.name = name or self.path.name
+        self.check_interval = check_interval
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._value: Optional[T] = None
+        self._key: Optional[FileKey] = None
+        self._loaded_at: float | None = None
+        self._refreshing = False
+        self._failed_key: Optional[FileKey] = None
+        self.last_error: str | None = None
+
+    @property
+    def stale(self) -> bool:
+        """True si el valor servido no corresponde a la versión actual del archivo."""
+        try:
+            return self._key != file_key(self.path)
+        except OSError:
+            return True
+
+    @property
+    def value(self) -> Optional[T]:
+        """Valor cacheado tal como está, sin verificar el archivo (None si no cargó)."""
+        return self._value
+
+    @property
+    def loaded(self) -> bool:
+        """True si ya hay un valor; desde entonces get() nunca espera al loader."""
+        return self._key is not None
+
+    @property
+    def loaded_at(self) -> float | None:
+        """Epoch de la última carga exitosa."""
+        return self._loaded_at
+
+    def get(self) -> T:
+        """Valor para la versión actual del archivo.
+
+        La primera carga es sincrónica. Después, si el archivo cambió se
+        devuelve el valor anterior y se lanza un refresco en segundo plano.
+
+        Raises:
+            FileNotFoundError: Si el archivo no existe
+            Exception: Lo que levante el loader en la primera carga
+        """
+        if self.check_interval and self._key is not None:
+            now = time.monotonic()
+            if now - self._checked_at < self.check_interval:
+                return self._value  # type: ignore[return-value]
+            self._checked_at = now
+
+        key = file_key(self.path)
+        with self._lock:
+            if self._key == key:
+                return self._value  # type: ignore[return-value]
+            if self._key is None:
+                # Primera carga: se hace bajo el lock para que concurrentes esperen un único cálculo
+                self._store(key, self.loader(self.path))
+                return self._value  # type: ignore[return-value]
+            # Un archivo que ya falló en esta versión no se reintenta hasta que vuelva a cambiar
+            if not self._refreshing and key != self._failed_key:
+                self._refreshing = True
+                threading.Thread(target=self._refresh, name=f"refresh-{self.name}", daemon=True).start()
+            return self._value  # type: ignore[return-value]
+
+    async def aget(self) -> T:
+        """get() para handlers async: la primera carga corre en el pool bloqueante.
+
+        Los pedidos concurrentes durante esa carga comparten el mismo cálculo.
+        """
+        if self.loaded:
+            return self.get()
+        return await run_blocking(self.get, key=("file_cache", self.name))
+
+    def refresh(self) -> T:
+        """Recalcular de inmediato (sincrónico), sin importar la versión cacheada."""
+        key = file_key(self.path)
+        value = self.loader(self.path)
+        with self._lock:
+            self._store(key, value)
+        return value
+
+    def invalidate(self) -> None:
+        """Descartar el valor; la próxima lectura recalcula de forma sincrónica."""
+        with self._lock:
+            self._value = None
+            self._key = None
+            self._loaded_at = None
+            self._failed_key = None
+
+    def _store(self, key: FileKey, value: T) -> None:
+        self._value = value
+        self._key = key
+        self._loaded_at = time.time()
+        self._failed_key = None
+        self.last_error = None
+
+    def _refresh(self) -> None:
+        key: Optional[FileKey] = None
+        try:
+            # Se toma la clave antes de leer: si el archivo cambia durante la carga,
+            # la próxima lectura ve otra clave y vuelve a refrescar
+            key = file_key(self.path)
+            start = time.perf_counter()
+            value = self.loader(self.path)
+        except Exception as exc:  # noqa: BLE001 - se sigue sirviendo el valor anterior
+            logger.warning("Refresco de %s falló, se mantiene el valor anterior: %s", self.name, exc)
+            with self._lock:
+                self._failed_key = key
+                self.last_error = str(exc)
+                self._refreshing = False
+            return
+
+        with self._lock:
+            self._store(key, value)
+            self._refreshing = False
+        logger.info("%s recalculado en %.3fs", self.name, time.perf_counter() - start)
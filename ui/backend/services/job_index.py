@@ -0,0 +1,89 @@
+"""Lectura del índice de ejecuciones (output/jobs_index.jsonl).
+
+cut_service.py agrega una línea por ejecución con la metadata y las
+estadísticas (sin los resultados por usuario). Como el archivo solo crece,
+el lector guarda el offset y en cada consulta lee únicamente las líneas
+nuevas; si el archivo se reescribe (otro inode o menor tamaño) se recarga.
+"""
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import orjson
+
+JOBS_INDEX_NAME = "jobs_index.jsonl"
+
+
+class JobIndexReader:
+    """Entradas del índice en memoria, actualizadas leyendo solo lo agregado."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._entries: List[Dict[str, Any]] = []
+        self._offset = 0
+        self._identity: Optional[Tuple[int, int]] = None
+
+    @property
+    def cached(self) -> List[Dict[str, Any]]:
+        """Entradas ya leídas, sin consultar el archivo."""
+        return self._entries
+
+    @property
+    def offset(self) -> int:
+        """Bytes del índice ya leídos (cambia cuando se incorporan entradas)."""
+        return self._offset
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """Todas las entradas en orden de ejecución (no modificar la lista)."""
+        with self._lock:
+            try:
+                stat = self.path.stat()
+            except FileNotFoundError:
+                self._reset(None)
+                return self._entries
+
+            identity = (stat.st_dev, stat.st_ino)
+            if identity != self._identity or stat.st_size < self._offset:
+                self._reset(identity)
+
+            if stat.st_size > self._offset:
+                with open(self.path, "rb") as f:
+                    f.seek(self._offset)
+                    chunk = f.read(stat.st_size - self._offset)
+                # Una línea a medio escribir se lee en la próxima consulta
+                complete = chunk.rfind(b"\n") + 1
+                entries = [orjson.loads(line) for line in chunk[:complete].splitlines() if line.strip()]
+                # Lista nueva: quien ya tiene la anterior no la ve cambiar
+                self._entries = self._entries + entries
+                self._offset += complete
+            return self._entries
+
+    def page(self, limit: int, cursor: Optional[int] = None) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """Página de entradas, de la más reciente a la más antigua.
+
+        Args:
+            limit: Máximo de entradas
+            cursor: Posición devuelta por la página anterior (None = desde la última)
+
+        Returns:
+            (entradas, cursor de la página siguiente o None si no hay más)
+        """
+        entries = self.entries()
+        end = len(entries) if cursor is None else max(0, min(cursor, len(entries)))
+        start = max(0, end - limit)
+        return entries[start:end][::-1], (start if start > 0 else None)
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        entries = self.entries()
+        return entries[-1] if entries else None
+
+    def _reset(self, identity: Optional[Tuple[int, int]]) -> None:
+        self._entries = []
+        self._offset = 0
+        self._identity = identity
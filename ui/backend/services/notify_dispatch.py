@@ -0,0 +1,266 @@
+"""Envío concurrente de notificaciones con límites por canal.
+
+NotificationDispatcher recibe todas las notificaciones de un lote y las manda
+en paralelo, con un máximo de envíos simultáneos y un token bucket por canal
+(WhatsApp, SMS, email). Las notificaciones de un mismo suscriptor salen en el
+orden en que se encolaron: cada suscriptor es una cadena secuencial y la
+concurrencia se da entre suscriptores distintos.
+
+El proveedor de cada canal es intercambiable: ThreadedProvider envuelve un
+cliente bloqueante (Twilio, SMTPPool) y HTTPProvider habla con un servicio
+HTTP, p. ej. un stub local para benchmarks.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Protocol
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Notification:
+    """Mensaje a enviar por un canal.
+
+    Args:
+        subscriber: Clave del suscriptor (DNI); define el orden de envío
+        channel: whatsapp, sms o email
+        to: Número o dirección de destino
+        body: Texto (o HTML en email)
+        tipo: Tipo de acción para el historial (whatsapp_warning, email_warning, ...)
+        subject: Asunto (solo email)
+    """
+
+    subscriber: Hashable
+    channel: str
+    to: str
+    body: str
+    tipo: str
+    subject: Optional[str] = None
+    meta: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class Delivery:
+    """Resultado del envío de una notificación."""
+
+    notification: Notification
+    ok: bool
+    timestamp: str
+    error: Optional[str] = None
+    response: Any = None
+
+    def accion(self) -> Dict[str, Any]:
+        """Entrada en el formato de result['acciones'] de MorosidadProcessor."""
+        accion = {
+            "tipo": self.notification.tipo,
+            "estado": "enviado" if self.ok else "error",
+            "canal": self.notification.channel,
+            "timestamp": self.timestamp,
+        }
+        if self.error:
+            accion["error"] = self.error
+        return accion
+
+
+@dataclass(frozen=True)
+class ChannelLimits:
+    """Límites de un canal.
+
+    Args:
+        concurrency: Envíos simultáneos
+        rate_per_second: Envíos por segundo (0 = sin límite)
+        burst: Envíos que pueden salir seguidos antes de aplicar el ritmo
+    """
+
+    concurrency: int = 8
+    rate_per_second: float = 10.0
+    burst: int = 10
+
+
+# Valores conservadores para Twilio (WhatsApp / SMS por número) y un SMTP compartido
+DEFAULT_CHANNEL_LIMITS: Dict[str, ChannelLimits] = {
+    "whatsapp": ChannelLimits(concurrency=16, rate_per_second=20.0, burst=20),
+    "sms": ChannelLimits(concurrency=8, rate_per_second=10.0, burst=10),
+    "email": ChannelLimits(concurrency=4, rate_per_second=10.0, burst=10),
+}
+
+
+class NotificationProvider(Protocol):
+    """Cliente de un canal: envía una notificación o lanza excepción."""
+
+    async def send(self, notification: Notification) -> Any: ...
+
+
+class ThreadedProvider:
+    """Proveedor sobre una función bloqueante, ejecutada en un pool de hilos propio.
+
+    Args:
+        func: Recibe la notificación y envía (lanza excepción si falla)
+        max_workers: Hilos del pool (igual a la concurrencia del canal)
+    """
+
+    def __init__(self, func: Callable[[Notification], Any], max_workers: int = 8):
+        self.func = func
+        self.max_workers = max_workers
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    async def send(self, notification: Notification) -> Any:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="notify")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, self.func, notification)
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+
+class HTTPProvider:
+    """Proveedor HTTP: POST {base_url}/{canal} con la notificación en JSON.
+
+    El cliente httpx se abre en el primer envío y se cierra con aclose() (el
+    dispatcher lo hace al terminar cada lote, porque queda atado al event loop).
+
+    Args:
+        base_url: URL del servicio (p. ej. el stub de scripts/bench_notifications.py)
+        max_connections: Conexiones HTTP keep-alive
+        timeout: Timeout por request en segundos
+    """
+
+    def __init__(self, base_url: str, max_connections: int = 32, timeout: float = 30.0):
+        self.base_url = base_url.rstrip("/")
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self._client: Any = None
+
+    async def send(self, notification: Notification) -> Any:
+        if self._client is None:
+            import httpx
+
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url, timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections),
+            )
+        response = await self._client.post(f"/{notification.channel}", json={
+            "to": notification.to,
+            "body": notification.body,
+            "subject": notification.subject,
+        })
+        response.raise_for_status()
+        return response.json()
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class AsyncTokenBucket:
+    """Token bucket para un event loop (sin locks: la reserva es síncrona).
+
+    Conserva el saldo entre lotes, así dos dispatch() seguidos respetan el ritmo.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+
+    async def acquire(self) -> float:
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        self._tokens -= 1
+        wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            await asyncio.sleep(wait)
+        return wait
+
+
+class NotificationDispatcher:
+    """Fan-out de notificaciones con concurrencia y ritmo acotados por canal.
+
+    Args:
+        providers: Proveedor por canal
+        limits: Límites por canal (default: DEFAULT_CHANNEL_LIMITS)
+    """
+
+    def __init__(self, providers: Dict[str, NotificationProvider],
+                 limits: Optional[Dict[str, ChannelLimits]] = None):
+        self.providers = providers
+        limits = limits or {}
+        self.limits = {channel: limits.get(channel, DEFAULT_CHANNEL_LIMITS.get(channel, ChannelLimits()))
+                       for channel in providers}
+        self._buckets = {channel: AsyncTokenBucket(limit.rate_per_second, limit.burst)
+                         for channel, limit in self.limits.items()}
+        self._stats: Dict[str, Dict[str, float]] = {
+            channel: {"sent": 0, "failed": 0, "throttled_s": 0.0, "max_inflight": 0}
+            for channel in providers
+        }
+        self._inflight: Dict[str, int] = {channel: 0 for channel in providers}
+
+    async def dispatch(self, notifications: Iterable[Notification]) -> List[Delivery]:
+        """Enviar todas las notificaciones; devuelve un Delivery por cada una, en el mismo orden.
+
+        Un envío fallido queda registrado en su Delivery y no corta la cadena
+        del suscriptor.
+        """
+        notifications = list(notifications)
+        chains: Dict[Hashable, List[int]] = {}
+        for index, notification in enumerate(notifications):
+            chains.setdefault(notification.subscriber, []).append(index)
+
+        # Semáforos por lote: quedan atados al loop en el que se usan
+        semaphores = {channel: asyncio.Semaphore(limit.concurrency) for channel, limit in self.limits.items()}
+        deliveries: List[Optional[Delivery]] = [None] * len(notifications)
+
+        async def run_chain(indexes: List[int]) -> None:
+            for index in indexes:
+                deliveries[index] = await self._deliver(notifications[index], semaphores)
+
+        try:
+            await asyncio.gather(*(run_chain(indexes) for indexes in chains.values()))
+        finally:
+            for provider in self.providers.values():
+                aclose = getattr(provider, "aclose", None)
+                if aclose is not None:
+                    await aclose()
+        return deliveries  # type: ignore[return-value]
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Enviados, fallidos, segundos de espera por ritmo y pico de envíos simultáneos por canal."""
+        return {channel: dict(stats) for channel, stats in self._stats.items()}
+
+    async def _deliver(self, notification: Notification,
+                       semaphores: Dict[str, asyncio.Semaphore]) -> Delivery:
+        channel = notification.channel
+        provider = self.providers.get(channel)
+        if provider is None:
+            return Delivery(notification, False, datetime.now().isoformat(), error=f"canal sin proveedor: {channel}")
+
+        stats = self._stats[channel]
+        async with semaphores[channel]:
+            stats["throttled_s"] += await self._buckets[channel].acquire()
+            self._inflight[channel] += 1
+            stats["max_inflight"] = max(stats["max_inflight"], self._inflight[channel])
+            try:
+                response = await provider.send(notification)
+            except Exception as exc:  # noqa: BLE001 - el error queda en el Delivery
+                stats["failed"] += 1
+                logger.error("Error enviando %s a %s: %s", channel, notification.to, exc)
+                return Delivery(notification, False, datetime.now().isoformat(), error=str(exc))
+            finally:
+                self._inflight[channel] -= 1
+        stats["sent"] += 1
+        return Delivery(notification, True, datetime.now().isoformat(), response=response)
@@ -0,0 +1,278 @@
+"""Outbox durable de notificaciones (SQLite).
+
+El procesamiento de morosos no envía nada: encola cada notificación en una
+tabla SQLite y sigue. OutboxWorker la vacía en lotes con el dispatcher,
+reintenta los fallos con espera exponencial y pasa a dead-letter los que
+agotan los intentos.
+
+Cada notificación lleva una clave de idempotencia (suscriptor, tipo, canal,
+día): volver a correr el mismo lote en el día no encola ni envía dos veces.
+La entrega es al-menos-una-vez: si el proceso muere entre el envío y la
+marca de enviado, la fila vuelve a estar disponible cuando vence su lease.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from .notify_dispatch import Delivery, Notification, NotificationDispatcher
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OUTBOX_PATH = Path(__file__).resolve().parents[3] / "output" / "notifications_outbox.sqlite3"
+LEASE_SECONDS = 300.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    idempotency_key TEXT NOT NULL UNIQUE,
+    subscriber TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    recipient TEXT NOT NULL,
+    tipo TEXT NOT NULL,
+    subject TEXT,
+    body TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    lease_until REAL,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    sent_at REAL
+);
+CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_attempt_at);
+"""
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Reintentos con espera exponencial.
+
+    Args:
+        max_attempts: Intentos antes de pasar a dead-letter
+        base_delay: Espera tras el primer fallo (segundos), se duplica en cada intento
+        max_delay: Tope de la espera
+        jitter: Variación aleatoria relativa (evita reintentos sincronizados)
+    """
+
+    max_attempts: int = 6
+    base_delay: float = 30.0
+    max_delay: float = 3600.0
+    jitter: float = 0.2
+
+    def delay(self, attempt: int) -> float:
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return delay * (1 + random.uniform(-self.jitter, self.jitter))
+
+
+def idempotency_key(notification: Notification, day: Optional[str] = None) -> str:
+    """Clave (suscriptor, tipo, canal, día) de una notificación."""
+    day = day or date.today().isoformat()
+    return f"{notification.subscriber}|{notification.tipo}|{notification.channel}|{day}"
+
+
+class NotificationOutbox:
+    """Tabla de notificaciones pendientes, segura para usar desde varios hilos.
+
+    Args:
+        path: Archivo SQLite (se crea si no existe)
+        lease_seconds: Tiempo que una fila reclamada queda reservada para su worker
+    """
+
+    def __init__(self, path: Path = DEFAULT_OUTBOX_PATH, lease_seconds: float = LEASE_SECONDS):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lease_seconds = lease_seconds
+        self._lock = threading.Lock()
+        # Transacciones explícitas (BEGIN/COMMIT); WAL deja leer mientras el worker escribe
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def enqueue(self, notifications: Iterable[Notification], day: Optional[str] = None) -> List[bool]:
+        """Encolar notificaciones; las ya encoladas en el día (misma clave) se ignoran.
+
+        Returns:
+            Por cada notificación, True si se encoló y False si era un duplicado
+        """
+        now = time.time()
+        inserted = []
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for notification in notifications:
+                    cursor = self._conn.execute(
+                        "INSERT OR IGNORE INTO outbox (idempotency_key, subscriber, channel, recipient, tipo,"
+                        " subject, body, next_attempt_at, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (idempotency_key(notification, day), str(notification.subscriber), notification.channel,
+                         notification.to, notification.tipo, notification.subject, notification.body, now, now),
+                    )
+                    inserted.append(cursor.rowcount == 1)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return inserted
+
+    def claim(self, limit: int) -> List[Notification]:
+        """Reservar hasta `limit` notificaciones vencidas, en orden de encolado.
+
+        También toma las filas 'sending' con el lease vencido (worker caído).
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    "SELECT * FROM outbox WHERE (status = 'pending' AND next_attempt_at <= ?)"
+                    " OR (status = 'sending' AND lease_until <= ?) ORDER BY id LIMIT ?",
+                    (now, now, limit),
+                ).fetchall()
+                self._conn.executemany(
+                    "UPDATE outbox SET status = 'sending', lease_until = ? WHERE id = ?",
+                    [(now + self.lease_seconds, row["id"]) for row in rows],
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return [
+            Notification(row["subscriber"], row["channel"], row["recipient"], row["body"], row["tipo"],
+                         subject=row["subject"], meta={"outbox_id": row["id"], "attempts": row["attempts"]})
+            for row in rows
+        ]
+
+    def complete(self, deliveries: Iterable[Delivery], policy: RetryPolicy) -> Dict[str, int]:
+        """Registrar el resultado de un lote: enviado, reintento programado o dead-letter."""
+        now = time.time()
+        sent, retry, dead = [], [], []
+        for delivery in deliveries:
+            outbox_id = delivery.notification.meta["outbox_id"]
+            if delivery.ok:
+                sent.append((now, outbox_id))
+                continue
+            attempts = delivery.notification.meta["attempts"] + 1
+            if attempts >= policy.max_attempts:
+                dead.append((attempts, delivery.error, outbox_id))
+            else:
+                retry.append((attempts, now + policy.delay(attempts), delivery.error, outbox_id))
+
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "UPDATE outbox SET status = 'sent', sent_at = ?, lease_until = NULL, last_error = NULL"
+                    " WHERE id = ?", sent)
+                self._conn.executemany(
+                    "UPDATE outbox SET status = 'pending', attempts = ?, next_attempt_at = ?, last_error = ?,"
+                    " lease_until = NULL WHERE id = ?", retry)
+                self._conn.executemany(
+                    "UPDATE outbox SET status = 'dead', attempts = ?, last_error = ?, lease_until = NULL"
+                    " WHERE id = ?", dead)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        if dead:
+            logger.warning("Outbox: %d notificaciones pasaron a dead-letter", len(dead))
+        return {"sent": len(sent), "retry": len(retry), "dead": len(dead)}
+
+    def stats(self) -> Dict[str, int]:
+        """Filas por estado (pending, sending, sent, dead) y vencidas para enviar ahora."""
+        with self._lock:
+            counts = {row["status"]: row["total"] for row in self._conn.execute(
+                "SELECT status, COUNT(*) AS total FROM outbox GROUP BY status")}
+            due = self._conn.execute(
+                "SELECT COUNT(*) FROM outbox WHERE status = 'pending' AND next_attempt_at <= ?",
+                (time.time(),)).fetchone()[0]
+        return {status: counts.get(status, 0) for status in ("pending", "sending", "sent", "dead")} | {"due": due}
+
+    def dead_letters(self, limit: int = 100) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, idempotency_key, channel, recipient, tipo, attempts, last_error, created_at"
+                " FROM outbox WHERE status = 'dead' ORDER BY id LIMIT ?", (limit,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def requeue_dead(self, ids: Optional[List[int]] = None) -> int:
+        """Volver a encolar dead-letters (todas o las indicadas) con los intentos en cero."""
+        query = "UPDATE outbox SET status = 'pending', attempts = 0, next_attempt_at = ? WHERE status = 'dead'"
+        params: List[Any] = [time.time()]
+        if ids is not None:
+            query += f" AND id IN ({', '.join('?' * len(ids))})"
+            params.extend(ids)
+        with self._lock:
+            return self._conn.execute(query, params).rowcount
+
+    def purge(self, older_than_days: float = 30) -> int:
+        """Borrar enviadas más viejas que `older_than_days` (sus claves dejan de deduplicar)."""
+        cutoff = time.time() - older_than_days * 86400
+        with self._lock:
+            return self._conn.execute("DELETE FROM outbox WHERE status = 'sent' AND sent_at < ?", (cutoff,)).rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class OutboxWorker:
+    """Vacía el outbox en lotes a través del dispatcher.
+
+    Args:
+        outbox: Outbox a vaciar
+        dispatcher: Dispatcher con los proveedores y límites por canal
+        batch_size: Notificaciones reclamadas por lote
+        poll_interval: Segundos entre consultas cuando no hay nada vencido (run())
+        policy: Política de reintentos
+    """
+
+    def __init__(self, outbox: NotificationOutbox, dispatcher: NotificationDispatcher, batch_size: int = 500,
+                 poll_interval: float = 5.0, policy: Optional[RetryPolicy] = None):
+        self.outbox = outbox
+        self.dispatcher = dispatcher
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.policy = policy or RetryPolicy()
+
+    async def drain_once(self) -> Dict[str, int]:
+        """Reclamar y enviar un lote. Devuelve enviados, reintentos y dead-letters."""
+        claimed = await asyncio.to_thread(self.outbox.claim, self.batch_size)
+        if not claimed:
+            return {"sent": 0, "retry": 0, "dead": 0}
+        deliveries = await self.dispatcher.dispatch(claimed)
+        return await asyncio.to_thread(self.outbox.complete, deliveries, self.policy)
+
+    async def drain(self) -> Dict[str, int]:
+        """Enviar todo lo vencido ahora (los reintentos programados a futuro quedan)."""
+        totals = {"sent": 0, "retry": 0, "dead": 0}
+        while True:
+            result = await self.drain_once()
+            for key, value in result.items():
+                totals[key] += value
+            if not any(result.values()):
+                return totals
+
+    async def run(self, stop: Optional[asyncio.Event] = None) -> None:
+        """Vaciar el outbox continuamente hasta que se setee `stop`."""
+        stop = stop or asyncio.Event()
+        while not stop.is_set():
+            try:
+                result = await self.drain()
+                if any(result.values()):
+                    logger.info("Outbox: %(sent)d enviadas, %(retry)d a reintentar, %(dead)d dead-letter", result)
+            except Exception:  # noqa: BLE001 - el worker no debe morir por un error puntual
+                logger.exception("Error vaciando el outbox %s", self.outbox.path)
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
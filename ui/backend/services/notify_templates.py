@@ -0,0 +1,262 @@
+"""Plantillas de notificaciones por tenant, compiladas una sola vez.
+
+Los textos de WhatsApp, SMS y email viven en
+
+    app/templates/notifications/<tenant>/<tipo>.<canal>.txt|html
+
+y lo que un tenant no define se toma de default/. Los datos de marca (nombre
+del ISP, link de MercadoPago, CBU, teléfonos) salen de tenant.json y quedan
+como globals del Environment del tenant.
+
+Todas las plantillas se compilan al construir NotificationTemplates. Las que
+solo interpolan variables (sin if/for/filtros, lo habitual en estos textos)
+se reducen además a sus partes de texto fijo: renderizar es escapar los
+valores y unirlos con esas partes, sin pasar por el runtime de Jinja. Para los lotes,
+render_batch() recibe columnas (un DataFrame o un dict de listas). Cada
+plantilla cachea sus cuerpos por los valores de las variables que usa: los SMS
+de corte con el mismo monto se renderizan una sola vez.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Set, Tuple
+
+from jinja2 import ChoiceLoader, Environment, FileSystemLoader, Template, meta, nodes, select_autoescape
+from markupsafe import escape
+
+from .tenant_registry import DEFAULT_TENANT
+
+logger = logging.getLogger(__name__)
+
+TEMPLATES_DIR = Path(__file__).resolve().parents[1] / "app" / "templates" / "notifications"
+TENANT_FILE = "tenant.json"
+TEMPLATE_SUFFIXES = (".txt", ".html")
+RENDER_CACHE_SIZE = 4096  # cuerpos distintos por plantilla antes de vaciar la caché
+
+# Nodos de una plantilla que se puede reducir a texto fijo + variables: texto, {{ variable }} y bloques/extends
+_PLAIN_NODES = (nodes.Template, nodes.Output, nodes.TemplateData, nodes.Name, nodes.Const, nodes.Extends,
+                nodes.Block)
+_SLOT = re.compile("\x00(\\d+)\x00")
+_HTML_SPECIAL = frozenset("&<>'\"")
+
+
+class CompiledTemplate:
+    """Plantilla compilada, con las variables que referencia y su caché de cuerpos.
+
+    Args:
+        name: Nombre sin extensión (p. ej. "corte.sms")
+        template: Plantilla de Jinja ya compilada
+        variables: Variables del cliente que usa (incluye las de los layouts que extiende)
+        tenant_globals: Datos de marca del tenant
+        cache_size: Cuerpos distintos a cachear
+        plain: La plantilla solo interpola variables (se renderiza sin el runtime de Jinja)
+    """
+
+    def __init__(self, name: str, template: Template, variables: Set[str], tenant_globals: Mapping[str, Any],
+                 cache_size: int = RENDER_CACHE_SIZE, plain: bool = False):
+        self.name = name
+        self.template = template
+        self.variables: Tuple[str, ...] = tuple(sorted(variables))
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._globals = dict(tenant_globals)
+        self._cache: Dict[Tuple[Any, ...], str] = {}
+        autoescape = template.environment.autoescape
+        self._to_text = _html_text if (autoescape(template.name) if callable(autoescape) else autoescape) else str
+        # Plantilla plana: lista de partes con texto fijo y (posición en la lista, índice del valor) a completar
+        self._parts: Optional[List[str]] = None
+        self._slots: Tuple[Tuple[int, int], ...] = ()
+        if plain:
+            self._split_plain()
+
+    def render(self, context: Mapping[str, Any]) -> str:
+        """Renderizar para un cliente. Una variable faltante lanza KeyError."""
+        return self.render_values(tuple(context[name] for name in self.variables))
+
+    def render_values(self, values: Tuple[Any, ...]) -> str:
+        """Renderizar con los valores de self.variables, en ese orden."""
+        body = self._cache.get(values)
+        if body is not None:
+            self.hits += 1
+            return body
+        self.misses += 1
+        if self._parts is not None:
+            parts = self._parts.copy()
+            to_text = self._to_text
+            for position, index in self._slots:
+                parts[position] = to_text(values[index])
+            body = "".join(parts)
+        else:
+            context = dict(self._globals)
+            context.update(zip(self.variables, values))
+            # Contexto compartido: sin copiar los globals del Environment en cada render
+            template = self.template
+            body = "".join(template.root_render_func(template.new_context(context, shared=True)))
+        if len(self._cache) >= self.cache_size:
+            self._cache.clear()
+        self._cache[values] = body
+        return body
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "cached": len(self._cache)}
+
+    def _split_plain(self) -> None:
+        """Renderizar una vez con marcadores en lugar de las variables y separar el texto fijo."""
+        rendered = self.template.render(**{name: f"\x00{index}\x00" for index, name in enumerate(self.variables)})
+        # split alterna texto fijo y el índice de cada marcador
+        parts = _SLOT.split(rendered)
+        self._slots = tuple((position, int(parts[position])) for position in range(1, len(parts), 2))
+        self._parts = parts
+
+
+class NotificationTemplates:
+    """Plantillas de notificaciones de todos los tenants.
+
+    Args:
+        root: Directorio con un subdirectorio por tenant (default/ es obligatorio)
+        cache_size: Cuerpos distintos a cachear por plantilla
+    """
+
+    def __init__(self, root: Path = TEMPLATES_DIR, cache_size: int = RENDER_CACHE_SIZE):
+        self.root = Path(root)
+        self.cache_size = cache_size
+        self._tenants: Dict[str, Dict[str, CompiledTemplate]] = {}
+        self.load()
+
+    def load(self) -> None:
+        """Compilar las plantillas de todos los tenants (reemplaza las anteriores)."""
+        default_dir = self.root / DEFAULT_TENANT
+        tenants: Dict[str, Dict[str, CompiledTemplate]] = {}
+        if self.root.is_dir():
+            for tenant_dir in sorted(path for path in self.root.iterdir() if path.is_dir()):
+                tenants[tenant_dir.name] = self._compile_tenant(tenant_dir, default_dir)
+        if DEFAULT_TENANT not in tenants:
+            logger.warning("No hay plantillas de notificaciones en %s", default_dir)
+        self._tenants = tenants
+        logger.info("Plantillas de notificaciones: %s",
+                    ", ".join(f"{tenant} ({len(compiled)})" for tenant, compiled in tenants.items()) or "(vacío)")
+
+    def tenants(self) -> List[str]:
+        return list(self._tenants)
+
+    def get(self, name: str, tenant: Optional[str] = None) -> CompiledTemplate:
+        """Plantilla compilada del tenant (o del default si el tenant no existe)."""
+        compiled = self._tenants.get(tenant or DEFAULT_TENANT) or self._tenants.get(DEFAULT_TENANT, {})
+        try:
+            return compiled[name]
+        except KeyError:
+            raise KeyError(f"Plantilla de notificación inexistente: {name}") from None
+
+    def render(self, name: str, context: Mapping[str, Any], tenant: Optional[str] = None) -> str:
+        return self.get(name, tenant).render(context)
+
+    def render_batch(self, name: str, columns: Any, tenant: Optional[str] = None) -> List[str]:
+        """Renderizar una plantilla para un lote en formato columnar.
+
+        Args:
+            name: Nombre de la plantilla
+            columns: DataFrame o mapping columna → secuencia de valores, todas del mismo largo
+            tenant: Tenant cuyas plantillas usar
+
+        Returns:
+            Un cuerpo por fila, en el mismo orden
+
+        Raises:
+            KeyError: Si falta una columna que la plantilla usa
+        """
+        compiled = self.get(name, tenant)
+        if not compiled.variables:
+            return [compiled.render_values(())] * _batch_length(columns)
+        values = [_column(columns, variable) for variable in compiled.variables]
+        render = compiled.render_values
+        return [render(row) for row in zip(*values)]
+
+    def stats(self) -> Dict[str, Dict[str, Dict[str, int]]]:
+        """Aciertos y fallos de caché por tenant y plantilla."""
+        return {tenant: {name: template.stats() for name, template in compiled.items()}
+                for tenant, compiled in self._tenants.items()}
+
+    def _compile_tenant(self, tenant_dir: Path, default_dir: Path) -> Dict[str, CompiledTemplate]:
+        env = Environment(
+            loader=ChoiceLoader([FileSystemLoader(str(tenant_dir)), FileSystemLoader(str(default_dir))]),
+            autoescape=select_autoescape(["html"]),
+            trim_blocks=True,
+            lstrip_blocks=True,
+            auto_reload=False,
+        )
+        tenant_globals = {**_read_tenant_file(default_dir), **_read_tenant_file(tenant_dir)}
+        env.globals.update(tenant_globals)
+
+        names = {path.name for directory in (default_dir, tenant_dir) if directory.is_dir()
+                 for path in directory.iterdir()
+                 if path.suffix in TEMPLATE_SUFFIXES and not path.name.startswith("_")}
+        compiled = {}
+        for filename in sorted(names):
+            name = filename.rsplit(".", 1)[0]
+            try:
+                asts = _template_asts(env, filename)
+                variables = set().union(*(meta.find_undeclared_variables(ast) for ast in asts)) - set(env.globals)
+                plain = all(isinstance(node, _PLAIN_NODES) for ast in asts for node in _walk(ast))
+                compiled[name] = CompiledTemplate(name, env.get_template(filename), variables, tenant_globals,
+                                                  self.cache_size, plain=plain)
+            except Exception as exc:  # noqa: BLE001 - una plantilla rota no deja al tenant sin las demás
+                logger.error("Plantilla %s/%s inválida: %s", tenant_dir.name, filename, exc)
+        return compiled
+
+
+def _read_tenant_file(directory: Path) -> Dict[str, Any]:
+    path = directory / TENANT_FILE
+    if not path.is_file():
+        return {}
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as exc:
+        logger.warning("%s inválido: %s", path, exc)
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _template_asts(env: Environment, filename: str, seen: Optional[Set[str]] = None) -> List[nodes.Template]:
+    """AST de una plantilla y de los layouts/includes que usa."""
+    seen = seen if seen is not None else set()
+    seen.add(filename)
+    source, _, _ = env.loader.get_source(env, filename)  # type: ignore[union-attr]
+    ast = env.parse(source)
+    asts = [ast]
+    for parent in meta.find_referenced_templates(ast):
+        if parent and parent not in seen:
+            asts.extend(_template_asts(env, parent, seen))
+    return asts
+
+
+def _walk(node: nodes.Node):
+    yield node
+    for child in node.iter_child_nodes():
+        yield from _walk(child)
+
+
+def _html_text(value: Any) -> str:
+    """Valor escapado para HTML, igual que el autoescape de Jinja (sin crear Markup si no hace falta)."""
+    if isinstance(value, str):
+        return value if _HTML_SPECIAL.isdisjoint(value) else str(escape(value))
+    if isinstance(value, (int, float)):
+        return str(value)
+    return str(escape(value))
+
+
+def _column(columns: Any, name: str) -> Sequence[Any]:
+    column = columns[name]
+    return column.tolist() if hasattr(column, "tolist") else column
+
+
+def _batch_length(columns: Any) -> int:
+    if hasattr(columns, "index"):
+        return len(columns.index)
+    return len(next(iter(columns.values()), ()))
+
+
+notification_templates = NotificationTemplates()
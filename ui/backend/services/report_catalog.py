@@ -0,0 +1,174 @@
+"""Catálogo de reportes CSV de output/ sin recorrer el directorio por request.
+
+El directorio solo cambia de mtime cuando se crean, borran o renombran
+archivos, así que el catálogo vuelve a listar únicamente en ese caso (y a lo
+sumo una vez por check_interval) y solo hace stat() de los archivos nuevos.
+Los archivos modificados hace muy poco se vuelven a medir en la siguiente
+verificación, porque pueden seguir escribiéndose después de creados.
+"""
+from __future__ import annotations
+
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# reporte_cortes_<modo>_<YYYYmmdd_HHMMSS>.csv (cut_service.py)
+REPORT_NAME = re.compile(r"_(?P<mode>dry-run|execute|rollback)_(?P<ts>\d{8}_\d{6})\.csv$")
+SORT_KEYS = ("date", "size", "name")
+SETTLE_SECONDS = 10.0
+
+
+class ReportCatalog:
+    """Listado de *.csv de un directorio con actualización incremental.
+
+    Args:
+        directory: Directorio de reportes
+        root: Base para el path relativo de cada reporte
+        check_interval: Segundos entre stat() del directorio
+    """
+
+    def __init__(self, directory: Path, root: Path, check_interval: float = 2.0):
+        self.directory = Path(directory)
+        self.root = Path(root)
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._reports: Dict[str, Dict[str, Any]] = {}
+        self._dir_mtime: Optional[int] = None
+        self._checked_at = 0.0
+        self._settling: set[str] = set()
+        self._sorted: Dict[Tuple[str, bool], List[Dict[str, Any]]] = {}
+        self.scans = 0
+
+    @property
+    def cached(self) -> Dict[str, Dict[str, Any]]:
+        """Reportes conocidos por nombre, sin verificar el directorio."""
+        return self._reports
+
+    @property
+    def generation(self) -> Tuple[int, int]:
+        """Cambia cuando el listado pudo haber cambiado (para re-medir memoria)."""
+        return self.scans, len(self._reports)
+
+    def list(self, sort: str = "date", descending: bool = True, mode: str | None = None,
+             limit: int | None = None, offset: int = 0) -> Tuple[List[Dict[str, Any]], int]:
+        """Página de reportes.
+
+        Args:
+            sort: date (timestamp del nombre o mtime), size o name
+            descending: Orden descendente
+            mode: Filtrar por modo (dry-run, execute, rollback)
+            limit: Máximo de reportes (None = todos)
+            offset: Reportes a saltear
+
+        Returns:
+            (reportes de la página, total que cumple el filtro)
+        """
+        if sort not in SORT_KEYS:
+            raise ValueError(f"sort inválido: {sort} (usar {', '.join(SORT_KEYS)})")
+
+        self._refresh()
+        with self._lock:
+            ordered = self._sorted.get((sort, descending))
+            if ordered is None:
+                ordered = sorted(self._reports.values(), key=lambda report: report["_sort"][sort],
+                                 reverse=descending)
+                self._sorted[(sort, descending)] = ordered
+
+        if mode is not None:
+            ordered = [report for report in ordered if report["mode"] == mode]
+        end = None if limit is None else offset + limit
+        return [_public(report) for report in ordered[offset:end]], len(ordered)
+
+    def invalidate(self) -> None:
+        """Forzar una verificación del directorio en la próxima consulta."""
+        with self._lock:
+            self._dir_mtime = None
+            self._checked_at = 0.0
+
+    def _refresh(self) -> None:
+        now = time.monotonic()
+        if self._dir_mtime is not None and now - self._checked_at < self.check_interval:
+            return
+
+        with self._lock:
+            self._checked_at = now
+            try:
+                dir_mtime = self.directory.stat().st_mtime_ns
+            except FileNotFoundError:
+                if self._reports:
+                    self._reports = {}
+                    self._sorted = {}
+                self._dir_mtime = None
+                return
+
+            changed = False
+            if dir_mtime != self._dir_mtime:
+                changed = self._rescan()
+                # Un cambio dentro de la resolución del mtime podría no moverlo: mientras
+                # el directorio sea reciente se vuelve a listar en cada verificación
+                recent = time.time() - dir_mtime / 1e9 < SETTLE_SECONDS
+                self._dir_mtime = -1 if recent else dir_mtime
+            elif self._settling:
+                changed = self._restat(list(self._settling))
+
+            if changed:
+                self._sorted = {}
+
+    def _rescan(self) -> bool:
+        self.scans += 1
+        names = {entry.name for entry in os.scandir(self.directory)
+                 if entry.name.endswith(".csv") and entry.is_file()}
+        removed = self._reports.keys() - names
+        for name in removed:
+            del self._reports[name]
+            self._settling.discard(name)
+        added = [name for name in names if name not in self._reports]
+        restated = self._restat(added + [name for name in self._settling if name in names])
+        return bool(removed) or restated
+
+    def _restat(self, names: List[str]) -> bool:
+        changed = False
+        now = time.time()
+        for name in names:
+            path = self.directory / name
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                if self._reports.pop(name, None) is not None:
+                    changed = True
+                self._settling.discard(name)
+                continue
+
+            previous = self._reports.get(name)
+            if previous is None or previous["size"] != stat.st_size or previous["_mtime"] != stat.st_mtime:
+                self._reports[name] = self._report(path, stat)
+                changed = True
+            if now - stat.st_mtime < SETTLE_SECONDS:
+                self._settling.add(name)
+            else:
+                self._settling.discard(name)
+        return changed
+
+    def _report(self, path: Path, stat: os.stat_result) -> Dict[str, Any]:
+        match = REPORT_NAME.search(path.name)
+        if match:
+            created = datetime.strptime(match.group("ts"), "%Y%m%d_%H%M%S")
+        else:
+            created = datetime.fromtimestamp(stat.st_mtime)
+        return {
+            "name": path.name,
+            "path": str(path.relative_to(self.root)),
+            "size": stat.st_size,
+            "mode": match.group("mode") if match else None,
+            "date": created.isoformat(),
+            "_mtime": stat.st_mtime,
+            "_sort": {"date": created, "size": stat.st_size, "name": path.name},
+        }
+
+
+def _public(report: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value for key, value in report.items() if not key.startswith("_")}
@@ -0,0 +1,154 @@
+"""Reporte de gestión de morosidad escrito a medida que se procesa.
+
+ReportWriter recibe cada resultado de MorosidadProcessor apenas se produce:
+actualiza los totales (ReportCounters) y escribe el detalle del cliente
+directo en el archivo, en texto, JSONL o CSV. Nada se acumula en memoria, así
+el reporte de 100k clientes cuesta lo mismo por cliente que el de 10.
+
+En texto el resumen ejecutivo va al final, cuando los totales ya están
+completos; en JSONL es la última línea ({"resumen": {...}}). El CSV tiene una
+fila por acción y los totales quedan en close().
+"""
+from __future__ import annotations
+
+import csv
+import json
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, TextIO
+
+FORMATS = ("text", "jsonl", "csv")
+SUFFIX_FORMATS = {".txt": "text", ".jsonl": "jsonl", ".csv": "csv"}
+CSV_COLUMNS = ("cliente", "dni", "ip", "tipo", "estado", "timestamp")
+
+
+@dataclass
+class ReportCounters:
+    """Clientes procesados y clientes con al menos una acción de cada clase."""
+
+    total: int = 0
+    notificaciones: int = 0
+    cortes: int = 0
+    reactivaciones: int = 0
+
+    def update(self, result: Dict[str, Any]) -> None:
+        notificado = cortado = reactivado = False
+        for accion in result["acciones"]:
+            tipo = accion["tipo"]
+            notificado = notificado or "warning" in tipo
+            cortado = cortado or "corte" in tipo
+            reactivado = reactivado or "reactivacion" in tipo
+        self.total += 1
+        self.notificaciones += notificado
+        self.cortes += cortado
+        self.reactivaciones += reactivado
+
+    def as_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+def mask_dni(dni: Any) -> str:
+    """DNI abreviado para el reporte: últimos tres dígitos."""
+    return f"{str(dni)[-3:]}***"
+
+
+class ReportWriter:
+    """Escritor incremental del reporte.
+
+    Args:
+        handle: Archivo de texto abierto para escribir
+        fmt: text, jsonl o csv
+        modo: Modo del procesador (PRODUCTION / SIMULATION), para el encabezado
+        fecha: Fecha del reporte (default: ahora)
+    """
+
+    def __init__(self, handle: TextIO, fmt: str = "text", modo: str = "", fecha: Optional[datetime] = None):
+        if fmt not in FORMATS:
+            raise ValueError(f"Formato de reporte inválido: {fmt} (opciones: {', '.join(FORMATS)})")
+        self.handle = handle
+        self.fmt = fmt
+        self.modo = modo
+        self.fecha = fecha or datetime.now()
+        self.counters = ReportCounters()
+        self.closed = False
+        self._owns_handle = False
+        self._csv = None
+        if fmt == "text":
+            handle.write(
+                "=====================================\n"
+                "📊 REPORTE DE GESTIÓN DE MOROSIDAD\n"
+                "=====================================\n\n"
+                f"Fecha: {self.fecha.strftime('%Y-%m-%d %H:%M')}\n"
+                f"Modo: {modo}\n\n"
+                "DETALLE POR CLIENTE:\n"
+                "--------------------\n"
+            )
+        elif fmt == "csv":
+            self._csv = csv.writer(handle)
+            self._csv.writerow(CSV_COLUMNS)
+
+    @classmethod
+    def open(cls, path: Path, fmt: Optional[str] = None, **kwargs: Any) -> "ReportWriter":
+        """Abrir `path` para escribir el reporte; el formato sale de la extensión si no se indica."""
+        path = Path(path)
+        fmt = fmt or SUFFIX_FORMATS.get(path.suffix.lower(), "text")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        writer = cls(path.open("w", encoding="utf-8", newline="" if fmt == "csv" else None), fmt, **kwargs)
+        writer._owns_handle = True
+        return writer
+
+    def write(self, result: Dict[str, Any]) -> None:
+        """Sumar el resultado a los totales y escribir su detalle."""
+        self.counters.update(result)
+        dni = mask_dni(result["dni"])
+        if self.fmt == "text":
+            lines = [f"\nCliente: {result['cliente']} (DNI: {dni})\n", f"IP: {result['ip']}\n",
+                     "Acciones realizadas:\n"]
+            lines.extend(f"  • {accion['tipo']}: {accion['estado']} ({accion['timestamp']})\n"
+                         for accion in result["acciones"])
+            self.handle.write("".join(lines))
+        elif self.fmt == "jsonl":
+            self.handle.write(json.dumps(
+                {"cliente": result["cliente"], "dni": dni, "ip": result["ip"], "acciones": result["acciones"]},
+                ensure_ascii=False, default=str) + "\n")
+        else:
+            rows = [(result["cliente"], dni, result["ip"], accion["tipo"], accion["estado"], accion["timestamp"])
+                    for accion in result["acciones"]]
+            self._csv.writerows(rows or [(result["cliente"], dni, result["ip"], "", "", "")])
+
+    def close(self, counters: Optional[ReportCounters] = None, note: Optional[str] = None) -> ReportCounters:
+        """Escribir el resumen y cerrar el archivo si lo abrió open().
+
+        Args:
+            counters: Totales a informar en lugar de los acumulados por este writer
+            note: Línea aclaratoria al pie del resumen (solo texto)
+        """
+        counters = counters or self.counters
+        if self.closed:
+            return counters
+        if self.fmt == "text":
+            self.handle.write(
+                "\nRESUMEN EJECUTIVO:\n"
+                "------------------\n"
+                f"• Total clientes procesados: {counters.total}\n"
+                f"• Notificaciones enviadas: {counters.notificaciones}\n"
+                f"• Servicios cortados: {counters.cortes}\n"
+                f"• Servicios reactivados: {counters.reactivaciones}\n"
+                + (f"\n{note}\n" if note else "")
+            )
+        elif self.fmt == "jsonl":
+            self.handle.write(json.dumps({"resumen": {
+                "fecha": self.fecha.isoformat(), "modo": self.modo, **counters.as_dict(),
+            }}, ensure_ascii=False) + "\n")
+        self.handle.flush()
+        if self._owns_handle:
+            self.handle.close()
+        self.closed = True
+        return counters
+
+    def __enter__(self) -> "ReportWriter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
@@ -0,0 +1,292 @@
+"""Envío SMTP con sesiones autenticadas reutilizables.
+
+Abrir una conexión, hacer STARTTLS y login por cada email cuesta varios
+round-trips y los proveedores limitan cuántas conexiones simultáneas y cuántos
+mensajes por sesión aceptan. SMTPPool mantiene hasta max_connections sesiones
+abiertas, manda varios mensajes por sesión, reconecta ante cortes y espacia
+los envíos según el límite de mensajes por segundo del proveedor.
+"""
+from __future__ import annotations
+
+import logging
+import smtplib
+import ssl
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from email.message import Message
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ProviderLimits:
+    """Límites de un proveedor SMTP.
+
+    Args:
+        max_connections: Sesiones simultáneas abiertas
+        messages_per_connection: Mensajes por sesión antes de reconectar
+        rate_per_second: Mensajes por segundo (0 = sin límite)
+        burst: Mensajes que pueden salir seguidos antes de aplicar el ritmo
+    """
+
+    max_connections: int = 4
+    messages_per_connection: int = 100
+    rate_per_second: float = 10.0
+    burst: int = 10
+
+
+# Valores conservadores; ajustar según el plan contratado con cada proveedor
+PROVIDER_LIMITS: Dict[str, ProviderLimits] = {
+    "smtp.gmail.com": ProviderLimits(max_connections=3, messages_per_connection=100, rate_per_second=5.0),
+    "smtp.office365.com": ProviderLimits(max_connections=3, messages_per_connection=30, rate_per_second=0.5,
+                                         burst=5),
+    "smtp.sendgrid.net": ProviderLimits(max_connections=10, messages_per_connection=500, rate_per_second=50.0,
+                                        burst=50),
+}
+DEFAULT_LIMITS = ProviderLimits()
+
+# Errores que indican que la sesión ya no sirve (se descarta y se reintenta con otra)
+CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, ConnectionError, TimeoutError,
+                     OSError)
+
+
+class RateLimiter:
+    """Token bucket compartido entre hilos.
+
+    Args:
+        rate: Tokens por segundo (0 = sin límite)
+        burst: Capacidad del bucket
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Tomar un token, esperando si hace falta. Devuelve los segundos esperados."""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            # Con saldo negativo el token queda reservado y se espera a que se reponga
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+# Un bucket por (proveedor, usuario): varios pools contra la misma cuenta comparten el ritmo
+_limiters: Dict[tuple, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def _shared_limiter(host: str, username: Optional[str], limits: ProviderLimits) -> RateLimiter:
+    with _limiters_lock:
+        key = (host, username, limits.rate_per_second, limits.burst)
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limiter = _limiters[key] = RateLimiter(limits.rate_per_second, limits.burst)
+        return limiter
+
+
+class _Session:
+    __slots__ = ("smtp", "sent", "last_used")
+
+    def __init__(self, smtp: smtplib.SMTP):
+        self.smtp = smtp
+        self.sent = 0
+        self.last_used = time.monotonic()
+
+
+class SMTPPool:
+    """Pool de sesiones SMTP autenticadas, seguro para usar desde varios hilos.
+
+    Args:
+        host: Servidor SMTP
+        port: Puerto (587 con STARTTLS, 465 con use_ssl)
+        username: Usuario para AUTH (None = sin login)
+        password: Contraseña para AUTH
+        starttls: Negociar STARTTLS al conectar
+        use_ssl: Conexión TLS implícita (puerto 465)
+        limits: Límites del proveedor (por defecto según host)
+        timeout: Timeout de socket en segundos
+        idle_timeout: Segundos sin uso tras los que se verifica la sesión con NOOP
+        max_retries: Reintentos con una sesión nueva ante cortes o errores 4xx
+    """
+
+    def __init__(self, host: str, port: int = 587, username: Optional[str] = None,
+                 password: Optional[str] = None, starttls: bool = True, use_ssl: bool = False,
+                 limits: Optional[ProviderLimits] = None, timeout: float = 30.0,
+                 idle_timeout: float = 30.0, max_retries: int = 2):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls and not use_ssl
+        self.use_ssl = use_ssl
+        self.limits = limits or PROVIDER_LIMITS.get(host, DEFAULT_LIMITS)
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.max_retries = max_retries
+
+        self._slots = threading.BoundedSemaphore(self.limits.max_connections)
+        self._idle: List[_Session] = []
+        self._lock = threading.Lock()
+        self._limiter = _shared_limiter(host, username, self.limits)
+        self._stats = {"connections": 0, "sent": 0, "reconnects": 0, "failed": 0, "throttled_s": 0.0}
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], **kwargs: Any) -> "SMTPPool":
+        """Pool desde un dict como EMAIL_CONFIG (smtp_server, smtp_port, email, password)."""
+        return cls(config["smtp_server"], config.get("smtp_port", 587), username=config.get("email"),
+                   password=config.get("password"), **kwargs)
+
+    def send(self, msg: Message, from_addr: Optional[str] = None,
+             to_addrs: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Enviar un mensaje por una sesión del pool.
+
+        Los cortes de conexión y las respuestas 4xx se reintentan con otra
+        sesión; los rechazos permanentes (5xx) se propagan sin reintentar.
+
+        Returns:
+            Destinatarios rechazados (dict vacío si se aceptaron todos)
+        """
+        attempt = 0
+        while True:
+            waited = self._limiter.acquire()
+            try:
+                with self._session() as session:
+                    try:
+                        refused = session.smtp.send_message(msg, from_addr, to_addrs)
+                    except smtplib.SMTPResponseException as exc:
+                        # Tras un 5xx smtplib ya hizo RSET y la sesión sigue sirviendo
+                        if exc.smtp_code < 500:
+                            self._discard(session)
+                        raise
+                    except CONNECTION_ERRORS:
+                        self._discard(session)
+                        raise
+                    session.sent += 1
+                self._count("sent")
+                self._count("throttled_s", waited)
+                return refused
+            except smtplib.SMTPRecipientsRefused:
+                self._count("failed")
+                raise
+            except smtplib.SMTPResponseException as exc:
+                # 5xx es permanente (destinatario, remitente, credenciales): no se reintenta
+                if exc.smtp_code >= 500:
+                    self._count("failed")
+                    raise
+                error: Exception = exc
+            except CONNECTION_ERRORS as exc:
+                error = exc
+
+            attempt += 1
+            if attempt > self.max_retries:
+                self._count("failed")
+                raise error
+            self._count("reconnects")
+            logger.warning("SMTP %s: %s, reintentando con otra sesión (%d/%d)",
+                           self.host, error, attempt, self.max_retries)
+
+    def close(self) -> None:
+        """Cerrar las sesiones abiertas (el pool se puede seguir usando y reconecta)."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for session in idle:
+            self._quit(session)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._stats, idle=len(self._idle), limits=self.limits.__dict__.copy())
+
+    def __enter__(self) -> "SMTPPool":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    @contextmanager
+    def _session(self) -> Iterator[_Session]:
+        self._slots.acquire()
+        session: Optional[_Session] = None
+        try:
+            session = self._checkout()
+            yield session
+        finally:
+            if session is not None:
+                self._checkin(session)
+            self._slots.release()
+
+    def _checkout(self) -> _Session:
+        while True:
+            with self._lock:
+                session = self._idle.pop() if self._idle else None
+            if session is None:
+                return self._connect()
+            if time.monotonic() - session.last_used < self.idle_timeout or self._alive(session):
+                return session
+            self._quit(session)
+
+    def _checkin(self, session: _Session) -> None:
+        if session.smtp is None:
+            return
+        session.last_used = time.monotonic()
+        if session.sent >= self.limits.messages_per_connection:
+            self._quit(session)
+            return
+        with self._lock:
+            self._idle.append(session)
+
+    def _connect(self) -> _Session:
+        if self.use_ssl:
+            smtp: smtplib.SMTP = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout,
+                                                  context=ssl.create_default_context())
+        else:
+            smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            smtp.ehlo()
+            if self.starttls:
+                smtp.starttls(context=ssl.create_default_context())
+                smtp.ehlo()
+            if self.username:
+                smtp.login(self.username, self.password or "")
+        except Exception:
+            smtp.close()
+            raise
+        self._count("connections")
+        logger.debug("SMTP %s: sesión nueva", self.host)
+        return _Session(smtp)
+
+    def _alive(self, session: _Session) -> bool:
+        try:
+            return session.smtp.noop()[0] == 250
+        except CONNECTION_ERRORS + (smtplib.SMTPException,):
+            return False
+
+    def _discard(self, session: _Session) -> None:
+        try:
+            session.smtp.close()
+        finally:
+            session.smtp = None
+
+    def _quit(self, session: _Session) -> None:
+        try:
+            session.smtp.quit()
+        except CONNECTION_ERRORS + (smtplib.SMTPException,):
+            session.smtp.close()
+        session.smtp = None
+
+    def _count(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self._stats[name] += value
@@ -0,0 +1,291 @@
+"""Capa de datos por tenant con caché LRU segmentada bajo un presupuesto de memoria.
+
+Cada tenant registrado puede tener su propio CSV de morosos e historial de
+ejecuciones:
+
+    data/tenants/<tenant>/morosos.csv
+    output/tenants/<tenant>/            (estadisticas_*, reporte_cortes_*, jobs_index.jsonl)
+
+El tenant default (y cualquiera sin directorio propio) usa las rutas de
+siempre, data/sample_morosos.csv y output/.
+
+Los objetos derivados (agregados, índice de IPs, historial, catálogo) se
+guardan en TenantDataCache por (tenant, tipo). La caché es una SLRU: una
+entrada nueva entra en el segmento de prueba y pasa al protegido recién en su
+segundo acceso; al superar el presupuesto se desaloja primero el segmento de
+prueba, así un tenant consultado una sola vez no desplaza a los que se usan
+todo el tiempo.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+from .tenant_registry import DEFAULT_TENANT, tenant_registry
+
+logger = logging.getLogger(__name__)
+
+ROOT = Path(__file__).resolve().parents[3]
+DATA_DIR = ROOT / "data"
+OUTPUT_DIR = ROOT / "output"
+DEFAULT_CSV = DATA_DIR / "sample_morosos.csv"
+TENANTS_DATA_DIR = DATA_DIR / "tenants"
+TENANTS_OUTPUT_DIR = OUTPUT_DIR / "tenants"
+TENANT_CSV_NAME = "morosos.csv"
+
+CACHE_BUDGET_MB = float(os.getenv("NORDIA_CACHE_BUDGET_MB", "256"))
+PROTECTED_RATIO = 0.8
+PATHS_TTL = 5.0  # segundos que se reutiliza la resolución de rutas de un tenant
+
+
+@dataclass(frozen=True)
+class TenantPaths:
+    """Rutas de datos de un tenant."""
+
+    tenant: str
+    csv_path: Path
+    output_dir: Path
+
+
+_DEFAULT_PATHS = TenantPaths(DEFAULT_TENANT, DEFAULT_CSV, OUTPUT_DIR)
+_resolved_paths: Dict[str, Tuple[float, TenantPaths]] = {}
+
+
+def tenant_paths(tenant: str | None) -> TenantPaths:
+    """Rutas del tenant; default si no está registrado o no tiene datos propios.
+
+    Solo se usan ids presentes en el registro de tenants, así un header
+    arbitrario no crea entradas de caché ni se convierte en un path. La
+    verificación en disco se reutiliza durante PATHS_TTL segundos.
+    """
+    if not tenant or tenant == DEFAULT_TENANT or tenant not in tenant_registry:
+        return _DEFAULT_PATHS
+
+    now = time.monotonic()
+    cached = _resolved_paths.get(tenant)
+    if cached is not None and now - cached[0] < PATHS_TTL:
+        return cached[1]
+
+    csv_path = TENANTS_DATA_DIR / tenant / TENANT_CSV_NAME
+    output_dir = TENANTS_OUTPUT_DIR / tenant
+    paths = _DEFAULT_PATHS
+    if csv_path.exists() or output_dir.is_dir():
+        paths = TenantPaths(tenant, csv_path, output_dir)
+    _resolved_paths[tenant] = (now, paths)
+    return paths
+
+
+def estimate_size(obj: Any, sample: int = 64, _depth: int = 0) -> int:
+    """Tamaño aproximado en bytes de un objeto y su contenido.
+
+    Los contenedores grandes se estiman con una muestra de `sample` elementos
+    para que medir un índice de cientos de miles de filas no cueste más que
+    construirlo.
+    """
+    size = sys.getsizeof(obj)
+    if _depth > 4:
+        return size
+
+    if isinstance(obj, dict):
+        items = obj.items()
+        count = len(obj)
+        if not count:
+            return size
+        measured = 0
+        for index, (key, value) in enumerate(items):
+            if index == sample:
+                break
+            measured += estimate_size(key, sample, _depth + 1) + estimate_size(value, sample, _depth + 1)
+        return size + measured * count // min(count, sample)
+
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        count = len(obj)
+        if not count:
+            return size
+        measured = 0
+        for index, value in enumerate(obj):
+            if index == sample:
+                break
+            measured += estimate_size(value, sample, _depth + 1)
+        return size + measured * count // min(count, sample)
+
+    memory_usage = getattr(obj, "memory_usage", None)
+    if callable(memory_usage):  # DataFrame / Series
+        usage = memory_usage(deep=True)
+        return int(usage.sum() if hasattr(usage, "sum") else usage)
+
+    attributes = getattr(obj, "__dict__", None)
+    if attributes:
+        return size + estimate_size(attributes, sample, _depth + 1)
+    return size
+
+
+@dataclass
+class CacheKind:
+    """Tipo de dato cacheable por tenant.
+
+    Args:
+        factory: Crea el contenedor del tenant (p. ej. un FileSnapshotCache)
+        sizer: Bytes que ocupa el contenedor
+        generation: Valor que cambia cuando el contenido cambió (para re-medir)
+    """
+
+    factory: Callable[[TenantPaths], Any]
+    sizer: Callable[[Any], int]
+    generation: Callable[[Any], Hashable]
+
+
+class _Entry:
+    __slots__ = ("holder", "size", "generation")
+
+    def __init__(self, holder: Any):
+        self.holder = holder
+        self.size = 0
+        self.generation: Hashable = None
+
+
+class TenantDataCache:
+    """SLRU de contenedores por (tenant, tipo) con presupuesto global de memoria.
+
+    Args:
+        budget_bytes: Memoria total permitida para los contenidos cacheados
+        protected_ratio: Fracción del presupuesto reservada al segmento protegido
+    """
+
+    def __init__(self, budget_bytes: int, protected_ratio: float = PROTECTED_RATIO):
+        self.budget_bytes = budget_bytes
+        self.protected_bytes = int(budget_bytes * protected_ratio)
+        self._kinds: Dict[str, CacheKind] = {}
+        self._probation: "OrderedDict[Tuple[str, str], _Entry]" = OrderedDict()
+        self._protected: "OrderedDict[Tuple[str, str], _Entry]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._metrics: Dict[str, Dict[str, int]] = {}
+
+    def register(self, kind: str, factory: Callable[[TenantPaths], Any],
+                 sizer: Callable[[Any], int], generation: Callable[[Any], Hashable]) -> None:
+        """Registrar un tipo de dato (lo hace cada servicio al importarse)."""
+        self._kinds[kind] = CacheKind(factory, sizer, generation)
+
+    def holder(self, tenant: str | None, kind: str) -> Any:
+        """Contenedor de `kind` para el tenant; se crea (sin cargar) si no está.
+
+        Un acceso a una entrada en prueba la promueve al segmento protegido.
+        """
+        paths = tenant_paths(tenant)
+        key = (paths.tenant, kind)
+        with self._lock:
+            metrics = self._tenant_metrics(paths.tenant)
+            entry = self._protected.get(key)
+            if entry is not None:
+                self._protected.move_to_end(key)
+                metrics["hits"] += 1
+                return entry.holder
+
+            entry = self._probation.pop(key, None)
+            if entry is not None:
+                metrics["hits"] += 1
+                self._protected[key] = entry
+                self._demote_protected()
+                return entry.holder
+
+            metrics["misses"] += 1
+            entry = _Entry(self._kinds[kind].factory(paths))
+            self._probation[key] = entry
+            return entry.holder
+
+    def peek(self, tenant: str | None, kind: str) -> Any:
+        """Contenedor si está en caché, sin contar acceso ni moverlo (o None)."""
+        key = (tenant_paths(tenant).tenant, kind)
+        with self._lock:
+            entry = self._protected.get(key) or self._probation.get(key)
+            return entry.holder if entry is not None else None
+
+    def account(self, tenant: str | None, kind: str) -> None:
+        """Re-medir la entrada si su contenido cambió y aplicar el presupuesto.
+
+        Se llama después de leer el valor del contenedor (que puede haber cargado).
+        """
+        paths = tenant_paths(tenant)
+        key = (paths.tenant, kind)
+        spec = self._kinds[kind]
+        with self._lock:
+            entry = self._protected.get(key) or self._probation.get(key)
+            if entry is None:
+                return
+            generation = spec.generation(entry.holder)
+            if generation == entry.generation:
+                return
+            entry.generation = generation
+
+        # Medir fuera del lock: con índices grandes puede tardar algunos ms
+        size = spec.sizer(entry.holder)
+        with self._lock:
+            entry.size = size
+            self._demote_protected()
+            self._enforce_budget()
+
+    def invalidate(self, tenant: str | None = None) -> None:
+        """Descartar las entradas de un tenant (o todas)."""
+        with self._lock:
+            for segment in (self._probation, self._protected):
+                for key in [key for key in segment if tenant is None or key[0] == tenant]:
+                    del segment[key]
+
+    @property
+    def used_bytes(self) -> int:
+        with self._lock:
+            return sum(entry.size for entry in self._probation.values()) + self._protected_used()
+
+    def stats(self) -> Dict[str, Any]:
+        """Métricas por tenant (hits, misses, evictions, bytes, entradas) y totales."""
+        with self._lock:
+            tenants: Dict[str, Dict[str, Any]] = {
+                tenant: dict(metrics, bytes=0, entries=0) for tenant, metrics in self._metrics.items()
+            }
+            for segment_name, segment in (("probation", self._probation), ("protected", self._protected)):
+                for (tenant, kind), entry in segment.items():
+                    data = tenants.setdefault(tenant, {"hits": 0, "misses": 0, "evictions": 0, "bytes": 0,
+                                                       "entries": 0})
+                    data["bytes"] += entry.size
+                    data["entries"] += 1
+                    data.setdefault("kinds", {})[kind] = {"bytes": entry.size, "segment": segment_name}
+            return {
+                "budget_bytes": self.budget_bytes,
+                "used_bytes": sum(data["bytes"] for data in tenants.values()),
+                "tenants": tenants,
+            }
+
+    def _tenant_metrics(self, tenant: str) -> Dict[str, int]:
+        metrics = self._metrics.get(tenant)
+        if metrics is None:
+            metrics = self._metrics[tenant] = {"hits": 0, "misses": 0, "evictions": 0}
+        return metrics
+
+    def _protected_used(self) -> int:
+        return sum(entry.size for entry in self._protected.values())
+
+    def _demote_protected(self) -> None:
+        # El segmento protegido no puede ocupar más que su parte del presupuesto
+        while len(self._protected) > 1 and self._protected_used() > self.protected_bytes:
+            key, entry = self._protected.popitem(last=False)
+            self._probation[key] = entry
+            self._probation.move_to_end(key, last=False)
+
+    def _enforce_budget(self) -> None:
+        used = sum(entry.size for entry in self._probation.values()) + self._protected_used()
+        while used > self.budget_bytes and (self._probation or self._protected):
+            segment = self._probation if self._probation else self._protected
+            (tenant, kind), entry = segment.popitem(last=False)
+            used -= entry.size
+            self._tenant_metrics(tenant)["evictions"] += 1
+            logger.info("Caché de tenants: desalojado %s/%s (%d bytes)", tenant, kind, entry.size)
+
+
+tenant_cache = TenantDataCache(int(CACHE_BUDGET_MB * 2 ** 20))
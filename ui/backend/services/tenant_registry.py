@@ -0,0 +1,133 @@
+"""Registro de tenants: temas de marca cargados en memoria.
+
+Todos los themes/*.json se cargan al iniciar en un mapping inmutable que se
+reemplaza entero cuando cambia algún archivo. Resolver la marca de un request
+es una búsqueda en ese dict, sin tocar el disco; la verificación de cambios
+corre aparte (watch()) cada check_interval segundos.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+import orjson
+
+from .executor import run_blocking
+
+logger = logging.getLogger(__name__)
+
+THEMES_DIR = Path(__file__).resolve().parents[2] / "frontend" / "public" / "themes"
+DEFAULT_TENANT = "default"
+CHECK_INTERVAL = 5.0
+
+# Marca mínima si no existe default.json, para no responder 500 por falta de tema
+FALLBACK_BRAND: Dict[str, Any] = {"id": DEFAULT_TENANT, "name": "Nordia ISP Suite"}
+
+Signature = Tuple[Tuple[str, int, int], ...]
+
+
+class TenantRegistry:
+    """Temas por tenant (nombre del archivo sin .json), recargados al cambiar.
+
+    Args:
+        themes_dir: Directorio con un <tenant>.json por tenant
+        check_interval: Segundos entre verificaciones de cambios en watch()
+    """
+
+    def __init__(self, themes_dir: Path = THEMES_DIR, check_interval: float = CHECK_INTERVAL):
+        self.themes_dir = Path(themes_dir)
+        self.check_interval = check_interval
+        self._themes: Optional[Mapping[str, Dict[str, Any]]] = None
+        self._signature: Optional[Signature] = None
+        self.version = 0
+
+    @property
+    def themes(self) -> Mapping[str, Dict[str, Any]]:
+        """Mapping inmutable tenant → tema (se carga la primera vez si hace falta)."""
+        if self._themes is None:
+            self.reload()
+        return self._themes  # type: ignore[return-value]
+
+    def __len__(self) -> int:
+        return len(self.themes)
+
+    def __contains__(self, tenant: str) -> bool:
+        return tenant in self.themes
+
+    def resolve(self, tenant: str | None) -> Dict[str, Any]:
+        """Tema del tenant, o el default si no existe."""
+        themes = self.themes
+        theme = themes.get(tenant or DEFAULT_TENANT)
+        if theme is None:
+            theme = themes.get(DEFAULT_TENANT, FALLBACK_BRAND)
+        return theme
+
+    def list_tenants(self) -> List[Dict[str, Any]]:
+        """Tenants disponibles (id y nombre), default primero."""
+        themes = self.themes
+        ordered = sorted(themes, key=lambda tenant: (tenant != DEFAULT_TENANT, tenant))
+        return [{"id": tenant, "name": themes[tenant].get("name", tenant)} for tenant in ordered]
+
+    def reload(self) -> bool:
+        """Releer los temas si cambió algún archivo.
+
+        Un JSON inválido no tumba el registro: se conserva la versión anterior
+        de ese tenant (si había) y se loguea el error.
+
+        Returns:
+            True si se publicó una versión nueva
+        """
+        signature = self._scan()
+        if signature == self._signature and self._themes is not None:
+            return False
+
+        previous = self._themes or {}
+        themes: Dict[str, Dict[str, Any]] = {}
+        for name, _, _ in signature:
+            tenant = name[:-len(".json")]
+            try:
+                theme = orjson.loads((self.themes_dir / name).read_bytes())
+            except (OSError, orjson.JSONDecodeError) as exc:
+                logger.warning("Tema %s inválido, se mantiene el anterior: %s", name, exc)
+                if tenant in previous:
+                    themes[tenant] = previous[tenant]
+                continue
+            if not isinstance(theme, dict):
+                logger.warning("Tema %s ignorado: se esperaba un objeto JSON", name)
+                continue
+            theme.setdefault("id", tenant)
+            themes[tenant] = theme
+
+        # Publicación atómica: los requests en curso siguen con el mapping que ya tomaron
+        self._themes = MappingProxyType(themes)
+        self._signature = signature
+        self.version += 1
+        logger.info("Registro de tenants v%d: %s", self.version, ", ".join(sorted(themes)) or "(vacío)")
+        return True
+
+    async def watch(self) -> None:
+        """Verificar cambios periódicamente (tarea de fondo del lifespan de la app)."""
+        while True:
+            await asyncio.sleep(self.check_interval)
+            try:
+                await run_blocking(self.reload, key=("tenant_registry", id(self)))
+            except Exception:  # noqa: BLE001 - el watcher no debe morir por un error puntual
+                logger.exception("Error verificando temas en %s", self.themes_dir)
+
+    def _scan(self) -> Signature:
+        if not self.themes_dir.is_dir():
+            return ()
+        entries = []
+        for path in self.themes_dir.glob("*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((path.name, stat.st_mtime_ns, stat.st_size))
+        return tuple(sorted(entries))
+
+
+tenant_registry = TenantRegistry()